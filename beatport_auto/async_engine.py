@@ -0,0 +1,443 @@
+"""
+Asyncio engine for the Beatport Auto Downloader.
+Drives the logged-in Chrome over a raw CDP websocket so several tabs can load, extract and click concurrently.
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import os
+import time
+from typing import Callable, Dict, List, Optional
+
+import requests
+
+from beatport_auto.main import API_PAGE_SIZE, DOWNLOAD_IDLE_TIMEOUT, ERROR_BANNER_SCRIPT, BeatportTrackFinder
+from beatport_auto.utils.download_events import BROWSER_DOWNLOAD_EVENTS, DownloadEventListener, is_throttle_response
+from beatport_auto.utils.failures import FailureReason
+from beatport_auto.utils.page_scripts import ROW_FUNCTIONS
+from beatport_auto.utils.retry_scheduler import PendingRetryScheduler
+
+try:
+    import websockets
+except ImportError:  # Optional: without it the GUI and CLI fall back to the Selenium engine
+    websockets = None
+
+ASYNC_ENGINE_AVAILABLE = websockets is not None
+
+DOWNLOADS_URL = "https://www.beatport.com/library/downloads?page=1&per_page=100"
+ROW_WAIT_MS = 15000
+POPUP_WAIT_MS = 1500
+
+# Waits for rows to render (without polling from Python) and describes all of them in one round trip
+ROWS_SCRIPT = """
+(containerSelectors, timeout) => new Promise(resolve => {
+    %s
+    const rows = findRows(containerSelectors);
+    if (rows.length) return resolve(describeRows(rows));
+    const observer = new MutationObserver(() => {
+        const found = findRows(containerSelectors);
+        if (found.length) { observer.disconnect(); resolve(describeRows(found)); }
+    });
+    observer.observe(document.documentElement, {childList: true, subtree: true});
+    setTimeout(() => { observer.disconnect(); resolve(describeRows(findRows(containerSelectors))); }, timeout);
+})
+""" % ROW_FUNCTIONS
+
+CLICK_ROW_SCRIPT = """
+(containerSelectors, index) => {
+    %s
+    return clickRow(containerSelectors, index);
+}
+""" % ROW_FUNCTIONS
+
+# Resolves as soon as a download dialog shows up, or false if none appears in time
+POPUP_SCRIPT = """
+(timeout) => new Promise(resolve => {
+    %s
+    const click = button => { button.click(); resolve(true); };
+    const button = findPopupButton();
+    if (button) return click(button);
+    const observer = new MutationObserver(() => {
+        const found = findPopupButton();
+        if (found) { observer.disconnect(); click(found); }
+    });
+    observer.observe(document.body, {childList: true, subtree: true});
+    setTimeout(() => { observer.disconnect(); resolve(false); }, timeout);
+})
+""" % ROW_FUNCTIONS
+
+
+class CdpError(Exception):
+    """A CDP command failed or the connection dropped."""
+
+
+def browser_websocket_url(driver) -> str:
+    """Find the browser-level CDP websocket of a chromedriver-controlled Chrome."""
+    address = driver.capabilities.get("goog:chromeOptions", {}).get("debuggerAddress")
+    if not address:
+        raise CdpError("Chrome did not report a debugger address")
+    return requests.get(f"http://{address}/json/version", timeout=5).json()["webSocketDebuggerUrl"]
+
+
+class CdpClient:
+    """
+    Minimal CDP client over one browser websocket.
+
+    Commands are matched to responses by id, so any number can be in flight
+    at once; events are dispatched to callbacks registered with on().
+    Sessions from Target.attachToTarget(flatten=True) share the connection.
+    """
+
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._listeners: Dict[str, List[Callable]] = {}
+        self._reader: Optional[asyncio.Task] = None
+
+    @classmethod
+    async def connect(cls, websocket_url: str) -> "CdpClient":
+        client = cls(await websockets.connect(websocket_url, max_size=None))
+        client._reader = asyncio.ensure_future(client._read())
+        return client
+
+    async def send(self, method: str, params: Optional[Dict] = None, session_id: Optional[str] = None,
+                   timeout: float = 30) -> Dict:
+        message_id = next(self._ids)
+        message = {"id": message_id, "method": method, "params": params or {}}
+        if session_id:
+            message["sessionId"] = session_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[message_id] = future
+        try:
+            await self.websocket.send(json.dumps(message))
+            response = await asyncio.wait_for(future, timeout)
+        finally:
+            self._pending.pop(message_id, None)
+        if "error" in response:
+            raise CdpError(f"{method}: {response['error'].get('message')}")
+        return response.get("result", {})
+
+    def on(self, method: str, callback: Callable[[Dict, Optional[str]], None]) -> None:
+        """Call callback(params, session_id) for every event named method."""
+        self._listeners.setdefault(method, []).append(callback)
+
+    def wait_for(self, method: str, session_id: Optional[str] = None) -> asyncio.Future:
+        """Future resolving with the params of the next matching event; register it before triggering the event."""
+        future = asyncio.get_running_loop().create_future()
+
+        def listener(params, event_session):
+            if (session_id is None or event_session == session_id) and not future.done():
+                future.set_result(params)
+
+        self.on(method, listener)
+        future.add_done_callback(lambda _: self._listeners[method].remove(listener))
+        return future
+
+    async def _read(self) -> None:
+        try:
+            async for raw in self.websocket:
+                message = json.loads(raw)
+                if "id" in message:
+                    future = self._pending.get(message["id"])
+                    if future and not future.done():
+                        future.set_result(message)
+                    continue
+                for callback in list(self._listeners.get(message.get("method"), [])):
+                    try:
+                        callback(message.get("params", {}), message.get("sessionId"))
+                    except Exception as e:
+                        logging.error(f"Error handling {message.get('method')}: {e}")
+        except Exception as e:
+            logging.debug(f"CDP connection closed: {e}")
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(CdpError("CDP connection closed"))
+
+    async def close(self) -> None:
+        if self._reader:
+            self._reader.cancel()
+        await self.websocket.close()
+
+
+class CdpTab:
+    """One page target attached over a shared CdpClient."""
+
+    def __init__(self, client: CdpClient, target_id: str, session_id: str):
+        self.client = client
+        self.target_id = target_id
+        self.session_id = session_id
+        self.url: Optional[str] = None
+
+    @classmethod
+    async def open(cls, client: CdpClient) -> "CdpTab":
+        target = await client.send("Target.createTarget", {"url": "about:blank"})
+        attached = await client.send("Target.attachToTarget", {"targetId": target["targetId"], "flatten": True})
+        tab = cls(client, target["targetId"], attached["sessionId"])
+        await tab.send("Page.enable")
+        return tab
+
+    async def send(self, method: str, params: Optional[Dict] = None, timeout: float = 30) -> Dict:
+        return await self.client.send(method, params, self.session_id, timeout)
+
+    async def navigate(self, url: str, timeout: float = 30) -> None:
+        """Load url and wait for its load event, so scripts never run against the previous document."""
+        loaded = self.client.wait_for("Page.loadEventFired", self.session_id)
+        await self.send("Page.navigate", {"url": url})
+        self.url = url
+        try:
+            await asyncio.wait_for(loaded, timeout)
+        except asyncio.TimeoutError:
+            logging.warning(f"Timed out waiting for {url} to load")
+
+    async def call(self, function: str, *args, timeout: float = 30):
+        """Call a JavaScript function source with JSON arguments, awaiting a returned promise."""
+        expression = f"({function})({', '.join(json.dumps(arg) for arg in args)})"
+        result = await self.send("Runtime.evaluate", {
+            "expression": expression,
+            "awaitPromise": True,
+            "returnByValue": True
+        }, timeout=timeout)
+        if "exceptionDetails" in result:
+            raise CdpError(result["exceptionDetails"].get("text", "script error"))
+        return result["result"].get("value")
+
+    async def close(self) -> None:
+        try:
+            await self.client.send("Target.closeTarget", {"targetId": self.target_id})
+        except CdpError:
+            pass
+
+
+class AsyncBeatportTrackFinder(BeatportTrackFinder):
+    """
+    BeatportTrackFinder that runs page ranges and the downloads page over CDP.
+
+    Browser start-up and login are inherited, so the GUI and CLI drive it
+    exactly like the Selenium engine. click_next_and_process then opens
+    `tabs` extra tabs in the same Chrome and hands each the next page number
+    from a shared queue; while one tab waits for rows to render or for a
+    popup, the others keep clicking. Download events arrive on the same
+    websocket and are routed to the tab whose frame started them.
+
+    Replay, API listing and sync runs are sequential by nature and are left
+    to the Selenium engine.
+    """
+
+    def __init__(self, *args, tabs: int = 3, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.tabs = max(1, tabs)
+
+    def click_next_and_process(self):
+        if self.replay_failures or self.use_api or self.sync_mode:
+            logging.info("Replay, API and sync runs use the Selenium engine")
+            return super().click_next_and_process()
+
+        try:
+            self.load_dedup_index()
+            self.start_direct_downloads()
+            if self.downloads_page_only:
+                asyncio.run(self._run(pages=[], check_downloads=True))
+            else:
+                pages = list(range(self.start_page, self.end_page + 1))
+                asyncio.run(self._run(pages=pages, check_downloads=self.check_downloads))
+        except Exception as e:
+            logging.error(f"Error in async engine: {e}")
+        finally:
+            self.finish_run()
+
+    def check_downloads_page(self):
+        try:
+            asyncio.run(self._run(pages=[], check_downloads=True))
+        except Exception as e:
+            logging.error(f"Error in check_downloads_page: {e}")
+
+    async def _run(self, pages: List[int], check_downloads: bool) -> None:
+        client = await CdpClient.connect(browser_websocket_url(self.driver))
+        # Browser-level download events replace the Selenium tab's performance log for this run
+        selenium_events, self.download_events = self.download_events, None
+        self._tab_listeners: Dict[str, DownloadEventListener] = {}
+        self._guid_listeners: Dict[str, DownloadEventListener] = {}
+        self._fallback_listener = self._new_listener()
+        tabs: List[CdpTab] = []
+        try:
+            await client.send("Browser.setDownloadBehavior", {
+                "behavior": "allow",
+                "downloadPath": os.path.abspath(self.download_location),
+                "eventsEnabled": True
+            })
+            for method in BROWSER_DOWNLOAD_EVENTS:
+                client.on(method, lambda params, _, method=method: self._route_download_event(method, params))
+
+            client.on("Network.responseReceived", lambda params, _: self._check_response(params))
+
+            for _ in range(max(1, min(self.tabs, len(pages)))):
+                tab = await CdpTab.open(client)
+                await tab.send("Network.enable")
+                self._tab_listeners[tab.target_id] = self._new_listener()
+                tabs.append(tab)
+
+            if pages:
+                queue = asyncio.Queue()
+                for page_number in pages:
+                    queue.put_nowait(page_number)
+                await asyncio.gather(*(self._tab_worker(tab, queue) for tab in tabs))
+
+            if check_downloads:
+                logging.info("\nChecking downloads page...")
+                await self._check_downloads_page(tabs[0])
+
+            await self._wait_until_idle(DOWNLOAD_IDLE_TIMEOUT)
+        finally:
+            for tab in tabs:
+                await tab.close()
+            await client.close()
+            self.download_events = selenium_events
+
+    def _new_listener(self) -> DownloadEventListener:
+        return DownloadEventListener(None, on_begin=self.on_download_begin, on_complete=self.on_download_complete)
+
+    def _route_download_event(self, method: str, params: Dict) -> None:
+        """Send a Browser.download* event to the listener of the tab that started the download."""
+        guid = params.get("guid")
+        if method.endswith("downloadWillBegin"):
+            listener = self._tab_listeners.get(params.get("frameId"), self._fallback_listener)
+            self._guid_listeners[guid] = listener
+        else:
+            listener = self._guid_listeners.get(guid)
+        if listener:
+            listener.apply({"method": method, "params": params})
+
+    def _check_response(self, params: Dict) -> None:
+        if is_throttle_response(params):
+            self.politeness.throttled("HTTP 429")
+
+    async def _pace(self, phase: str) -> None:
+        """Wait for the politeness budget without blocking the other tabs."""
+        await asyncio.sleep(self.politeness.reserve(phase))
+
+    async def _check_page_health(self, tab: CdpTab, row_count: int, page_number: int, url: str) -> None:
+        try:
+            banner = await tab.call("() => {%s}" % ERROR_BANNER_SCRIPT)
+        except CdpError as e:
+            logging.debug(f"Could not check for error banners: {e}")
+            banner = None
+        self.report_page_health(row_count, banner, page_number, url)
+
+    def _all_downloads(self) -> List[Dict]:
+        listeners = list(self._tab_listeners.values()) + [self._fallback_listener]
+        return [download for listener in listeners for download in listener.downloads.values()]
+
+    async def _wait_until_idle(self, timeout: float) -> None:
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            active = [d for d in self._all_downloads() if d["state"] == "inProgress" and not d["handed_off"]]
+            if not active:
+                return
+            await asyncio.sleep(0.5)
+        logging.warning(f"Downloads still in progress after {timeout:.0f}s")
+
+    async def _tab_worker(self, tab: CdpTab, queue: asyncio.Queue) -> None:
+        while not queue.empty() and not self.filter_limit_reached():
+            page_number = queue.get_nowait()
+            try:
+                await self._process_page_in_tab(tab, page_number)
+            except Exception as e:
+                logging.error(f"Error processing page {page_number}: {e}")
+
+    async def _process_page_in_tab(self, tab: CdpTab, page_number: int) -> None:
+        url = f"https://www.beatport.com/library?page={page_number}&per_page={API_PAGE_SIZE}"
+        await self._pace("page_load")
+        await tab.navigate(url)
+        rows = await tab.call(ROWS_SCRIPT, self.container_selectors(), ROW_WAIT_MS)
+        await self._check_page_health(tab, len(rows), page_number, url)
+        if not rows:
+            logging.error(f"No tracks found on page {page_number}")
+            return
+        logging.info(f"Page {page_number}: found {len(rows)} tracks")
+        self.mark_page_visited(url)
+
+        for row in rows:
+            if self.filter_limit_reached():
+                logging.info(f"Track filter limit of {self.track_filter.limit} reached")
+                return
+            # current_page is shared by all tabs; set it right before each synchronous record call
+            self.current_page = page_number
+            clicked = self.row_to_click(row, url)
+            if clicked:
+                await self._click_row(tab, clicked, clicked["name"], clicked["artist"], url)
+
+    async def _click_row(self, tab: CdpTab, row: Dict, name: str, artist: str, url: str) -> bool:
+        """Click a row's download button and confirm the popup, recording the outcome."""
+        page_number = self.current_page
+        listener = self._tab_listeners[tab.target_id]
+        track_id = row["track_id"]
+        await self._pace("download_start")
+        # Expect before clicking: the download can begin while we are still waiting on the popup
+        listener.expect(track_id)
+        try:
+            if not await tab.call(CLICK_ROW_SCRIPT, self.container_selectors(), row["index"]):
+                listener.forget(track_id)
+                self.current_page = page_number
+                self.record_failure(name, artist, "Download button not found", FailureReason.NO_BUTTON,
+                                    track_id, page_url=url)
+                return False
+            self.last_click_time = time.time()
+            await tab.call(POPUP_SCRIPT, POPUP_WAIT_MS)
+        except (CdpError, asyncio.TimeoutError) as e:
+            listener.forget(track_id)
+            self.current_page = page_number
+            reason_code = FailureReason.POPUP_TIMEOUT if isinstance(e, asyncio.TimeoutError) else FailureReason.CLICK_ERROR
+            self.record_failure(name, artist, f"Download button click failed: {e}", reason_code, track_id, page_url=url)
+            return False
+
+        self.current_page = page_number
+        self.record_success(None, name, "async_cdp", artist, track_id)
+        logging.info(f"[SUCCESS] Added to downloads: {name}")
+        return True
+
+    async def _check_downloads_page(self, tab: CdpTab) -> None:
+        """Click pending rows on the downloads page until they start downloading, backing off between rounds."""
+        scheduler = PendingRetryScheduler(max_rounds=5)
+        listener = self._tab_listeners[tab.target_id]
+        await self._pace("page_load")
+        await tab.navigate(DOWNLOADS_URL)
+
+        def row_key(row):
+            return row["track_id"] or f"{row['name']}|{row['artist']}"
+
+        def pending_keys(rows):
+            return {
+                row_key(r) for r in rows
+                if r["status"] == "Available for Download" and self.screen_row(r["name"], r["artist"], r["track_id"], r)
+            }
+
+        rows = await tab.call(ROWS_SCRIPT, self.container_selectors(), ROW_WAIT_MS)
+        if rows:
+            self.mark_page_visited(DOWNLOADS_URL)
+        pending = scheduler.update(pending_keys(rows))
+        logging.info(f"Found {len(pending)} tracks pending on downloads page")
+
+        while scheduler.should_continue():
+            for row in rows:
+                if row_key(row) in pending:
+                    await self._click_row(tab, row, row["name"] or "", row["artist"] or "", DOWNLOADS_URL)
+
+            deadline = time.time() + scheduler.next_delay()
+            while time.time() < deadline and not pending <= listener.started_track_ids():
+                await asyncio.sleep(0.25)
+            remaining = pending - listener.started_track_ids()
+            if remaining:
+                logging.info(f"{len(remaining)} clicks started no download, rechecking page")
+                await self._pace("page_load")
+                await tab.navigate(DOWNLOADS_URL)
+                rows = await tab.call(ROWS_SCRIPT, self.container_selectors(), ROW_WAIT_MS)
+                remaining = pending_keys(rows)
+            pending = scheduler.update(remaining)
+
+        if pending:
+            logging.warning(f"{len(pending)} tracks still pending after {scheduler.rounds} rounds")
+        logging.info("Download page processing complete")
@@ -0,0 +1,184 @@
+"""
+Daemon mode for the Beatport Auto Downloader.
+Keeps one logged-in browser warm, runs sync cycles on a jittered interval and serves a JSON status endpoint.
+"""
+
+import json
+import logging
+import random
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+from selenium.common.exceptions import WebDriverException
+
+# Beatport redirects to its login page when the session cookies are missing or expired
+LOGIN_PATH = "account/login"
+
+
+class LoginLost(Exception):
+    """The warm browser died and could not be brought back logged in."""
+
+
+class LastErrorHandler(logging.Handler):
+    """Remembers the most recent error logged anywhere in the process."""
+
+    def __init__(self):
+        super().__init__(level=logging.ERROR)
+        self.message: Optional[str] = None
+        self.time: Optional[str] = None
+
+    def emit(self, record):
+        self.message = record.getMessage()
+        self.time = datetime.fromtimestamp(record.created).isoformat()
+
+
+class StatusRequestHandler(BaseHTTPRequestHandler):
+    """Serves GET /status (and /) as JSON from the daemon attached to the server."""
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/status"):
+            self.send_error(404)
+            return
+        body = json.dumps(self.server.sync_daemon.status(), indent=2).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logging.debug(f"Status request: {format % args}")
+
+
+class SyncDaemon:
+    """
+    Runs BeatportTrackFinder sync passes forever over one browser session.
+
+    The finder is logged in once; each cycle resets its per-run state and
+    runs click_next_and_process again, so Chrome start-up and login are paid
+    once instead of every run. Cycles are spaced interval seconds apart,
+    randomized by +/- jitter (a fraction of the interval).
+    """
+
+    def __init__(self, finder, interval: float = 3600, jitter: float = 0.1,
+                 status_host: str = "127.0.0.1", status_port: Optional[int] = 8765):
+        self.finder = finder
+        self.interval = interval
+        self.jitter = jitter
+        self.status_host = status_host
+        self.status_port = status_port
+        self.state = "starting"
+        self.cycles = 0
+        self.started_at = datetime.now().isoformat()
+        self.last_cycle: Dict = {}
+        self.next_cycle_at: Optional[str] = None
+        self.errors = LastErrorHandler()
+        self.server: Optional[ThreadingHTTPServer] = None
+        self._stop = threading.Event()
+
+    def next_delay(self) -> float:
+        """Seconds until the next cycle, with jitter so runs don't land on the same minute every time."""
+        return max(0.0, self.interval * (1 + random.uniform(-self.jitter, self.jitter)))
+
+    def status(self) -> Dict:
+        return {
+            "state": self.state,
+            "started_at": self.started_at,
+            "cycles": self.cycles,
+            "last_cycle": self.last_cycle,
+            "next_cycle_at": self.next_cycle_at,
+            "last_error": self.errors.message,
+            "last_error_at": self.errors.time,
+            "progress": self.finder.progress_snapshot()
+        }
+
+    def serve_status(self) -> None:
+        """Start the status endpoint on a background thread."""
+        if self.status_port is None:
+            return
+        self.server = ThreadingHTTPServer((self.status_host, self.status_port), StatusRequestHandler)
+        self.server.sync_daemon = self
+        threading.Thread(target=self.server.serve_forever, name="status-server", daemon=True).start()
+        logging.info(f"Status endpoint at http://{self.status_host}:{self.server.server_address[1]}/status")
+
+    def ensure_browser(self) -> None:
+        """
+        Restart Chrome with the saved login if the warm session died between cycles.
+
+        Raises:
+            LoginLost: Chrome could not be restarted, or came back logged out
+        """
+        try:
+            self.finder.driver.current_url
+        except WebDriverException as e:
+            # Quits the dead driver and logs the new one in with the cookies saved below
+            if not self.finder.restart_browser(None, e):
+                raise LoginLost("Could not restart the browser") from e
+            if LOGIN_PATH in self.finder.driver.current_url:
+                raise LoginLost("Browser restarted but the login was not restored; log in again and restart the daemon")
+            return
+        # Keep the latest login for a restart if the browser dies before the next cycle
+        self.finder.save_session_cookies()
+
+    def run_cycle(self) -> None:
+        started = time.time()
+        before = self.finder.successful_downloads
+        self.state = "running"
+        try:
+            # A new cycle first, so the restart allowance and any downloads lost with the browser belong to it
+            self.finder.start_new_cycle()
+            self.ensure_browser()
+            self.finder.click_next_and_process()
+        except LoginLost as e:
+            # Later cycles would only fail the same way, so the daemon stops until someone logs in again
+            logging.error(f"Sync cycle failed, stopping the daemon: {e}")
+            self.state = "login_lost"
+            self.stop()
+        except Exception as e:
+            logging.error(f"Sync cycle failed: {e}")
+        finally:
+            self.cycles += 1
+            self.last_cycle = {
+                "finished_at": datetime.now().isoformat(),
+                "duration": round(time.time() - started, 1),
+                "downloads_added": self.finder.successful_downloads - before,
+                "failed_downloads": len(self.finder.failed_downloads),
+                "sync_completed": self.finder.sync_reached
+            }
+            if self.state == "running":
+                self.state = "idle"
+
+    def run_forever(self) -> None:
+        """Run cycles until stop() is called or the process is interrupted."""
+        logging.getLogger().addHandler(self.errors)
+        self.serve_status()
+        try:
+            while not self._stop.is_set():
+                self.run_cycle()
+                if self._stop.is_set():
+                    break
+                delay = self.next_delay()
+                self.next_cycle_at = datetime.fromtimestamp(time.time() + delay).isoformat()
+                logging.info(f"Next sync cycle at {self.next_cycle_at}")
+                self._stop.wait(delay)
+        except KeyboardInterrupt:
+            logging.info("Interrupted, shutting down")
+        finally:
+            self.shutdown()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def shutdown(self) -> None:
+        # A lost login stays visible in the final state
+        if self.state != "login_lost":
+            self.state = "stopped"
+        logging.getLogger().removeHandler(self.errors)
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+        if self.finder.driver:
+            self.finder.driver.quit()
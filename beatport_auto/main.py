@@ -19,6 +19,70 @@ from selenium.common.exceptions import NoSuchElementException, TimeoutException,
 from pathlib import Path  # For more robust path handling
 import json  # For handling selectors.json file
 import re
+import multiprocessing
+import argparse
+import shlex
+from urllib.parse import parse_qs, urlsplit
+from beatport_auto.utils.retry_scheduler import PendingRetryScheduler
+from beatport_auto.utils.failures import (
+    FailedDownloadsQueue, FailureLog, FailureReason, FailureRecord, classify_exception, classify_status, page_key,
+    replay_key
+)
+from beatport_auto.utils.run_report import RunReportWriter
+from beatport_auto.utils.selector_manager import SelectorsManager
+from beatport_auto.utils.selector_stats import PopupPresenceStore
+from beatport_auto.utils.api_client import BeatportApiClient, copy_driver_session, create_session
+from beatport_auto.utils.download_events import DownloadEventListener, enable_performance_log
+from beatport_auto.utils.http_downloader import DownloadJob, HttpDownloader
+from beatport_auto.utils.library_organizer import LibraryOrganizer
+from beatport_auto.utils.dedup_index import DedupIndex
+from beatport_auto.utils.track_filter import FILTER_HELP, TrackFilter
+from beatport_auto.utils.sync_state import SyncState
+from beatport_auto.utils.page_scripts import POPUP_WATCH_FUNCTIONS, ROW_DETAILS_FUNCTION
+from beatport_auto.utils.layout_profile import LayoutProfile, detect_layout
+from beatport_auto.utils.click_executor import CLICKED, MISSING, POPUP, ClickExecutor
+from beatport_auto.utils.diagnostics import DIAGNOSTICS_DIRNAME, DiagnosticsStore, FailureRateTrigger, capture_page
+from beatport_auto.utils.rate_limiter import PolitenessBudget, parse_budgets
+from beatport_auto.utils.browser_session import (
+    MemoryWatchdog, SessionLost, is_session_lost, restore_cookies, snapshot_cookies
+)
+from beatport_auto.daemon import SyncDaemon
+from beatport_auto.multi_account import AccountRunner, load_accounts
+
+# Page size used for both API listings and library URLs so page numbers line up
+API_PAGE_SIZE = 100
+DOWNLOAD_IDLE_TIMEOUT = 600  # Seconds to wait for in-progress browser downloads before quitting
+SYNC_MAX_PAGES = 1000  # Page cap for a sync without an end page, e.g. the first full sync
+MAX_SESSION_RESTARTS = 3  # Browser restarts allowed per run after the WebDriver session dies
+SESSION_RESTART_DELAY = 5  # Seconds before the first restart, growing with each one
+ENGINES = ["selenium", "tabs", "async"]  # One tab, a tab pool in this browser, or CDP tabs driven by asyncio
+
+# Reads a library row's label, genre, key, BPM and date cells in a single round trip
+ROW_DETAILS_SCRIPT = ROW_DETAILS_FUNCTION + "return rowDetails(arguments[0]);"
+
+# Popup detection: a MutationObserver armed before each click, awaited for a short deadline after it
+ARM_POPUP_WATCH_SCRIPT = POPUP_WATCH_FUNCTIONS + "armPopupWatch();"
+AWAIT_POPUP_SCRIPT = POPUP_WATCH_FUNCTIONS + "awaitPopup(arguments[0], arguments[arguments.length - 1]);"
+CLICK_POPUP_SCRIPT = POPUP_WATCH_FUNCTIONS + """
+const button = findPopupButton();
+if (button) button.click();
+return Boolean(button);
+"""
+POPUP_WAIT = 1.5  # Seconds a click may take to open its download popup
+POPUP_ABSENT_WAIT = 0.2  # Wait once a layout has gone POPUP_LEARN_CLICKS clicks without a popup
+POPUP_LEARN_CLICKS = 20
+POPUP_PROBE_CLICKS = 25  # Short waits before one click waits the full POPUP_WAIT, so a returning popup is noticed
+CLICK_BATCH_SIZE = 5  # Rows clicked per injected script once a layout has stopped showing popups
+
+# Text of a rate-limit or error banner on the page, or null
+ERROR_BANNER_SCRIPT = """
+const pattern = /too many requests|rate limit|slow down|something went wrong|try again later/i;
+for (const el of document.querySelectorAll("[role='alert'], [class*='error' i], [class*='Error'], h1, h2")) {
+    const text = el.textContent.trim();
+    if (text && text.length < 300 && pattern.test(text)) return text;
+}
+return pattern.test(document.title) ? document.title : null;
+"""
 
 class QueueHandler(logging.Handler):
     def __init__(self, log_queue):
@@ -28,204 +92,6 @@ class QueueHandler(logging.Handler):
     def emit(self, record):
         self.log_queue.put(self.format(record))
 
-class SelectorsManager:
-    """Manages selectors with learning capabilities to adapt to website changes"""
-    
-    def __init__(self):
-        self.selectors = self.load_selectors()
-        self.selector_stats = {"hits": {}, "misses": {}}
-        self.save_path = "selectors.json"
-        
-    def load_selectors(self):
-        """Load selectors from JSON file with fallback defaults"""
-        try:
-            if os.path.exists('selectors.json'):
-                with open('selectors.json', 'r') as f:
-                    logging.info("Loaded selectors from selectors.json")
-                    return json.load(f)
-            else:
-                logging.warning("selectors.json not found, using default selectors")
-                # Basic default selectors if file doesn't exist
-                return {
-                    "track_containers": [
-                        "[data-testid='library-tracks-table-row']", 
-                        "[data-testid='tracks-list-item']"
-                    ],
-                    "track_name": [
-                        "[data-testid='track-title']",
-                        ".Tables-shared-style__ReleaseName-sc-792178d5-4",
-                        ".TracksList-style__TrackName-sc-921ce1b-0"
-                    ],
-                    "artist_name": [
-                        "[data-testid='artist-name']",
-                        "a[href*='/artist/']"
-                    ],
-                    "download_button": [
-                        "svg[data-testid='icon-re-download']",
-                        "svg path[stroke='#39C0DE']"
-                    ],
-                    "pagination": [
-                        "[data-testid='pagination-container']"
-                    ],
-                    "next_button": [
-                        "a[data-testid='pagination-next']",
-                        "a:has(span:contains('Next'))"
-                    ],
-                    "popup_download_button": [
-                        "//button[contains(text(), 'Download') or .//span[contains(text(), 'Download')]]"
-                    ]
-                }
-        except Exception as e:
-            logging.error(f"Error loading selectors: {e}")
-            return {}
-    
-    def update_selector_stats(self, selector_type, selector, success):
-        """Track which selectors work and which don't"""
-        if success:
-            if selector_type not in self.selector_stats["hits"]:
-                self.selector_stats["hits"][selector_type] = {}
-            if selector not in self.selector_stats["hits"][selector_type]:
-                self.selector_stats["hits"][selector_type][selector] = 0
-            self.selector_stats["hits"][selector_type][selector] += 1
-        else:
-            if selector_type not in self.selector_stats["misses"]:
-                self.selector_stats["misses"][selector_type] = {}
-            if selector not in self.selector_stats["misses"][selector_type]:
-                self.selector_stats["misses"][selector_type][selector] = 0
-            self.selector_stats["misses"][selector_type][selector] += 1
-    
-    def find_element_with_learning(self, driver, selector_type, context_element=None, multiple=True, wait=None):
-        """Find element(s) with automatic selector learning"""
-        if selector_type not in self.selectors:
-            logging.warning(f"No selectors defined for {selector_type}")
-            return [] if multiple else None
-        
-        # Try selectors in order (with the most successful ones first)
-        successful_selector = None
-        elements = []
-        
-        for selector in self.selectors[selector_type]:
-            try:
-                # Try CSS selector first
-                try:
-                    if context_element:
-                        if multiple:
-                            found_elements = context_element.find_elements(By.CSS_SELECTOR, selector)
-                        else:
-                            found_element = context_element.find_element(By.CSS_SELECTOR, selector)
-                            found_elements = [found_element] if found_element else []
-                    elif wait:
-                        if multiple:
-                            wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
-                            found_elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                        else:
-                            found_element = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
-                            found_elements = [found_element] if found_element else []
-                    else:
-                        if multiple:
-                            found_elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                        else:
-                            found_element = driver.find_element(By.CSS_SELECTOR, selector)
-                            found_elements = [found_element] if found_element else []
-                except Exception:
-                    # If CSS selector fails, try XPath
-                    try:
-                        if context_element:
-                            if multiple:
-                                found_elements = context_element.find_elements(By.XPATH, selector)
-                            else:
-                                found_element = context_element.find_element(By.XPATH, selector)
-                                found_elements = [found_element] if found_element else []
-                        elif wait:
-                            if multiple:
-                                wait.until(EC.presence_of_element_located((By.XPATH, selector)))
-                                found_elements = driver.find_elements(By.XPATH, selector)
-                            else:
-                                found_element = wait.until(EC.presence_of_element_located((By.XPATH, selector)))
-                                found_elements = [found_element] if found_element else []
-                        else:
-                            if multiple:
-                                found_elements = driver.find_elements(By.XPATH, selector)
-                            else:
-                                found_element = driver.find_element(By.XPATH, selector)
-                                found_elements = [found_element] if found_element else []
-                    except Exception:
-                        found_elements = []
-                
-                # Only count visible elements
-                visible_elements = [e for e in found_elements if e.is_displayed()]
-                
-                if visible_elements:
-                    successful_selector = selector
-                    elements = visible_elements
-                    self.update_selector_stats(selector_type, selector, True)
-                    
-                    # If we found elements, rearrange the selectors to put this one first
-                    if successful_selector != self.selectors[selector_type][0]:
-                        self.selectors[selector_type].remove(successful_selector)
-                        self.selectors[selector_type].insert(0, successful_selector)
-                        self.save_selectors()  # Save updated selectors
-                    
-                    break
-                else:
-                    self.update_selector_stats(selector_type, selector, False)
-            except Exception as e:
-                self.update_selector_stats(selector_type, selector, False)
-                logging.debug(f"Selector failed: {selector} - {str(e)}")
-        
-        if not elements:
-            logging.debug(f"No elements found for selector type: {selector_type}")
-            
-        return elements if multiple else (elements[0] if elements else None)
-                
-    def save_selectors(self):
-        """Save updated selectors to JSON file"""
-        try:
-            # Only save if we've made changes
-            with open(self.save_path, 'w') as f:
-                json.dump(self.selectors, f, indent=2)
-            logging.debug("Saved updated selectors")
-        except Exception as e:
-            logging.error(f"Error saving selectors: {e}")
-    
-    def add_selector(self, selector_type, new_selector):
-        """Add a new selector that was found to work"""
-        if selector_type not in self.selectors:
-            self.selectors[selector_type] = []
-        
-        if new_selector not in self.selectors[selector_type]:
-            self.selectors[selector_type].insert(0, new_selector)
-            self.save_selectors()
-            logging.info(f"Added new working selector for {selector_type}: {new_selector}")
-    
-    def verify_selectors_health(self, driver, wait):
-        """Test if critical selectors still work and log warnings for broken ones"""
-        try:
-            logging.info("Running selector health check...")
-            working_selectors = {}
-            broken_selectors = {}
-            
-            # Test track container selectors
-            for selector_type in ["track_containers", "track_name", "artist_name", "download_button"]:
-                elements = self.find_element_with_learning(driver, selector_type, wait=wait)
-                if elements:
-                    working_selectors[selector_type] = True
-                else:
-                    broken_selectors[selector_type] = True
-            
-            # Log results
-            if broken_selectors:
-                logging.warning("Some selectors appear to be broken and need updating:")
-                for key in broken_selectors:
-                    logging.warning(f"- {key}: No working selectors found")
-            else:
-                logging.info("All selectors appear to be healthy")
-                
-            return len(broken_selectors) == 0
-        except Exception as e:
-            logging.error(f"Error during selector health check: {e}")
-            return False
-
 class BeatportUI:
     def __init__(self):
         self.window = tk.Tk()
@@ -293,6 +159,28 @@ class BeatportUI:
         self.check_downloads.pack(pady=2)
         self.check_downloads.insert(0, "y")
         
+        ttk.Label(middle_frame, text="Folder Scheme:").pack(pady=2)
+        self.organize_scheme = ttk.Entry(middle_frame, width=20)
+        self.organize_scheme.pack(pady=2)
+        self.organize_scheme.insert(0, "{artist}")
+        
+        ttk.Label(middle_frame, text="Extra Library Folders (; separated):").pack(pady=2)
+        self.library_roots = ttk.Entry(middle_frame, width=20)
+        self.library_roots.pack(pady=2)
+        
+        ttk.Label(middle_frame, text="Track Filter (e.g. genre:house bpm:120-128):").pack(pady=2)
+        self.track_filter = ttk.Entry(middle_frame, width=20)
+        self.track_filter.pack(pady=2)
+        
+        ttk.Label(middle_frame, text="Politeness Budget (actions/s, e.g. click=2):").pack(pady=2)
+        self.budget = ttk.Entry(middle_frame, width=20)
+        self.budget.pack(pady=2)
+        
+        ttk.Label(middle_frame, text="Page Engine (page ranges):").pack(pady=2)
+        self.engine = ttk.Combobox(middle_frame, values=ENGINES, state="readonly", width=17)
+        self.engine.set(ENGINES[0])
+        self.engine.pack(pady=2)
+        
         # Right column
         right_frame = ttk.Frame(self.input_frame)
         right_frame.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
@@ -317,6 +205,36 @@ class BeatportUI:
         ttk.Checkbutton(right_frame, text="Process Downloads Page Only (Skip Library Pages)", 
                        variable=self.downloads_page_only).pack(pady=5)
         
+        # Replay Failed Downloads checkbox
+        self.replay_failures = tk.BooleanVar(value=False)
+        ttk.Checkbutton(right_frame, text="Replay Failed Downloads From Last Run", 
+                       variable=self.replay_failures).pack(pady=5)
+        
+        # Fast API scanning checkbox
+        self.use_api = tk.BooleanVar(value=False)
+        ttk.Checkbutton(right_frame, text="Use Fast API Scanning (100 tracks per page)", 
+                       variable=self.use_api).pack(pady=5)
+        
+        # Direct HTTP downloads checkbox
+        self.direct_download = tk.BooleanVar(value=False)
+        ttk.Checkbutton(right_frame, text="Download Files Directly (Pooled HTTP)", 
+                       variable=self.direct_download).pack(pady=5)
+        
+        # Organize finished files checkbox
+        self.organize_files = tk.BooleanVar(value=False)
+        ttk.Checkbutton(right_frame, text="Organize Finished Files Into Folder Scheme", 
+                       variable=self.organize_files).pack(pady=5)
+        
+        # Local library duplicate check checkbox
+        self.check_local_library = tk.BooleanVar(value=False)
+        ttk.Checkbutton(right_frame, text="Skip Tracks Already In Local Library", 
+                       variable=self.check_local_library).pack(pady=5)
+        
+        # Incremental sync checkbox
+        self.sync_mode = tk.BooleanVar(value=False)
+        ttk.Checkbutton(right_frame, text="Sync New Tracks Since Last Run (Ignores Page Range)", 
+                       variable=self.sync_mode).pack(pady=5)
+        
         # Start Button
         ttk.Button(right_frame, text="Start Processing", 
                   command=self.start_processing).pack(pady=5)
@@ -385,13 +303,19 @@ class BeatportUI:
             with open(filepath, 'w', encoding='utf-8') as f:
                 f.write("Failed Downloads Report\n")
                 f.write("=" * 50 + "\n\n")
-                f.write(f"Total Failed Downloads: {len(self.finder.failed_downloads)}\n\n")
+                f.write(f"Total Failed Downloads: {len(self.finder.failed_downloads)}\n")
+                for reason_code, count in self.finder.failed_downloads.counts.most_common():
+                    f.write(f"  {reason_code}: {count}\n")
+                f.write("\n")
                 
+                # Records are streamed back from the run's spool file rather than held in memory
                 for track in self.finder.failed_downloads:
-                    f.write(f"Track: {track['name']}\n")
-                    f.write(f"Artist: {track['artist']}\n")
-                    f.write(f"Reason: {track['reason']}\n")
-                    f.write(f"Page: {track['page']}\n")
+                    f.write(f"Track: {track.name}\n")
+                    f.write(f"Artist: {track.artist}\n")
+                    f.write(f"Reason: {track.reason}\n")
+                    f.write(f"Reason Code: {track.reason_code or ''}\n")
+                    f.write(f"Track ID: {track.track_id or ''}\n")
+                    f.write(f"Page: {track.page}\n")
                     f.write("-" * 50 + "\n")
 
             logging.info(f"Failed downloads report saved to: {filepath}")
@@ -402,8 +326,15 @@ class BeatportUI:
 
     def validate_inputs(self):
         try:
-            # If "Process Downloads Page Only" is checked, we don't need to validate start and end pages
-            if self.downloads_page_only.get():
+            TrackFilter.parse(self.track_filter.get())
+            parse_budgets(self.budget.get())
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return False
+
+        try:
+            # If "Process Downloads Page Only", replay or sync is checked, we don't need to validate start and end pages
+            if self.downloads_page_only.get() or self.replay_failures.get() or self.sync_mode.get():
                 check_downloads = self.check_downloads.get().lower()
                 download_location = self.download_location.get()
                 
@@ -446,8 +377,8 @@ class BeatportUI:
                 return True
 
         except ValueError:
-            # If "Process Downloads Page Only" is checked, we don't need to validate start and end pages
-            if self.downloads_page_only.get():
+            # If "Process Downloads Page Only", replay or sync is checked, we don't need to validate start and end pages
+            if self.downloads_page_only.get() or self.replay_failures.get() or self.sync_mode.get():
                 # Re-run validation without checking start/end pages
                 return self.validate_inputs()
             else:
@@ -464,24 +395,43 @@ class BeatportUI:
 
     def process_in_thread(self):
         try:
-            # If downloads_page_only is checked, we don't need start_page and end_page
-            if self.downloads_page_only.get():
-                self.finder = BeatportTrackFinder(
+            finder_class = finder_class_for(self.engine.get())
+            # If downloads_page_only, replay or sync is checked, we don't need start_page and end_page
+            if self.downloads_page_only.get() or self.replay_failures.get() or self.sync_mode.get():
+                self.finder = finder_class(
                     1,  # Default value for start_page
-                    1,  # Default value for end_page
+                    None if self.sync_mode.get() else 1,  # Sync runs until it reaches already synced tracks
                     self.check_downloads.get().lower() == 'y',
                     self.download_location.get(),
                     self.multiple_downloads.get(),
-                    self.downloads_page_only.get()
+                    self.downloads_page_only.get(),
+                    self.replay_failures.get(),
+                    self.use_api.get(),
+                    self.direct_download.get(),
+                    self.organize_scheme.get() if self.organize_files.get() else None,
+                    self.check_local_library.get(),
+                    [root.strip() for root in self.library_roots.get().split(';') if root.strip()],
+                    TrackFilter.parse(self.track_filter.get()) if self.track_filter.get().strip() else None,
+                    self.sync_mode.get(),
+                    politeness=PolitenessBudget(parse_budgets(self.budget.get()))
                 )
             else:
-                self.finder = BeatportTrackFinder(
+                self.finder = finder_class(
                     int(self.start_page.get()),
                     int(self.end_page.get()),
                     self.check_downloads.get().lower() == 'y',
                     self.download_location.get(),
                     self.multiple_downloads.get(),
-                    self.downloads_page_only.get()
+                    self.downloads_page_only.get(),
+                    self.replay_failures.get(),
+                    self.use_api.get(),
+                    self.direct_download.get(),
+                    self.organize_scheme.get() if self.organize_files.get() else None,
+                    self.check_local_library.get(),
+                    [root.strip() for root in self.library_roots.get().split(';') if root.strip()],
+                    TrackFilter.parse(self.track_filter.get()) if self.track_filter.get().strip() else None,
+                    self.sync_mode.get(),
+                    politeness=PolitenessBudget(parse_budgets(self.budget.get()))
                 )
             
             self.window.after(0, self.show_continue_button)
@@ -509,26 +459,86 @@ class BeatportUI:
 
     def disable_inputs(self):
         for widget in [self.start_page, self.end_page, self.check_downloads, 
-                      self.download_location]:
+                      self.download_location, self.organize_scheme, self.library_roots, self.track_filter,
+                      self.budget, self.engine]:
             widget.configure(state='disabled')
 
     def enable_inputs(self):
         for widget in [self.start_page, self.end_page, self.check_downloads, 
-                      self.download_location]:
+                      self.download_location, self.organize_scheme, self.library_roots, self.track_filter,
+                      self.budget]:
             widget.configure(state='normal')
+        # The engine list only offers its choices, it never takes typed text
+        self.engine.configure(state='readonly')
         if self.finder and self.finder.failed_downloads:
             self.save_report_button.pack(pady=5)
 
 class BeatportTrackFinder:
-    def __init__(self, start_page, end_page, check_downloads, download_location, multiple_downloads, downloads_page_only=False):
+    def __init__(self, start_page, end_page, check_downloads, download_location, multiple_downloads, downloads_page_only=False,
+                 replay_failures=False, use_api=False, direct_download=False, organize_scheme=None,
+                 check_local_library=False, library_roots=None, track_filter=None, sync_mode=False,
+                 profile_dir=None, download_throughput=None, politeness=None,
+                 memory_watchdog=None):
         self.start_page = start_page
         self.end_page = end_page
         self.check_downloads = check_downloads
         self.download_location = download_location
         self.multiple_downloads = multiple_downloads
         self.downloads_page_only = downloads_page_only
+        self.replay_failures = replay_failures
+        self.use_api = use_api
+        self.direct_download = direct_download
+        self.organize_scheme = organize_scheme  # Folder scheme for finished files, None leaves them in place
+        self.check_local_library = check_local_library
+        self.library_roots = list(library_roots or [])  # Extra folders checked for tracks we already have
+        self.dedup_index = None
+        self.duplicate_count = 0
+        self.screened_rows = {}  # Row key -> whether this run clicks it, so rows seen again are recorded once
+        self.track_filter = track_filter  # TrackFilter applied to rows before clicking, None accepts all
+        self.filtered_count = 0
+        # Sync mode walks from page 1 until it reaches tracks seen by the last completed sync
+        self.sync_mode = sync_mode
+        self.sync_state = SyncState(os.path.join(download_location, 'sync_state.json')) if sync_mode else None
+        self.sync_reached = False
+        self.rows_on_page = 0
+        self.last_library_page = None  # First page seen with fewer rows than its per_page; later pages are empty
+        # Isolation and throttling used when several accounts run side by side
+        self.profile_dir = profile_dir  # Chrome user data dir, keeps this account's login between runs
+        # Best-effort bytes/s cap on this browser's page traffic through CDP network emulation
+        self.download_throughput = download_throughput
+        # Paces page loads, clicks and download starts, slowing down when the site shows signs of throttling
+        self.politeness = politeness or PolitenessBudget()
+        # Recycles the browser between pages once it has grown past its memory limits
+        self.memory_watchdog = memory_watchdog or MemoryWatchdog()
+        self.browser_recycles = 0
+        # Where a crashed browser resumes: the current page's URL, its finished rows and the last known login
+        self.page_url = None
+        self.rows_done = 0
+        self.session_cookies = None
+        self.session_restarts = 0
+        if sync_mode:
+            self.start_page = 1
+            self.end_page = end_page or SYNC_MAX_PAGES
+        self.http_downloader = None
+        self.download_events = None
+        self.api_client = None
+        self.api_tracks = None
         self.successful_downloads = 0
-        self.failed_downloads = []
+        # Failure counts stay in memory; the records themselves spill to disk as they happen
+        self.failed_downloads = FailureLog(os.path.join(download_location, 'failed_downloads.spool.jsonl'))
+        self.failures_queue = FailedDownloadsQueue(os.path.join(download_location, 'failed_downloads.json'))
+        self.visited_pages = set()  # page_key()s of the pages this run read rows from
+        self.report = RunReportWriter(download_location)
+        # Screenshots and page source are captured when failures pile up and written off the hot path
+        self.diagnostics = DiagnosticsStore(os.path.join(download_location, DIAGNOSTICS_DIRNAME))
+        self.failure_trigger = FailureRateTrigger()
+        self.last_click_time = None
+        self.popup_watch_armed = False
+        self.short_popup_waits = {}  # Layout -> clicks given only POPUP_ABSENT_WAIT since the last full-length wait
+        self.popup_stats = PopupPresenceStore()  # Whether each layout shows popups, learned across runs
+        self.layout_type = None  # Layout of the rows on the current page, 'large' or 'small'
+        self.layout = None  # LayoutProfile of the current page
+        self.layout_profiles = {}  # Resolved profiles by (layout, window size), reused across pages
         self.current_page = 1
         self.driver = None
         self.wait = None
@@ -536,7 +546,7 @@ class BeatportTrackFinder:
         # Initialize selector manager for resilient element selection
         self.selector_manager = SelectorsManager()
         
-    def initialize_browser(self):
+    def initialize_browser(self, cookies=None):
         chrome_options = Options()
         chrome_options.add_argument("--window-size=1920,1080")
         chrome_options.add_argument("--disable-notifications")
@@ -563,14 +573,38 @@ class BeatportTrackFinder:
         chrome_options.add_argument("--disable-popup-blocking")
         chrome_options.add_argument("--disable-notifications")
         
+        # Download events are read from the performance log to tie each click to its file
+        enable_performance_log(chrome_options)
+        
+        if self.profile_dir:
+            chrome_options.add_argument(f"--user-data-dir={os.path.abspath(self.profile_dir)}")
+        
         self.driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), 
                                      options=chrome_options)
         
         params = {'behavior': 'allow', 'downloadPath': self.download_location}
         self.driver.execute_cdp_cmd('Page.setDownloadBehavior', params)
+        if self.download_throughput:
+            self.driver.execute_cdp_cmd('Network.enable', {})
+            self.driver.execute_cdp_cmd('Network.emulateNetworkConditions', {
+                'offline': False,
+                'latency': 0,
+                'downloadThroughput': self.download_throughput,
+                'uploadThroughput': -1
+            })
+        self.download_events = DownloadEventListener(
+            self.driver,
+            on_begin=self.on_download_begin,
+            on_complete=self.on_download_complete,
+            on_throttle=lambda url: self.politeness.throttled("HTTP 429")
+        )
         
         self.wait = WebDriverWait(self.driver, 20)
         
+        # A restarted browser gets the previous session's login before it opens any page
+        if cookies:
+            restore_cookies(self.driver, cookies)
+        
         # Open directly to downloads page if downloads_page_only is enabled
         if self.downloads_page_only:
             logging.info("Opening directly to downloads page (Downloads Page Only mode)")
@@ -605,18 +639,88 @@ class BeatportTrackFinder:
                 self.driver.get("https://www.beatport.com/library")
                 logging.info("Navigated to Library page")
             
-            # Allow time for the page to load
-            time.sleep(3)
+            self.pace('page_load')
             return True
         except Exception as e:
             logging.error(f"Error navigating to library: {e}")
             return False
 
     def handle_download_popup(self):
-        """Handle any download popups that appear after clicking download"""
+        """Confirm the download popup if the last click opened one"""
+        if self.popup_watch_armed:
+            self.popup_watch_armed = False
+            seen = self.wait_for_popup()
+            if seen is False:
+                return False
+            if seen:
+                return self.confirm_popup()
+        # The watcher wasn't armed or didn't recognize the popup's button
+        return self.find_popup_with_selectors()
+
+    def confirm_popup(self):
+        """Click the download button of a popup that is known to be open"""
+        self.pace('click')
+        try:
+            if self.driver.execute_script(CLICK_POPUP_SCRIPT):
+                logging.info("Clicked download button in popup")
+                return True
+        except Exception as e:
+            logging.debug(f"Could not click the popup's download button: {e}")
+        return self.find_popup_with_selectors()
+
+    def arm_popup_watch(self):
+        """Start watching for a popup just before a click, so one that renders quickly is not missed"""
+        try:
+            self.driver.execute_script(ARM_POPUP_WATCH_SCRIPT)
+            self.popup_watch_armed = True
+        except Exception as e:
+            logging.debug(f"Could not arm the popup watcher: {e}")
+            self.popup_watch_armed = False
+
+    def popup_wait(self, layout):
+        """
+        Seconds to wait for a popup; short once the layout has gone many clicks without one.
+
+        A popup slower than the short wait would be recorded as absent and the
+        layout would never relearn it, so after every POPUP_PROBE_CLICKS short
+        waits one click waits the full POPUP_WAIT again.
+        """
+        if (self.popup_stats.absent_since_seen(layout) >= POPUP_LEARN_CLICKS
+                and self.short_popup_waits.get(layout, 0) < POPUP_PROBE_CLICKS):
+            return POPUP_ABSENT_WAIT
+        return POPUP_WAIT
+
+    def record_popup_presence(self, layout, seen, wait):
+        """Learn whether the layout shows popups, counting short waits towards the next full-length probe"""
+        self.popup_stats.record(layout, seen)
+        if wait == POPUP_ABSENT_WAIT:
+            self.short_popup_waits[layout] = self.short_popup_waits.get(layout, 0) + 1
+        else:
+            self.short_popup_waits[layout] = 0
+
+    def wait_for_popup(self):
+        """
+        Await the armed popup watcher and learn whether this layout shows popups.
+
+        Returns:
+            Whether a popup with a download button appeared, or None when the watcher could not be read
+        """
+        layout = self.layout_type or 'unknown'
+        wait = self.popup_wait(layout)
+        try:
+            seen = self.driver.execute_async_script(AWAIT_POPUP_SCRIPT, int(wait * 1000))
+        except Exception as e:
+            logging.debug(f"Popup watcher failed: {e}")
+            return None
+        if seen is None:
+            return None
+        self.record_popup_presence(layout, seen, wait)
+        return seen
+
+    def find_popup_with_selectors(self):
+        """Slow path: look for a popup's download button with the learned selectors and fallback scans"""
         try:
-            # Wait a moment for any popup to appear
-            time.sleep(1)
+            self.pace('click')
             
             # Use selector manager to find the "Download" button in popups
             popup_buttons = self.selector_manager.find_element_with_learning(
@@ -702,12 +806,9 @@ class BeatportTrackFinder:
             )
             
             if track_containers:
-                # Determine layout type based on attributes of the found elements
-                sample = track_containers[0]
-                if 'library-tracks-table-row' in sample.get_attribute('data-testid') or 'table' in sample.get_attribute('class').lower():
-                    layout_type = 'large'
-                else:
-                    layout_type = 'small'
+                # Determine the layout once per page; row lookups then go through its profile
+                layout_type = detect_layout(track_containers[0])
+                self.use_layout_profile(layout_type)
                     
                 logging.info(f"Found {len(track_containers)} track containers using {layout_type} screen layout")
                 return track_containers, layout_type
@@ -720,7 +821,32 @@ class BeatportTrackFinder:
             traceback.print_exc()  # More detailed error tracking
             return [], None
 
-    def download_tracks_from_page(self):
+    def use_layout_profile(self, layout_type):
+        """Switch to the profile for this layout and window size, creating it on first use"""
+        try:
+            size = self.driver.get_window_size()
+            window_size = (size['width'], size['height'])
+        except Exception:
+            window_size = None
+        key = (layout_type, window_size)
+        if key not in self.layout_profiles:
+            self.layout_profiles[key] = LayoutProfile(layout_type, window_size)
+        self.layout = self.layout_profiles[key]
+        self.layout_type = layout_type
+        return self.layout
+
+    def layout_for(self, layout_type):
+        """The current page's layout profile, or the profile of another layout a caller names"""
+        if self.layout and self.layout.name == layout_type:
+            return self.layout
+        return self.use_layout_profile(layout_type)
+
+    def find_in_row(self, track, selector_type, layout_type):
+        """Find a part of a row with the selector the layout profile has pinned for it"""
+        return self.layout_for(layout_type).find(self.selector_manager, track, selector_type)
+
+    def download_tracks_from_page(self, pending_keys=None):
+        """Download every available track on the page, or only the rows in pending_keys"""
         try:
             # Wait for track containers to be present
             self.wait.until(
@@ -737,14 +863,26 @@ class BeatportTrackFinder:
                 return False
                 
             logging.info(f"Found {len(track_containers)} tracks to download (layout: {layout_type})")
+            self.mark_page_visited(self.driver.current_url)
 
             for index, track in enumerate(track_containers, 1):
                 try:
+                    track_id = self.extract_track_id(track)
+                    track_name = self.extract_track_name(track, layout_type)
+                    artist_name = self.extract_artist_name(track, layout_type)
+                    if pending_keys is not None:
+                        # Pending keys come from find_pending_track_keys, which has screened them
+                        if (track_id or f"{track_name}|{artist_name}") not in pending_keys:
+                            continue
+                    elif not self.screen_row(track_name, artist_name, track_id, lambda: self.build_track_record(
+                            track, track_name, artist_name, track_id)):
+                        continue
+
                     # Use different approaches based on layout type
                     if layout_type == "small":
-                        success = self.download_track_small_layout(track, index)
+                        success = self.download_track_small_layout(track, index, track_name, artist_name, track_id)
                     else:
-                        success = self.download_track_large_layout(track, index)
+                        success = self.download_track_large_layout(track, index, track_name, artist_name, track_id)
                         
                     if success:
                         continue
@@ -758,16 +896,12 @@ class BeatportTrackFinder:
                         
                         if download_buttons:
                             download_button = download_buttons[0]
-                            self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", download_button)
-                            time.sleep(0.5)
-                            self.driver.execute_script("arguments[0].click();", download_button)
+                            self.click_element(download_button, track_id)
                             
                             self.handle_download_popup()
                             
-                            track_name = self.extract_track_name(track, layout_type)
                             logging.info(f"Started download for: {track_name} (using XPath method)")
-                            self.successful_downloads += 1
-                            time.sleep(1)
+                            self.record_success(track, track_name, "xpath", artist_name, track_id)
                             continue
                     except Exception as e:
                         logging.debug(f"Method 1 failed: {e}")
@@ -782,16 +916,12 @@ class BeatportTrackFinder:
                         
                         if download_buttons:
                             download_button = download_buttons[0]
-                            self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", download_button)
-                            time.sleep(0.5)
-                            self.driver.execute_script("arguments[0].click();", download_button)
+                            self.click_element(download_button, track_id)
                             
                             self.handle_download_popup()
                             
-                            track_name = self.extract_track_name(track, layout_type)
                             logging.info(f"Started download for: {track_name} (using blue path method)")
-                            self.successful_downloads += 1
-                            time.sleep(1)
+                            self.record_success(track, track_name, "blue_path", artist_name, track_id)
                             continue
                     except Exception as e:
                         logging.debug(f"Method 2 failed: {e}")
@@ -805,16 +935,12 @@ class BeatportTrackFinder:
                         
                         if redownload_buttons:
                             download_button = redownload_buttons[0]
-                            self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", download_button)
-                            time.sleep(0.5)
-                            self.driver.execute_script("arguments[0].click();", download_button)
+                            self.click_element(download_button, track_id)
                             
                             self.handle_download_popup()
                             
-                            track_name = self.extract_track_name(track, layout_type)
                             logging.info(f"Started download for: {track_name} (using re-download method)")
-                            self.successful_downloads += 1
-                            time.sleep(1)
+                            self.record_success(track, track_name, "re_download", artist_name, track_id)
                             continue
                     except Exception as e:
                         logging.debug(f"Method 3 failed: {e}")
@@ -828,21 +954,18 @@ class BeatportTrackFinder:
                         
                         if action_buttons:
                             download_button = action_buttons[0]
-                            self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", download_button)
-                            time.sleep(0.5)
-                            self.driver.execute_script("arguments[0].click();", download_button)
+                            self.click_element(download_button, track_id)
                             
                             self.handle_download_popup()
                             
-                            track_name = self.extract_track_name(track, layout_type)
                             logging.info(f"Started download for: {track_name} (using download-actions method)")
-                            self.successful_downloads += 1
-                            time.sleep(1)
+                            self.record_success(track, track_name, "download_actions", artist_name, track_id)
                             continue
                     except Exception as e:
                         logging.debug(f"Method 4 failed: {e}")
                         
                     # Method 5: Last-ditch effort - try to find any button SVG
+                    clicked = False
                     try:
                         svg_buttons = track.find_elements(By.XPATH, ".//button[.//svg]")
                         
@@ -854,47 +977,503 @@ class BeatportTrackFinder:
                             btn_html = btn.get_attribute("outerHTML").lower()
                             # Look for clues that this might be a download button
                             if "download" in btn_html or "39c0de" in btn_html or "#39c0de" in btn_html:
-                                self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", btn)
-                                time.sleep(0.5)
-                                self.driver.execute_script("arguments[0].click();", btn)
+                                self.click_element(btn, track_id)
                                 
                                 self.handle_download_popup()
                                 
-                                track_name = self.extract_track_name(track, layout_type)
                                 logging.info(f"Started download for: {track_name} (using fallback method)")
-                                self.successful_downloads += 1
-                                time.sleep(1)
+                                self.record_success(track, track_name, "fallback", artist_name, track_id)
+                                clicked = True
                                 break
                     except Exception as e:
                         logging.debug(f"Method 5 failed: {e}")
                     
+                    if clicked:
+                        continue
+                    
                     # If we get here, we couldn't find any download button
-                    track_name = self.extract_track_name(track, layout_type)
                     logging.warning(f"No download button found for track: {track_name}")
-                    self.failed_downloads.append({
-                        'name': track_name,
-                        'artist': self.extract_artist_name(track, layout_type),
-                        'reason': "No download button found",
-                        'page': self.current_page
-                    })
+                    self.record_failure(
+                        track_name,
+                        artist_name,
+                        "No download button found",
+                        FailureReason.NO_BUTTON,
+                        track_id
+                    )
 
                 except Exception as e:
                     track_name = self.extract_track_name(track, layout_type)
                     artist_name = self.extract_artist_name(track, layout_type)
                     error_msg = str(e)
                     logging.error(f"Failed to download track: {track_name} - {error_msg}")
-                    self.failed_downloads.append({
-                        'name': track_name,
-                        'artist': artist_name,
-                        'reason': f"Download failed: {error_msg}",
-                        'page': self.current_page
-                    })
+                    self.record_failure(
+                        track_name,
+                        artist_name,
+                        f"Download failed: {error_msg}",
+                        classify_exception(e),
+                        self.extract_track_id(track)
+                    )
 
+            self.capture_diagnostics('failure_rate')
             return True
         except Exception as e:
             logging.error(f"Error in download_tracks_from_page: {e}")
             return False
 
+    def click_element(self, element, track_id=None):
+        """Scroll an element into view and click it with JavaScript, remembering when the click happened"""
+        self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
+        # Every caller clicks a row's download button
+        self.pace('download_start')
+        self.arm_popup_watch()
+        # Expect before clicking: Chrome can announce the download while the popup is still being handled
+        if self.download_events:
+            self.download_events.expect(track_id)
+        try:
+            self.driver.execute_script("arguments[0].click();", element)
+        except Exception:
+            if self.download_events:
+                self.download_events.forget(track_id)
+            raise
+        self.last_click_time = time.time()
+
+    def pace(self, phase):
+        """Wait until the politeness budget allows another action of phase ('page_load', 'click' or 'download_start')"""
+        # Polling first picks up 429 responses logged since the last action
+        if self.download_events:
+            self.download_events.poll()
+        self.politeness.wait(phase)
+
+    def check_page_health(self, row_count, page_number=None, page_url=None):
+        """Look for an error banner on the current page and report the page to the politeness budget"""
+        try:
+            banner = self.driver.execute_script(ERROR_BANNER_SCRIPT)
+        except Exception as e:
+            logging.debug(f"Could not check for error banners: {e}")
+            banner = None
+        self.report_page_health(row_count, banner, page_number, page_url)
+
+    def report_page_health(self, row_count, banner=None, page_number=None, page_url=None):
+        """
+        An error banner or an empty track list counts as throttling; a normal page eases the slowdown.
+
+        A page with fewer rows than its per_page is the last library page, so
+        empty pages after it are the end of the library rather than throttling.
+        """
+        page_number = page_number or self.current_page
+        page_url = page_url or self.page_url
+        per_page = parse_qs(urlsplit(page_url or '').query).get('per_page', [''])[0]
+        if row_count and per_page.isdigit() and row_count < int(per_page) and page_number:
+            self.last_library_page = min(self.last_library_page or page_number, page_number)
+
+        if banner:
+            logging.warning(f"Error banner on page: {banner}")
+            self.politeness.throttled("error banner")
+        elif not row_count:
+            if self.last_library_page and page_number and page_number > self.last_library_page:
+                logging.info(f"Page {page_number} is past the last library page ({self.last_library_page})")
+            else:
+                self.politeness.throttled("empty track list")
+        else:
+            self.politeness.healthy()
+
+    def capture_diagnostics(self, reason, force=False):
+        """Capture the page for debugging once failures pile up, or now with force; writing happens in the background"""
+        if not self.driver or not (force or self.failure_trigger.due()):
+            return
+        failure_rate = self.failure_trigger.failure_rate()
+        self.failure_trigger.fired()
+        if not force:
+            logging.warning(f"{failure_rate:.0%} of recent tracks failed, capturing the page for diagnostics")
+        capture_page(self.driver, self.diagnostics, reason, {
+            'page': self.current_page,
+            'layout': self.layout_type,
+            'failure_rate': round(failure_rate, 2),
+            'failures_by_reason': dict(self.failed_downloads.counts)
+        })
+
+    def check_browser_memory(self):
+        """Recycle the browser between pages once the memory watchdog says it has grown too large"""
+        if not self.driver:
+            return
+        reason = self.memory_watchdog.check(self.driver)
+        if reason:
+            logging.warning(f"Recycling the browser: {reason}")
+            self.recycle_browser()
+
+    def recycle_browser(self):
+        """Quit Chrome and relaunch it with the same profile and login, back on the current page"""
+        url = self.driver.current_url
+        cookies = snapshot_cookies(self.driver)
+        # Quitting would cancel downloads Chrome is still transferring
+        self.wait_for_browser_downloads()
+        self.relaunch_browser(url, cookies)
+        self.browser_recycles += 1
+        logging.info(f"Browser recycled ({self.browser_recycles} so far), resuming at {url}")
+
+    def relaunch_browser(self, url, cookies):
+        """Replace the driver with a new Chrome on the same profile, logged in with cookies and open at url"""
+        try:
+            self.driver.quit()
+        except Exception as e:
+            logging.debug(f"Error quitting the old browser: {e}")
+        self.initialize_browser(cookies=cookies)
+        if url:
+            self.pace('page_load')
+            self.driver.get(url)
+
+    def restart_browser(self, url, error):
+        """
+        Relaunch the browser after its session died, with the profile and the last saved cookies.
+
+        Returns False once the run's restarts are used up; the caller then gives up on the run.
+        """
+        self.record_lost_downloads()
+        while self.session_restarts < MAX_SESSION_RESTARTS:
+            self.session_restarts += 1
+            logging.warning(f"Browser session lost ({error}); restart {self.session_restarts} of {MAX_SESSION_RESTARTS}")
+            time.sleep(SESSION_RESTART_DELAY * self.session_restarts)
+            try:
+                self.relaunch_browser(url, self.session_cookies)
+                logging.info(f"Browser restarted, resuming at {url}")
+                return True
+            except Exception as e:
+                error = e
+        logging.error(f"Browser session lost ({error}); giving up after {MAX_SESSION_RESTARTS} restarts")
+        return False
+
+    def record_lost_downloads(self):
+        """Record the downloads a crashed browser was still transferring, so a replay can fetch them again"""
+        if not self.download_events:
+            return
+        for download in self.download_events.active():
+            download['state'] = 'interrupted'
+            self.record_failure(
+                download['filename'] or f"Track {download['track_id']}",
+                "",
+                "Browser crashed during the download",
+                FailureReason.DOWNLOAD_ERROR,
+                download['track_id'],
+                page_url=self.page_url
+            )
+
+    def raise_if_session_lost(self, error):
+        """Turn an error from a dead browser into SessionLost so it reaches the supervisor instead of a row handler"""
+        if isinstance(error, SessionLost):
+            raise error
+        if is_session_lost(error, self.driver):
+            raise SessionLost(str(error)) from error
+
+    def open_page(self, url):
+        """Load a page within the page-load budget, restarting the browser first if its session has died"""
+        self.pace('page_load')
+        try:
+            self.driver.get(url)
+        except Exception as e:
+            if not is_session_lost(e, self.driver) or not self.restart_browser(url, e):
+                raise
+
+    def record_success(self, track, track_name, strategy, artist_name=None, track_id=None):
+        """Count a started download and stream it to the run report"""
+        self.successful_downloads += 1
+        self.failure_trigger.observe(True)
+        if track_id is None:
+            track_id = self.extract_track_id(track)
+
+        self.report.write({
+            'page': self.current_page,
+            'track_id': track_id,
+            'name': track_name,
+            'artist': artist_name,
+            'status': 'clicked',
+            'strategy': strategy,
+            'click_time': self.last_click_time
+        })
+
+        # The click registered its download with the listener before it happened
+        if self.download_events:
+            self.download_events.poll()
+
+    def record_failure(self, track_name, artist_name, reason, reason_code, track_id=None, page_url=None):
+        """Record a failed track with a structured reason code and the page it was seen on"""
+        if page_url is None:
+            try:
+                page_url = self.driver.current_url
+            except Exception:
+                pass
+
+        self.failed_downloads.append(FailureRecord(
+            track_name, artist_name, reason, reason_code, track_id, self.current_page, page_url
+        ))
+        # Rows that were never downloadable (already downloaded, unknown status) aren't failures of the run
+        if reason_code in FailureReason.REPLAYABLE:
+            self.failure_trigger.observe(False)
+
+        status = 'skipped' if reason_code == FailureReason.ALREADY_DOWNLOADED else 'failed'
+        self.report.write({
+            'page': self.current_page,
+            'track_id': track_id,
+            'name': track_name,
+            'artist': artist_name,
+            'status': status,
+            'reason_code': reason_code
+        })
+
+    def record_duplicate(self, track_name, artist_name, track_id=None):
+        """Record a track skipped because the local library already has it; kept apart from failures"""
+        self.duplicate_count += 1
+        self.report.write({
+            'page': self.current_page,
+            'track_id': track_id,
+            'name': track_name,
+            'artist': artist_name,
+            'status': 'duplicate',
+            'reason_code': FailureReason.IN_LOCAL_LIBRARY
+        })
+
+    def record_filtered(self, track_name, artist_name, track_id=None):
+        """Record a track left alone because it doesn't match the track filter"""
+        self.filtered_count += 1
+        self.report.write({
+            'page': self.current_page,
+            'track_id': track_id,
+            'name': track_name,
+            'artist': artist_name,
+            'status': 'filtered'
+        })
+
+    def record_completion(self, track_id, completed_at, total_bytes):
+        """Stream a finished download with its completion time and size to the run report"""
+        self.report.write({
+            'page': self.current_page,
+            'track_id': track_id,
+            'status': 'completed',
+            'completion_time': completed_at,
+            'bytes': total_bytes
+        })
+
+    def start_direct_downloads(self):
+        """Set up the pooled HTTP downloader once the browser session is logged in"""
+        if not self.direct_download or self.http_downloader:
+            return
+        session = copy_driver_session(self.driver, create_session(pool_size=3))
+        self.http_downloader = HttpDownloader(
+            self.download_location,
+            session=session,
+            max_workers=3,
+            on_complete=self.on_direct_download_complete
+        )
+        logging.info("Direct downloads enabled - files will be fetched over pooled HTTP")
+
+    def on_download_begin(self, download):
+        """Hand a download Chrome just started to the direct downloader when it is enabled"""
+        if not self.http_downloader:
+            return
+        try:
+            self.driver.execute_cdp_cmd('Browser.cancelDownload', {'guid': download['guid']})
+        except Exception as e:
+            logging.debug(f"Could not cancel browser download {download['guid']}: {e}")
+        download['handed_off'] = True
+        self.http_downloader.submit(DownloadJob(
+            download['url'],
+            download['filename'] or f"{download['track_id']}.mp3",
+            track_id=download['track_id'],
+            source_url=self.driver.current_url
+        ))
+
+    def on_download_complete(self, download):
+        """Report a browser download once Chrome says it has finished"""
+        self.record_completion(
+            download['track_id'],
+            download['completed_at'],
+            download['total_bytes'] or download['received_bytes']
+        )
+
+    def wait_for_browser_downloads(self):
+        """Keep the browser open until every download it is transferring has completed"""
+        if not self.download_events:
+            return
+        active = len(self.download_events.active())
+        if active:
+            logging.info(f"Waiting for {active} browser downloads to finish...")
+        self.download_events.wait_until_idle(timeout=DOWNLOAD_IDLE_TIMEOUT)
+
+    def on_direct_download_complete(self, job, result):
+        """Report a finished direct download; called from the downloader's worker threads"""
+        if result['ok']:
+            self.record_completion(job.track_id, result['completed_at'], result['bytes'])
+        else:
+            self.record_failure(
+                job.filename,
+                "",
+                f"Direct download failed: {result['error']}",
+                FailureReason.DOWNLOAD_ERROR,
+                job.track_id,
+                page_url=job.source_url
+            )
+
+    def finish_direct_downloads(self):
+        """Pick up any late download events and wait for queued direct downloads"""
+        if not self.http_downloader:
+            return
+        self.download_events.poll()
+        logging.info(f"Waiting for {self.http_downloader.pending()} direct downloads to finish...")
+        self.http_downloader.close(wait=True)
+        self.http_downloader = None
+
+    def load_dedup_index(self):
+        """Index the download folder and extra library folders so rows we already have can be skipped"""
+        if not self.check_local_library or self.dedup_index is not None:
+            return
+        try:
+            self.dedup_index = DedupIndex.from_library(self.download_location, self.library_roots)
+        except Exception as e:
+            logging.error(f"Could not build the local library index, duplicate check disabled: {e}")
+
+    def is_in_local_library(self, track_name, artist_name, track_id=None):
+        """O(1) check of a row against the local library index"""
+        return self.dedup_index is not None and self.dedup_index.contains(artist_name, track_name, track_id)
+
+    def screen_row(self, track_name, artist_name, track_id, record=None):
+        """
+        Decide once per run whether an available row is clicked, recording it if it is a duplicate or filtered.
+
+        The downloads page lists the rows of the library pass again, and is reread
+        every round, so each row keeps the decision made the first time it was seen
+        and the track filter counts it towards its limit only once.
+
+        Args:
+            record: The row's track filter record, or a function building it; only used if the filter runs
+        """
+        key = track_id or f"{track_name}|{artist_name}"
+        if key not in self.screened_rows:
+            wanted = True
+            if self.is_in_local_library(track_name, artist_name, track_id):
+                logging.info(f"[SKIPPED] Already in local library: {track_name}")
+                self.record_duplicate(track_name, artist_name, track_id)
+                wanted = False
+            elif self.track_filter:
+                if callable(record):
+                    record = record()
+                if not self.track_filter.accept(record or {'track_id': track_id, 'name': track_name, 'artist': artist_name}):
+                    logging.info(f"[FILTERED] Does not match track filter: {track_name}")
+                    self.record_filtered(track_name, artist_name, track_id)
+                    wanted = False
+            self.screened_rows[key] = wanted
+        return self.screened_rows[key]
+
+    def row_to_click(self, row, page_url):
+        """
+        Check a row described by the in-page row scripts, recording it if it needs no click.
+
+        Returns the row with placeholder name and artist filled in if it should be clicked, otherwise None.
+        """
+        track = dict(row, name=row['name'] or "Track name not found", artist=row['artist'] or "Artist name not found")
+        if row['status'] != "Available for Download":
+            self.record_failure(track['name'], track['artist'], f"Track status: {row['status']}",
+                                classify_status(row['status']), row['track_id'], page_url=page_url)
+            return None
+        return track if self.screen_row(track['name'], track['artist'], row['track_id'], track) else None
+
+    def container_selectors(self):
+        """CSS row selectors for the in-page row scripts, in the order the selector manager has ranked them"""
+        selectors = [s for s in self.selector_manager.selectors.get('track_containers', []) if not s.startswith(('/', '('))]
+        return selectors or ["[data-testid='library-tracks-table-row']", "[data-testid='tracks-list-item']"]
+
+    def start_new_cycle(self):
+        """Reset per-run state so a warm browser session can run another pass"""
+        self.failed_downloads = FailureLog(self.failed_downloads.spool_path)
+        self.report = RunReportWriter(self.download_location)
+        self.sync_reached = False
+        self.session_restarts = 0
+        self.visited_pages = set()
+        self.last_library_page = None
+        if self.sync_mode:
+            self.sync_state = SyncState(os.path.join(self.download_location, 'sync_state.json'))
+        if self.track_filter:
+            self.track_filter.accepted = 0
+        # Rebuilt on the next pass so files organized since then count as local copies
+        self.dedup_index = None
+        self.screened_rows = {}
+        self.api_client = None
+        self.api_tracks = None
+
+    def progress_snapshot(self):
+        """Counters describing the run so far, for status endpoints and summaries"""
+        return {
+            'current_page': self.current_page,
+            'successful_downloads': self.successful_downloads,
+            'failed_downloads': len(self.failed_downloads),
+            'failures_by_reason': dict(self.failed_downloads.counts),
+            'local_duplicates': self.duplicate_count,
+            'filtered': self.filtered_count,
+            'browser_downloads_active': len(self.download_events.active()) if self.download_events else 0,
+            'direct_downloads_pending': self.http_downloader.pending() if self.http_downloader else 0,
+            'politeness': self.politeness.stats(),
+            'browser_memory': self.memory_watchdog.stats(),
+            'browser_recycles': self.browser_recycles,
+            'browser_restarts': self.session_restarts
+        }
+
+    def finish_sync(self):
+        """Advance the sync high-water mark once a sync has covered every new track"""
+        if not self.sync_state:
+            return
+        # A filter limit leaves newer unfiltered tracks unvisited, so the mark can't move past them
+        if self.sync_reached and not self.filter_limit_reached():
+            self.sync_state.save()
+        else:
+            logging.warning("Sync did not finish - the next run will start from the same point")
+
+    def organize_downloads(self):
+        """File finished downloads into the folder scheme, indexing only the files that were moved"""
+        if not self.organize_scheme:
+            return
+        try:
+            organizer = LibraryOrganizer(self.download_location, self.organize_scheme)
+            try:
+                # A full rescan of the library is left to --rebuild-library-index
+                organizer.organize_new_files()
+            finally:
+                organizer.close()
+        except Exception as e:
+            logging.error(f"Error organizing downloaded files: {e}")
+
+    def mark_page_visited(self, page_url):
+        """Note a page whose rows this run read, so its queued failures are replaced by this run's"""
+        if page_url:
+            self.visited_pages.add(page_key(page_url))
+
+    def save_failed_downloads(self):
+        """Persist the failures of this run so they can be replayed later"""
+        # Failures queued for pages this run didn't visit are still unresolved, so only visited pages are replaced
+        self.failed_downloads.close()
+        self.failures_queue.save(self.failed_downloads, self.visited_pages)
+
+    def replay_failed_downloads(self):
+        """Re-process only the tracks that failed in the previous run by jumping to their pages"""
+        failures_by_page = self.failures_queue.replayable_by_page()
+        if not failures_by_page:
+            logging.info("No replayable failed downloads found")
+            return
+
+        total = sum(len(failures) for failures in failures_by_page.values())
+        logging.info(f"Replaying {total} failed downloads across {len(failures_by_page)} pages")
+
+        for page_url, failures in failures_by_page.items():
+            page_number = failures[0].get('page') or self.current_page
+            logging.info(f"Replaying {len(failures)} tracks on page {page_number}")
+            self.open_page(page_url)
+
+            pending_keys = {replay_key(failure) for failure in failures}
+            if '/library/downloads' in page_url:
+                # Downloads-page rows are clicked without a status check, so keep only the ones still available
+                self.current_page = page_number
+                self.download_tracks_from_page(pending_keys=pending_keys & self.find_pending_track_keys())
+            else:
+                # Library rows go through the same status, duplicate and filter checks as a normal run
+                self.process_page(page_number, pending_keys=pending_keys)
+
     def find_pagination(self):
         try:
             # Try to find pagination wrapper using the updated class
@@ -937,34 +1516,82 @@ class BeatportTrackFinder:
             logging.error(f"Error finding pagination: {e}")
             return None
 
-    def process_page(self, page_number):
+    def process_page(self, page_number, pending_keys=None):
+        """
+        Process a page, restarting the browser if it dies and resuming after the last finished row.
+
+        pending_keys limits the page to rows with those keys (track ID, or name|artist), as in a replay.
+        """
+        self.current_page = page_number
+        self.page_url = None
+        self.rows_done = 0
+        while True:
+            try:
+                processed = self.process_page_rows(page_number, pending_keys)
+                # Still on the page, so a capture shows the rows that failed
+                self.capture_diagnostics('failure_rate')
+                return processed
+            except SessionLost as e:
+                if not self.page_url or not self.restart_browser(self.page_url, e):
+                    raise
+
+    def process_page_rows(self, page_number, pending_keys=None):
         try:
             self.current_page = page_number
+            if not self.page_url:
+                self.page_url = self.driver.current_url
+            self.save_session_cookies()
             
             # Wait for tracks to load
-            self.wait.until(
-                EC.presence_of_element_located((
-                    By.CSS_SELECTOR, 
-                    "[data-testid='library-tracks-table-row'], [data-testid='tracks-list-item']"
-                ))
-            )
+            try:
+                self.wait.until(
+                    EC.presence_of_element_located((
+                        By.CSS_SELECTOR, 
+                        "[data-testid='library-tracks-table-row'], [data-testid='tracks-list-item']"
+                    ))
+                )
+            except TimeoutException:
+                self.check_page_health(0)
+                logging.error(f"No tracks found on page {page_number}")
+                return False
             
             track_containers, layout_type = self.find_track_containers()
+            self.rows_on_page = len(track_containers)
+            self.check_page_health(len(track_containers))
 
             if not track_containers:
                 logging.error(f"No tracks found on page {page_number}")
                 return False
+            self.mark_page_visited(self.page_url)
 
             logging.info(f"\nProcessing page {page_number}")
             logging.info("="*50)
             logging.info(f"Found {len(track_containers)} tracks")
             logging.info("="*50 + "\n")
 
+            # Track records from the API, when available, replace per-row DOM scraping
+            api_records = self.api_tracks.get(page_number) if self.api_tracks else None
+            # Rows waiting to be clicked together, once this layout is known to download without popups
+            pending_clicks = []
+
             for index, track in enumerate(track_containers, 1):
+                if index <= self.rows_done:
+                    continue  # Finished before the browser was restarted
+                if self.filter_limit_reached():
+                    logging.info(f"Track filter limit of {self.track_filter.limit} reached")
+                    break
                 try:
-                    track_name = self.extract_track_name(track, layout_type)
-                    artist_name = self.extract_artist_name(track, layout_type)
-                    svg_status = self.extract_svg_status(track, layout_type)
+                    if self.sync_state:
+                        row_id = self.extract_track_id(track)
+                        self.sync_state.observe(row_id)
+                        if self.sync_state.is_synced(row_id):
+                            logging.info("Reached tracks synced by the last run")
+                            self.sync_reached = True
+                            break
+
+                    track_name, artist_name, track_id, svg_status = self.describe_track(track, layout_type, api_records)
+                    if pending_keys is not None and (track_id or f"{track_name}|{artist_name}") not in pending_keys:
+                        continue
 
                     logging.info(
                         f"Track {index}/{len(track_containers)}:\n"
@@ -974,7 +1601,16 @@ class BeatportTrackFinder:
                         f"{'-' * 50}"
                     )
 
-                    if svg_status == "Available for Download":
+                    if svg_status != "Available for Download":
+                        self.record_failure(
+                            track_name,
+                            artist_name,
+                            f"Track status: {svg_status}",
+                            classify_status(svg_status),
+                            track_id
+                        )
+                    elif self.screen_row(track_name, artist_name, track_id, lambda: self.build_track_record(
+                            track, track_name, artist_name, track_id, api_records)):
                         try:
                             # Find the re-download icon
                             download_button = None
@@ -990,110 +1626,388 @@ class BeatportTrackFinder:
                                 
                             if download_button:
                                 parent_button = download_button.find_element(By.XPATH, "./..")
-                                self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", parent_button)
-                                time.sleep(0.5)
-                                self.driver.execute_script("arguments[0].click();", parent_button)
+                                if self.batch_clicks_enabled():
+                                    pending_clicks.append((track, track_name, artist_name, track_id, parent_button))
+                                    if len(pending_clicks) >= CLICK_BATCH_SIZE:
+                                        self.flush_clicks(pending_clicks)
+                                        self.rows_done = index
+                                    continue
+
+                                self.click_element(parent_button, track_id)
                                 
                                 self.handle_download_popup()
                                 
-                                self.successful_downloads += 1
+                                self.record_success(track, track_name, "re_download_icon", artist_name, track_id)
                                 logging.info(f"[SUCCESS] Added to downloads: {track_name}")
-                                time.sleep(0.5)
                                 
                         except Exception as e:
+                            self.raise_if_session_lost(e)
                             error_msg = str(e)
                             logging.error(f"[FAILED] Could not add to downloads: {track_name}")
                             logging.error(f"Error: {error_msg}")
-                            self.failed_downloads.append({
-                                'name': track_name,
-                                'artist': artist_name,
-                                'reason': f"Download button click failed: {error_msg}",
-                                'page': self.current_page
-                            })
-                    else:
-                        self.failed_downloads.append({
-                            'name': track_name,
-                            'artist': artist_name,
-                            'reason': f"Track status: {svg_status}",
-                            'page': self.current_page
-                        })
+                            self.record_failure(
+                                track_name,
+                                artist_name,
+                                f"Download button click failed: {error_msg}",
+                                classify_exception(e),
+                                track_id
+                            )
 
                 except Exception as e:
+                    self.raise_if_session_lost(e)
                     logging.error(f"Error processing track {index} on page {page_number}: {e}")
-                    self.failed_downloads.append({
-                        'name': f"Unknown Track {index}",
-                        'artist': "Unknown Artist",
-                        'reason': f"Processing error: {str(e)}",
-                        'page': self.current_page
-                    })
+                    self.record_failure(
+                        f"Unknown Track {index}",
+                        "Unknown Artist",
+                        f"Processing error: {str(e)}",
+                        classify_exception(e),
+                        self.extract_track_id(track)
+                    )
+                if not pending_clicks:
+                    self.rows_done = index
 
+            self.flush_clicks(pending_clicks)
             return True
         except Exception as e:
+            self.raise_if_session_lost(e)
             logging.error(f"Error processing page {page_number}: {e}")
             return False
 
+    def batch_clicks_enabled(self):
+        """Batch clicks only on layouts that have stopped showing download popups"""
+        return self.popup_wait(self.layout_type or 'unknown') == POPUP_ABSENT_WAIT
+
+    def flush_clicks(self, pending_clicks):
+        """
+        Click the pending rows' download buttons in one script and record each row.
+
+        A row whose click opened a popup gets it confirmed; rows the batch never
+        reached fall back to clicking one at a time.
+        """
+        batch = list(pending_clicks)
+        pending_clicks.clear()
+        if not batch:
+            return
+        if self.download_events:
+            # Chrome attributes downloads to clicks in order, so every row is announced before the batch starts
+            self.download_events.poll()
+            for _, _, _, track_id, _ in batch:
+                self.download_events.expect(track_id)
+
+        layout = self.layout_type or 'unknown'
+        try:
+            results = ClickExecutor(self.driver, self.politeness).run([row[-1] for row in batch], POPUP_ABSENT_WAIT)
+        except Exception as e:
+            self.raise_if_session_lost(e)
+            logging.debug(f"Batch click failed, clicking rows one at a time: {e}")
+            results = []
+        self.last_click_time = time.time()
+
+        for position, (track, track_name, artist_name, track_id, button) in enumerate(batch):
+            result = results[position] if position < len(results) else None
+            if result in (CLICKED, POPUP):
+                self.record_popup_presence(layout, result == POPUP, POPUP_ABSENT_WAIT)
+                if result == POPUP:
+                    self.confirm_popup()
+                self.record_success(track, track_name, "batch_click", artist_name, track_id)
+                logging.info(f"[SUCCESS] Added to downloads: {track_name}")
+                continue
+
+            if self.download_events:
+                self.download_events.forget(track_id)
+            if result == MISSING:
+                self.record_failure(track_name, artist_name, "Download button left the page before the click",
+                                    FailureReason.STALE_ELEMENT, track_id)
+                continue
+            try:
+                self.click_element(button, track_id)
+                self.handle_download_popup()
+                self.record_success(track, track_name, "re_download_icon", artist_name, track_id)
+                logging.info(f"[SUCCESS] Added to downloads: {track_name}")
+            except Exception as e:
+                self.raise_if_session_lost(e)
+                logging.error(f"[FAILED] Could not add to downloads: {track_name}")
+                self.record_failure(track_name, artist_name, f"Download button click failed: {e}",
+                                    classify_exception(e), track_id)
+
+    def save_session_cookies(self):
+        """Keep the login at hand for a restart, since a crashed browser can't be asked for it"""
+        try:
+            self.session_cookies = snapshot_cookies(self.driver)
+        except Exception as e:
+            logging.debug(f"Could not save session cookies: {e}")
+
+    def describe_track(self, track, layout_type, api_records=None):
+        """Return name, artist, track ID and status for a row, from API records when possible"""
+        track_id = self.extract_track_id(track)
+        if api_records and track_id in api_records:
+            record = api_records[track_id]
+            return record['name'], record['artist'], track_id, record['status']
+
+        return (
+            self.extract_track_name(track, layout_type),
+            self.extract_artist_name(track, layout_type),
+            track_id,
+            self.extract_svg_status(track, layout_type)
+        )
+
+    def build_track_record(self, track, track_name, artist_name, track_id, api_records=None):
+        """Collect the fields the track filter matches on, reading the row's detail cells only if needed"""
+        if api_records and track_id in api_records:
+            return api_records[track_id]
+
+        record = {'track_id': track_id, 'name': track_name, 'artist': artist_name}
+        if self.track_filter and self.track_filter.needs_details:
+            try:
+                record.update(self.driver.execute_script(ROW_DETAILS_SCRIPT, track) or {})
+            except Exception as e:
+                logging.debug(f"Could not read row details: {e}")
+        return record
+
+    def filter_limit_reached(self):
+        return self.track_filter is not None and self.track_filter.limit_reached()
+
+    def load_api_tracks(self):
+        """List the requested library pages through the API, returning False to fall back to page scanning"""
+        try:
+            self.api_client = BeatportApiClient.from_driver(self.driver)
+        except Exception as e:
+            logging.error(f"Could not start API client, falling back to page scanning: {e}")
+            return False
+        if self.api_client is None:
+            logging.warning("API login failed, falling back to page scanning")
+            return False
+
+        if self.sync_state:
+            tracks_by_page = self.list_unsynced_api_pages()
+        else:
+            tracks_by_page = self.api_client.fetch_pages(
+                'library', range(self.start_page, self.end_page + 1), per_page=API_PAGE_SIZE
+            )
+        if tracks_by_page is None:
+            logging.warning("API listing failed, falling back to page scanning")
+            return False
+
+        self.api_tracks = {
+            page: {track['track_id']: track for track in tracks}
+            for page, tracks in tracks_by_page.items()
+        }
+        logging.info(f"Listed {sum(len(t) for t in self.api_tracks.values())} tracks through the API")
+        return True
+
+    def list_unsynced_api_pages(self):
+        """List library pages through the API from page 1 up to the tracks synced by the last run"""
+        tracks_by_page = {}
+        try:
+            for page_number in range(1, self.end_page + 1):
+                records = self.api_client.fetch_page('library', page_number, per_page=API_PAGE_SIZE)
+                for position, record in enumerate(records):
+                    self.sync_state.observe(record['track_id'])
+                    if self.sync_state.is_synced(record['track_id']):
+                        records = records[:position]
+                        self.sync_reached = True
+                        break
+                if records:
+                    tracks_by_page[page_number] = records
+                if self.sync_reached or len(records) < API_PAGE_SIZE:
+                    self.sync_reached = True
+                    break
+        except Exception as e:
+            logging.error(f"Error listing new tracks from the API: {e}")
+            self.sync_reached = False
+            return None
+        return tracks_by_page
+
+    def sync_new_tracks(self):
+        """Process library pages from page 1 until reaching tracks synced by the last completed run"""
+        if self.sync_state.has_anchor:
+            logging.info(f"Syncing tracks added since {self.sync_state.last_sync}")
+        else:
+            logging.info("No previous sync found - syncing the whole library")
+
+        for page_number in range(1, self.end_page + 1):
+            self.open_page(f"https://www.beatport.com/library?page={page_number}&per_page={API_PAGE_SIZE}")
+            processed = self.process_page(page_number)
+            self.check_browser_memory()
+            if self.sync_reached or self.filter_limit_reached():
+                break
+            if processed and self.rows_on_page < API_PAGE_SIZE:
+                logging.info("Reached the end of the library")
+                self.sync_reached = True
+                break
+            if not processed:
+                logging.error(f"Sync stopped at page {page_number}; the sync state is left unchanged")
+                break
+
+    def process_pages_with_api(self):
+        """Visit only the library pages whose API listing has tracks available for download"""
+        for page_number, records in self.api_tracks.items():
+            if self.filter_limit_reached():
+                logging.info(f"Track filter limit of {self.track_filter.limit} reached")
+                break
+            self.current_page = page_number
+            wanted = [
+                record for record in records.values()
+                if record['status'] == "Available for Download"
+                and not self.is_in_local_library(record['name'], record['artist'], record['track_id'])
+                and (not self.track_filter or self.track_filter.matches(record))
+            ]
+            page_url = f"https://www.beatport.com/library?page={page_number}&per_page={API_PAGE_SIZE}"
+            if not wanted:
+                logging.info(f"Skipping page {page_number}: no tracks to download")
+                # The listing is this run's look at the page
+                self.mark_page_visited(page_url)
+                for record in records.values():
+                    if record['status'] == "Available for Download":
+                        if self.is_in_local_library(record['name'], record['artist'], record['track_id']):
+                            self.record_duplicate(record['name'], record['artist'], record['track_id'])
+                        else:
+                            self.record_filtered(record['name'], record['artist'], record['track_id'])
+                        continue
+                    self.record_failure(
+                        record['name'],
+                        record['artist'],
+                        f"Track status: {record['status']}",
+                        classify_status(record['status']),
+                        record['track_id'],
+                        page_url=page_url
+                    )
+                continue
+
+            self.open_page(page_url)
+            self.process_page(page_number)
+            self.check_browser_memory()
+
     def check_downloads_page(self):
         try:
+            self.pace('page_load')
             self.driver.get("https://www.beatport.com/library/downloads?page=1&per_page=100")
-            time.sleep(8)  # Increased wait time for page to load (5-10 seconds as recommended)
 
-            # Try processing downloads multiple times to ensure all are caught
-            attempts = 0
-            max_attempts = 5  # Increased from 3 to 5 attempts
-            previous_successful_count = self.successful_downloads  # Initialize to track new downloads
-            
-            while attempts < max_attempts:
-                logging.info(f"Download attempt {attempts + 1}/{max_attempts}")
-                result = self.download_tracks_from_page()
-                
-                if not result:
-                    logging.warning("Download attempt failed, retrying after refresh")
-                
-                time.sleep(5)  # Wait for downloads to start
-                logging.info("Refreshing downloads page...")
-                self.driver.refresh()  # Reload the page to check for remaining tracks
-                time.sleep(8)  # Increased wait after refresh to ensure all tracks are loaded
+            # Only rows still "Available for Download" are revisited, with backoff tied to completions
+            scheduler = PendingRetryScheduler(max_rounds=5)
+            pending = scheduler.update(self.find_pending_track_keys())
+            logging.info(f"Found {len(pending)} tracks pending on downloads page")
 
-                # After refreshing, use the same comprehensive download method as initially
-                logging.info("Checking for more tracks to download after refresh...")
-                
-                # Use the same download_tracks_from_page method that's used initially
-                result = self.download_tracks_from_page()
-                
-                if not result:
-                    logging.info("No more tracks found to download after refresh")
-                    break
-                
-                # Check if we actually downloaded any tracks in this attempt
-                if attempts > 0 and self.successful_downloads == previous_successful_count:
-                    logging.info("No new tracks were downloaded in this attempt, stopping")
-                    break
-                    
-                # Store the current successful count to check in the next iteration
-                previous_successful_count = self.successful_downloads
-                    
-                attempts += 1
-                
+            while scheduler.should_continue():
+                logging.info(
+                    f"Download round {scheduler.rounds + 1}/{scheduler.max_rounds} "
+                    f"({len(pending)} tracks pending)"
+                )
+                if not self.download_tracks_from_page(pending_keys=pending):
+                    logging.warning("Download round failed, retrying after refresh")
+
+                # Clicks are tied to the downloads they start, so only rows whose
+                # click started nothing need the page refreshed and checked again.
+                # Rows without a track ID ('name|artist' keys) can't be matched to
+                # a download and go straight to the recheck.
+                delay = scheduler.next_delay()
+                track_ids = {key for key in pending if '|' not in key}
+                started = self.download_events.wait_for_begin(track_ids, timeout=delay) if track_ids else set()
+                remaining = pending - started
+                if remaining:
+                    logging.info(f"{len(remaining)} clicks started no download, rechecking page")
+                    self.pace('page_load')
+                    self.driver.refresh()
+                    remaining = self.find_pending_track_keys()
+                pending = scheduler.update(remaining)
+
+            if pending:
+                logging.warning(f"{len(pending)} tracks still pending after {scheduler.rounds} rounds")
+            self.wait_for_browser_downloads()
             logging.info("Download page processing complete")
 
         except Exception as e:
             logging.error(f"Error in check_downloads_page: {e}")
-            # Try to capture a screenshot if possible
+            self.capture_diagnostics('downloads_page_error', force=True)
+
+    def find_pending_track_keys(self):
+        """Return the keys of rows on the current page that are still available for download and wanted"""
+        if self.api_client:
             try:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                screenshot_path = os.path.join(self.download_location, f"error_screenshot_{timestamp}.png")
-                self.driver.save_screenshot(screenshot_path)
-                logging.info(f"Error screenshot saved to: {screenshot_path}")
-            except:
-                pass
+                records = self.api_client.fetch_page('downloads', 1, per_page=100)
+                return {
+                    r['track_id'] for r in records
+                    if r['status'] == "Available for Download"
+                    and self.screen_row(r['name'], r['artist'], r['track_id'], r)
+                }
+            except Exception as e:
+                logging.warning(f"API downloads listing failed, checking the page instead: {e}")
+
+        try:
+            self.wait.until(
+                EC.presence_of_element_located((
+                    By.CSS_SELECTOR, 
+                    "[data-testid='library-tracks-table-row'], [data-testid='tracks-list-item']"
+                ))
+            )
+        except TimeoutException:
+            logging.info("No track rows found on the page")
+            return set()
+
+        track_containers, layout_type = self.find_track_containers()
+        pending = set()
+        for track in track_containers:
+            try:
+                if self.extract_svg_status(track, layout_type) != "Available for Download":
+                    continue
+                track_name = self.extract_track_name(track, layout_type)
+                artist_name = self.extract_artist_name(track, layout_type)
+                track_id = self.extract_track_id(track)
+                if self.screen_row(track_name, artist_name, track_id, lambda: self.build_track_record(
+                        track, track_name, artist_name, track_id)):
+                    pending.add(track_id or f"{track_name}|{artist_name}")
+            except StaleElementReferenceException:
+                logging.debug("Track row went stale while checking status")
+        return pending
+
+    def run_selector_health_check(self):
+        """Check selectors against the loaded page and rank them before processing starts"""
+        try:
+            self.wait.until(
+                EC.presence_of_element_located((
+                    By.CSS_SELECTOR, 
+                    "[data-testid='library-tracks-table-row'], [data-testid='tracks-list-item']"
+                ))
+            )
+        except TimeoutException:
+            logging.info("No track rows loaded yet, skipping selector health check")
+            return
+        self.selector_manager.verify_selectors_health(self.driver, None)
 
     def click_next_and_process(self):
         try:
+            self.run_selector_health_check()
+            self.load_dedup_index()
+            self.start_direct_downloads()
+
+            # Replay mode only revisits the pages of previously failed tracks
+            if self.replay_failures:
+                logging.info("Replay mode enabled - re-processing failed downloads from the last run")
+                self.replay_failed_downloads()
+                return
+
             # If downloads_page_only is enabled, skip library pages processing
             if self.downloads_page_only:
                 logging.info("Downloads Page Only mode enabled - skipping library pages processing")
                 self.check_downloads_page()
                 return
+
+            # With the API data source, pages are listed up front and only pages with downloads are visited
+            if self.use_api and self.load_api_tracks():
+                self.process_pages_with_api()
+                self.finish_sync()
+                if self.check_downloads:
+                    logging.info("\nChecking downloads page...")
+                    self.check_downloads_page()
+                return
+
+            if self.sync_mode:
+                self.sync_new_tracks()
+                self.finish_sync()
+                if self.check_downloads:
+                    logging.info("\nChecking downloads page...")
+                    self.check_downloads_page()
+                return
                 
             current_page = 1
 
@@ -1110,7 +2024,7 @@ class BeatportTrackFinder:
                 
                 # Ensure we're clicking the button and not something else
                 self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", next_button)
-                time.sleep(1)
+                self.pace('click')
                 
                 # Get current URL before clicking
                 current_url = self.driver.current_url
@@ -1123,17 +2037,17 @@ class BeatportTrackFinder:
                     WebDriverWait(self.driver, 10).until(
                         lambda driver: driver.current_url != current_url
                     )
-                    time.sleep(3)  # Additional wait to ensure page loads
+                    self.pace('page_load')
                     current_page += 1
                 except:
                     logging.error(f"Failed to navigate to page {current_page + 1}, retrying...")
-                    # Try clicking again after a short wait
-                    time.sleep(2)
+                    # Try clicking again once the budget allows
+                    self.pace('click')
                     self.driver.execute_script("arguments[0].click();", next_button)
                     WebDriverWait(self.driver, 10).until(
                         lambda driver: driver.current_url != current_url
                     )
-                    time.sleep(3)
+                    self.pace('page_load')
                     current_page += 1
 
             # Process pages from start_page to end_page
@@ -1141,9 +2055,12 @@ class BeatportTrackFinder:
                 logging.info(f"Processing page {current_page}")
                 self.process_page(current_page)
 
-                if current_page == self.end_page:
+                if current_page == self.end_page or self.filter_limit_reached():
                     break
 
+                # Recycling reopens this page, so the Next button below still leads to the right one
+                self.check_browser_memory()
+
                 # Navigate to next page
                 try:
                     # Try to find the next button using the selector manager
@@ -1210,7 +2127,7 @@ class BeatportTrackFinder:
                     if next_buttons:
                         next_button = next_buttons[0]
                         self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", next_button)
-                        time.sleep(0.5)
+                        self.pace('click')
                         
                         # Check if button is disabled
                         disabled = next_button.get_attribute("disabled") or next_button.get_attribute("aria-disabled") == "true"
@@ -1219,10 +2136,15 @@ class BeatportTrackFinder:
                             return False
                         
                         # Click the next button
+                        previous_url = self.driver.current_url
                         self.driver.execute_script("arguments[0].click();", next_button)
                         
-                        # Wait for page to load after clicking next
-                        time.sleep(2)
+                        # Wait for the page to change rather than for a fixed time
+                        try:
+                            WebDriverWait(self.driver, 10).until(lambda driver: driver.current_url != previous_url)
+                        except TimeoutException:
+                            pass
+                        self.pace('page_load')
                         
                         # Check if page URL has changed
                         if "page=" in self.driver.current_url:
@@ -1244,7 +2166,10 @@ class BeatportTrackFinder:
                     
                 except Exception as e:
                     logging.error(f"Navigation error: {e} - trying again")
-                    time.sleep(5)  # Wait longer before retry
+                    # A restarted browser reopens the page just processed, so the retry below still clicks Next from it
+                    if is_session_lost(e, self.driver) and not self.restart_browser(self.page_url, e):
+                        raise
+                    self.pace('page_load')
                     
                     # Try one more time with a different approach
                     try:
@@ -1257,13 +2182,13 @@ class BeatportTrackFinder:
                         
                         # Try clicking the parent element instead
                         self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", next_button)
-                        time.sleep(2)
+                        self.pace('click')
                         self.driver.execute_script("arguments[0].click();", next_button)
                         
                         WebDriverWait(self.driver, 15).until(
                             lambda driver: driver.current_url != current_url
                         )
-                        time.sleep(3)
+                        self.pace('page_load')
                         current_page += 1
                     except Exception as second_error:
                         logging.error(f"Failed to navigate after retry: {second_error}")
@@ -1277,21 +2202,35 @@ class BeatportTrackFinder:
         except Exception as e:
             logging.error(f"Error in click_next_and_process: {e}")
         finally:
-            logging.info(f"\nProcessing Summary:")
-            logging.info("=" * 50)
-            logging.info(f"Total successful downloads added: {self.successful_downloads}")
-            logging.info(f"Total failed downloads: {len(self.failed_downloads)}")
-            logging.info("=" * 50)
-
-    def download_track_large_layout(self, track, index):
+            self.finish_run()
+
+    def finish_run(self):
+        """Wait for downloads, persist run state and log the summary"""
+        self.wait_for_browser_downloads()
+        self.finish_direct_downloads()
+        self.organize_downloads()
+        self.save_failed_downloads()
+        self.report.close()
+        self.diagnostics.close()
+        self.selector_manager.save_stats()
+        self.popup_stats.save()
+        if self.api_client:
+            self.api_client.close()
+        logging.info(f"\nProcessing Summary:")
+        logging.info("=" * 50)
+        logging.info(f"Total successful downloads added: {self.successful_downloads}")
+        logging.info(f"Total failed downloads: {len(self.failed_downloads)}")
+        for reason_code, count in self.failed_downloads.counts.most_common():
+            logging.info(f"  {reason_code}: {count}")
+        logging.info(f"Total skipped as already in local library: {self.duplicate_count}")
+        logging.info(f"Total skipped by track filter: {self.filtered_count}")
+        logging.info("=" * 50)
+
+    def download_track_large_layout(self, track, index, track_name, artist_name, track_id):
         """Handle download for large screen layout"""
         try:
-            # Use selector manager to find download button
-            download_buttons = self.selector_manager.find_element_with_learning(
-                self.driver, 
-                'download_button', 
-                context_element=track
-            )
+            # Use the layout profile's download button selector
+            download_buttons = self.find_in_row(track, 'download_button', "large")
             
             if download_buttons:
                 download_button = download_buttons[0]
@@ -1306,16 +2245,12 @@ class BeatportTrackFinder:
                     pass
                     
                 # Scroll and click
-                self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", parent)
-                time.sleep(0.5)
-                self.driver.execute_script("arguments[0].click();", parent)
+                self.click_element(parent, track_id)
                 
                 self.handle_download_popup()
                 
-                track_name = self.extract_track_name(track, "large")
                 logging.info(f"Started download for: {track_name} (using adaptive selector)")
-                self.successful_downloads += 1
-                time.sleep(1)
+                self.record_success(track, track_name, "adaptive_selector", artist_name, track_id)
                 return True
                 
             # If selector manager failed, try visual recognition approaches
@@ -1328,9 +2263,7 @@ class BeatportTrackFinder:
                 
                 if blue_path_buttons:
                     button = blue_path_buttons[0]
-                    self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", button)
-                    time.sleep(0.5)
-                    self.driver.execute_script("arguments[0].click();", button)
+                    self.click_element(button, track_id)
                     
                     self.handle_download_popup()
                     
@@ -1340,10 +2273,8 @@ class BeatportTrackFinder:
                         ".//button[.//path[@stroke='#39C0DE' or contains(@stroke, '39C0DE')]]"
                     )
                     
-                    track_name = self.extract_track_name(track, "large")
                     logging.info(f"Started download for: {track_name} (using blue path method)")
-                    self.successful_downloads += 1
-                    time.sleep(1)
+                    self.record_success(track, track_name, "blue_path", artist_name, track_id)
                     return True
             except Exception as e:
                 logging.debug(f"Blue path button method failed: {e}")
@@ -1354,15 +2285,11 @@ class BeatportTrackFinder:
             logging.error(f"Error downloading track with large layout: {e}")
             return False
 
-    def download_track_small_layout(self, track, index):
+    def download_track_small_layout(self, track, index, track_name, artist_name, track_id):
         """Handle download for small screen layout"""
         try:
-            # Use selector manager to find download button
-            download_buttons = self.selector_manager.find_element_with_learning(
-                self.driver, 
-                'download_button', 
-                context_element=track
-            )
+            # Use the layout profile's download button selector
+            download_buttons = self.find_in_row(track, 'download_button', "small")
             
             if download_buttons:
                 download_button = download_buttons[0]
@@ -1377,16 +2304,12 @@ class BeatportTrackFinder:
                     pass
                     
                 # Scroll and click
-                self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", parent)
-                time.sleep(0.5)
-                self.driver.execute_script("arguments[0].click();", parent)
+                self.click_element(parent, track_id)
                 
                 self.handle_download_popup()
                 
-                track_name = self.extract_track_name(track, "small")
                 logging.info(f"Started download for: {track_name} (using adaptive selector)")
-                self.successful_downloads += 1
-                time.sleep(1)
+                self.record_success(track, track_name, "adaptive_selector", artist_name, track_id)
                 return True
                 
             # If selector manager failed, try finding any button with blue SVG or icons
@@ -1395,9 +2318,7 @@ class BeatportTrackFinder:
                 for button in buttons:
                     btn_html = button.get_attribute("outerHTML").lower()
                     if 'download' in btn_html or '39c0de' in btn_html or 'svg' in btn_html:
-                        self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", button)
-                        time.sleep(0.5)
-                        self.driver.execute_script("arguments[0].click();", button)
+                        self.click_element(button, track_id)
                         
                         self.handle_download_popup()
                         
@@ -1407,10 +2328,8 @@ class BeatportTrackFinder:
                             "button:contains('download')"
                         )
                         
-                        track_name = self.extract_track_name(track, "small")
                         logging.info(f"Started download for: {track_name} (using button scan method)")
-                        self.successful_downloads += 1
-                        time.sleep(1)
+                        self.record_success(track, track_name, "button_scan", artist_name, track_id)
                         return True
             except Exception as e:
                 logging.debug(f"Button scan method failed: {e}")
@@ -1423,16 +2342,11 @@ class BeatportTrackFinder:
             
     def extract_track_name(self, track, layout_type):
         try:
-            # Use selector manager to find track name
-            name_element = self.selector_manager.find_element_with_learning(
-                self.driver, 
-                'track_name', 
-                context_element=track, 
-                multiple=False
-            )
+            # Use the layout profile's track name selector
+            name_elements = self.find_in_row(track, 'track_name', layout_type)
             
-            if name_element:
-                return name_element.text
+            if name_elements:
+                return name_elements[0].text
                 
             # Visual recognition fallback: look for any element that might contain the track name
             title_links = track.find_elements(By.CSS_SELECTOR, "a[title]:not([title=''])") 
@@ -1455,12 +2369,8 @@ class BeatportTrackFinder:
 
     def extract_artist_name(self, track, layout_type):
         try:
-            # Use selector manager to find artist name
-            artist_elements = self.selector_manager.find_element_with_learning(
-                self.driver, 
-                'artist_name', 
-                context_element=track
-            )
+            # Use the layout profile's artist name selector
+            artist_elements = self.find_in_row(track, 'artist_name', layout_type)
             
             if artist_elements:
                 artist_names = [elem.text for elem in artist_elements if elem.text.strip()]
@@ -1484,47 +2394,21 @@ class BeatportTrackFinder:
             logging.error(f"Error extracting artist name: {e}")
             return "Artist name not found"
 
+    def extract_track_id(self, track):
+        """Return the Beatport track ID from the row's track link, if present"""
+        try:
+            for link in track.find_elements(By.CSS_SELECTOR, "a[href*='/track/']"):
+                match = re.search(r"/track/[^/]+/(\d+)", link.get_attribute('href') or '')
+                if match:
+                    return match.group(1)
+        except Exception as e:
+            logging.debug(f"Could not extract track ID: {e}")
+        return None
+
     def extract_svg_status(self, track, layout_type):
+        """Download status from the row's icons, checked with the status selectors of its layout"""
         try:
-            # Check for re-download icon 
-            try:
-                re_download_svg = track.find_element(By.CSS_SELECTOR, "svg[data-testid='icon-re-download']")
-                return "Available for Download"
-            except:
-                pass
-                
-            # Look for download finished icon
-            try:
-                download_finished_svg = track.find_element(By.CSS_SELECTOR, "svg[data-testid='icon-download-finished']")
-                return "Already Downloaded"
-            except:
-                pass
-                
-            # Look for blue download button on downloads page
-            try:
-                download_button = track.find_element(
-                    By.XPATH, 
-                    ".//button/svg[contains(@viewBox, '0 0 16 16') and contains(@stroke, '#39C0DE')]"
-                )
-                return "Available for Download"
-            except:
-                pass
-                
-            # Additional check for small layout
-            if layout_type == "small":
-                try:
-                    # Look for any button with blue path in small layout
-                    blue_paths = track.find_elements(
-                        By.XPATH,
-                        ".//path[contains(@stroke, '#39') or contains(@fill, '#39')]"
-                    )
-                    if blue_paths:
-                        return "Available for Download"
-                except:
-                    pass
-                
-            return "No Download Status Found"
-            
+            return self.layout_for(layout_type).status(track)
         except Exception as e:
             logging.error(f"Error determining download status: {e}")
             return "Error Determining Status"
@@ -1554,7 +2438,7 @@ class BeatportTrackFinder:
                 current_page = self.start_page
                 logging.info(f"Navigated to start page {current_page}")
                 self.current_page = current_page
-                time.sleep(2)  # Wait for page to load
+                self.pace('page_load')
             
             # Process each page
             while current_page <= self.end_page:
@@ -1580,6 +2464,8 @@ class BeatportTrackFinder:
             logging.info("=" * 50)
             logging.info(f"Total successful downloads added: {self.successful_downloads}")
             logging.info(f"Total failed downloads: {len(self.failed_downloads)}")
+            logging.info(f"Total skipped as already in local library: {self.duplicate_count}")
+            logging.info(f"Total skipped by track filter: {self.filtered_count}")
             logging.info("=" * 50)
             
             return True
@@ -1590,10 +2476,183 @@ class BeatportTrackFinder:
             return False
             
         finally:
+            self.wait_for_browser_downloads()
+            self.finish_direct_downloads()
+            self.organize_downloads()
+            self.save_failed_downloads()
+            self.report.close()
+            self.diagnostics.close()
+            self.selector_manager.save_stats()
+            self.popup_stats.save()
+            if self.api_client:
+                self.api_client.close()
             if self.driver:
                 self.driver.quit()
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Beatport Auto Downloader")
+    parser.add_argument("--cli", action="store_true", help="Run without the GUI")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Keep the browser open and sync new tracks on an interval")
+    parser.add_argument("--interval", type=float, default=3600, help="Daemon: seconds between sync cycles")
+    parser.add_argument("--jitter", type=float, default=0.1, help="Daemon: random spread as a fraction of the interval")
+    parser.add_argument("--status-port", type=int, default=8765, help="Daemon: port of the local JSON status endpoint")
+    parser.add_argument("--accounts", help="JSON file listing accounts to run concurrently")
+    parser.add_argument("--max-browsers", type=int, default=2, help="Accounts: browsers open at the same time")
+    parser.add_argument("--bandwidth-limit", type=float,
+                        help="Accounts: best-effort MB/s split evenly between the browsers")
+    parser.add_argument("--engine", choices=ENGINES, default="selenium",
+                        help="Page engine: one tab, a pool of tabs in the same browser, or CDP tabs driven by asyncio")
+    parser.add_argument("--tabs", type=int, default=3, help="Tab pool and async engines: tabs working pages at the same time")
+    parser.add_argument("--budget", default="",
+                        help="Actions per second for each phase, e.g. page_load=0.5,click=2,download_start=1")
+    parser.add_argument("--max-browser-memory", type=float, default=2048,
+                        help="Recycle Chrome once its processes use this many MB (needs psutil, 0 disables)")
+    parser.add_argument("--max-js-heap", type=float, default=768,
+                        help="Recycle Chrome once the page's JS heap passes this many MB (0 disables)")
+    parser.add_argument("--rebuild-library-index", action="store_true",
+                        help="Rescan the download folder into the library index and exit")
+    parser.add_argument("--start-page", type=int, default=1)
+    parser.add_argument("--end-page", type=int)
+    parser.add_argument("--download-location", default=os.getcwd())
+    parser.add_argument("--check-downloads", action="store_true", help="Process the downloads page afterwards")
+    parser.add_argument("--use-api", action="store_true", help="List library pages through the API")
+    parser.add_argument("--sync", action="store_true", help="Only download tracks added since the last sync")
+    parser.add_argument("--filter", dest="filter_expression", default="",
+                        help=f"Track filter expression: {FILTER_HELP}")
+    parser.add_argument("--artist", help="Artist regex")
+    parser.add_argument("--title", help="Title regex")
+    parser.add_argument("--label", help="Label name(s), comma separated")
+    parser.add_argument("--genre", help="Genre name(s), comma separated")
+    parser.add_argument("--bpm", help="BPM range, e.g. 120-128")
+    parser.add_argument("--key", help="Key(s), comma separated")
+    parser.add_argument("--date", help="Date range, e.g. 2024-01-01..2024-06-30")
+    parser.add_argument("--limit", type=int, help="Maximum number of tracks to download")
+    return parser.parse_args(argv)
+
+def build_track_filter(args):
+    """Combine --filter with the individual filter options into one TrackFilter, or None"""
+    clauses = [args.filter_expression] if args.filter_expression else []
+    for field in ("artist", "title", "label", "genre", "bpm", "key", "date", "limit"):
+        value = getattr(args, field)
+        if value is not None:
+            clauses.append(shlex.quote(f"{field}:{value}"))
+    return TrackFilter.parse(" ".join(clauses)) if clauses else None
+
+def finder_class_for(engine):
+    """Return the finder class for an engine name, falling back to Selenium when the async engine can't load"""
+    # Imported here because both engines build on this module
+    if engine == 'tabs':
+        from beatport_auto.tab_pool import TabPoolTrackFinder
+        return TabPoolTrackFinder
+    if engine != 'async':
+        return BeatportTrackFinder
+    from beatport_auto.async_engine import ASYNC_ENGINE_AVAILABLE, AsyncBeatportTrackFinder
+    if not ASYNC_ENGINE_AVAILABLE:
+        logging.warning("The async engine needs the websockets package, using the Selenium engine")
+        return BeatportTrackFinder
+    return AsyncBeatportTrackFinder
+
+def run_cli(args):
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    finder_class = finder_class_for(args.engine)
+    # Only the tab pool and async engines work pages in several tabs
+    engine_options = {} if finder_class is BeatportTrackFinder else {'tabs': args.tabs}
+    finder = finder_class(
+        args.start_page,
+        args.end_page if args.sync else (args.end_page or args.start_page),
+        args.check_downloads,
+        args.download_location,
+        True,
+        use_api=args.use_api,
+        track_filter=build_track_filter(args),
+        sync_mode=args.sync,
+        politeness=PolitenessBudget(parse_budgets(args.budget)),
+        memory_watchdog=MemoryWatchdog(args.max_browser_memory, args.max_js_heap),
+        **engine_options
+    )
+    finder.initialize_browser()
+    input("Log in to Beatport in the browser window, then press Enter to continue...")
+    try:
+        finder.click_next_and_process()
+    finally:
+        finder.driver.quit()
+
+def run_daemon(args):
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    finder = BeatportTrackFinder(
+        1,
+        args.end_page,
+        args.check_downloads,
+        args.download_location,
+        True,
+        use_api=args.use_api,
+        track_filter=build_track_filter(args),
+        sync_mode=True,
+        politeness=PolitenessBudget(parse_budgets(args.budget)),
+        memory_watchdog=MemoryWatchdog(args.max_browser_memory, args.max_js_heap)
+    )
+    finder.initialize_browser()
+    input("Log in to Beatport in the browser window, then press Enter to start the daemon...")
+    SyncDaemon(finder, args.interval, args.jitter, status_port=args.status_port).run_forever()
+
+def build_account_finder(account, download_throughput=None):
+    """Create the finder for one entry of the accounts file"""
+    start_page = account.get('start_page', 1)
+    return BeatportTrackFinder(
+        start_page,
+        account.get('end_page') if account['sync'] else account.get('end_page', start_page),
+        account.get('check_downloads', False),
+        account['download_location'],
+        True,
+        use_api=account.get('use_api', False),
+        track_filter=TrackFilter.parse(account['filter']) if account.get('filter') else None,
+        sync_mode=account['sync'],
+        profile_dir=account['profile_dir'],
+        download_throughput=download_throughput,
+        politeness=PolitenessBudget(parse_budgets(account.get('budget', '')))
+    )
+
+def rebuild_library_index(args):
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    organizer = LibraryOrganizer(args.download_location)
+    try:
+        counts = organizer.scan()
+    finally:
+        organizer.close()
+    logging.info(f"Library index rebuilt: {counts['updated']} updated, {counts['removed']} removed, "
+                 f"{counts['unchanged']} unchanged")
+
+def run_accounts(args):
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(threadName)s - %(levelname)s - %(message)s')
+    runner = AccountRunner(
+        load_accounts(args.accounts),
+        build_account_finder,
+        max_browsers=args.max_browsers,
+        bandwidth_limit=args.bandwidth_limit * 1024 * 1024 if args.bandwidth_limit else None
+    )
+    runner.run()
+    runner.write_summary(os.path.dirname(os.path.abspath(args.accounts)))
+
+def main(argv=None):
+    # Tag reading uses a process pool, which frozen Windows builds must bootstrap
+    multiprocessing.freeze_support()
+    args = parse_args(argv)
+    if args.rebuild_library_index:
+        rebuild_library_index(args)
+        return
+    if args.accounts:
+        try:
+            run_accounts(args)
+        except ValueError as e:
+            raise SystemExit(f"Error: {e}")
+        return
+    if args.cli or args.daemon:
+        try:
+            run_daemon(args) if args.daemon else run_cli(args)
+        except ValueError as e:
+            raise SystemExit(f"Error: {e}")
+        return
     app = BeatportUI()
     app.window.mainloop()
 
@@ -0,0 +1,128 @@
+"""
+Multi-account runner for the Beatport Auto Downloader.
+Runs one isolated BeatportTrackFinder per account concurrently under a shared browser cap.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from beatport_auto.utils.rate_limiter import parse_budgets
+
+
+def load_accounts(path: str) -> List[Dict]:
+    """
+    Load the accounts file: a JSON list of objects with at least name and download_location.
+
+    Optional keys: profile_dir (defaults to profiles/<name> next to the accounts file),
+    start_page, end_page, sync (default true), use_api, check_downloads, filter and budget
+    (per-phase actions per second, e.g. "click=1,page_load=0.25").
+
+    Raises:
+        ValueError: If an account is missing a required key, names are reused or a budget is invalid
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        accounts = json.load(f)
+    if not isinstance(accounts, list) or not accounts:
+        raise ValueError("The accounts file must contain a non-empty JSON list")
+
+    base_dir = os.path.dirname(os.path.abspath(path))
+    names = set()
+    for account in accounts:
+        for key in ("name", "download_location"):
+            if not account.get(key):
+                raise ValueError(f"Account entry is missing '{key}': {account}")
+        if account["name"] in names:
+            raise ValueError(f"Duplicate account name: {account['name']}")
+        names.add(account["name"])
+        parse_budgets(account.get("budget", ""))
+        account.setdefault("profile_dir", os.path.join(base_dir, "profiles", account["name"]))
+        account.setdefault("sync", True)
+    return accounts
+
+
+class AccountRunner:
+    """
+    Runs every account at once, each in its own thread with its own Chrome
+    profile, download folder and ledgers (failure queue, run report and sync
+    state all live in the download folder).
+
+    At most max_browsers Chrome instances are open at a time; accounts beyond
+    that wait for a slot. bandwidth_limit (bytes per second) is a best-effort,
+    static cap: each browser gets limit / max_browsers through CDP network
+    emulation. The share does not move to busier browsers, and Chrome's
+    download manager may not honour the emulation, so file transfers can
+    exceed it.
+    """
+
+    def __init__(self, accounts: List[Dict], finder_factory: Callable[..., object], max_browsers: int = 2,
+                 bandwidth_limit: Optional[float] = None):
+        self.accounts = accounts
+        self.finder_factory = finder_factory
+        self.max_browsers = max(1, max_browsers)
+        self.browser_slots = threading.Semaphore(self.max_browsers)
+        self.browser_throughput = bandwidth_limit / self.max_browsers if bandwidth_limit else None
+        self.results: List[Dict] = []
+
+    def run_account(self, account: Dict) -> Dict:
+        """Run one account start to finish and return its summary."""
+        threading.current_thread().name = account["name"]
+        result = {"account": account["name"], "ok": False, "error": None}
+        queued = time.time()
+        finder = None
+        with self.browser_slots:
+            started = time.time()
+            result["waited_for_browser"] = round(started - queued, 1)
+            try:
+                os.makedirs(account["download_location"], exist_ok=True)
+                os.makedirs(account["profile_dir"], exist_ok=True)
+                finder = self.finder_factory(account, download_throughput=self.browser_throughput)
+                finder.initialize_browser()
+                if not finder.navigate_to_my_library():
+                    raise RuntimeError("Login was not completed")
+                finder.click_next_and_process()
+                result["ok"] = True
+            except Exception as e:
+                logging.error(f"Account {account['name']} failed: {e}")
+                result["error"] = str(e)
+            finally:
+                if finder is not None:
+                    result.update(finder.progress_snapshot())
+                    if finder.driver:
+                        finder.driver.quit()
+                result["duration"] = round(time.time() - started, 1)
+        return result
+
+    def run(self) -> List[Dict]:
+        """Run all accounts concurrently; wall time tracks the slowest account, not the sum."""
+        started = time.time()
+        with ThreadPoolExecutor(max_workers=len(self.accounts)) as executor:
+            self.results = list(executor.map(self.run_account, self.accounts))
+        self.log_summary(time.time() - started)
+        return self.results
+
+    def log_summary(self, wall_time: float) -> None:
+        logging.info("\nMulti-Account Summary:")
+        logging.info("=" * 50)
+        for result in self.results:
+            status = "OK" if result["ok"] else f"FAILED ({result['error']})"
+            logging.info(
+                f"{result['account']}: {status} - {result.get('successful_downloads', 0)} downloads, "
+                f"{result.get('failed_downloads', 0)} failed, {result['duration']}s"
+            )
+        logging.info(f"Total downloads added: {sum(r.get('successful_downloads', 0) for r in self.results)}")
+        logging.info(f"Wall time: {wall_time:.1f}s (sum of account times: {sum(r['duration'] for r in self.results):.1f}s)")
+        logging.info("=" * 50)
+
+    def write_summary(self, directory: str) -> str:
+        """Write the combined results to multi_account_summary_<timestamp>.json in directory."""
+        path = os.path.join(directory, f"multi_account_summary_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.results, f, indent=2)
+        logging.info(f"Combined summary saved to {path}")
+        return path
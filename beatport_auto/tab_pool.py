@@ -0,0 +1,256 @@
+"""
+Tab-pool engine for the Beatport Auto Downloader.
+Works several library pages at once in tabs of the one logged-in webdriver.Chrome, interleaving their waits.
+"""
+
+import logging
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+from beatport_auto.main import API_PAGE_SIZE, BeatportTrackFinder
+from beatport_auto.utils.failures import FailureReason, classify_exception
+from beatport_auto.utils.page_scripts import ROW_FUNCTIONS
+
+ROW_TIMEOUT = 20  # Seconds a tab may take to render its rows
+POPUP_TIMEOUT = 1.5  # Seconds to wait for a download popup; many rows download without one
+IDLE_PASS_SLEEP = 0.1  # Pause after a pass in which no tab could make progress
+
+# Marks the old document so rows are never read from it after navigating away
+NAVIGATE_SCRIPT = "window.__tabPoolNavigating = true; window.location.href = arguments[0];"
+
+# Returns the page's rows once the new document has loaded and rendered them, otherwise null
+ROW_SNAPSHOT_SCRIPT = ROW_FUNCTIONS + """
+if (window.__tabPoolNavigating || document.readyState !== 'complete') return null;
+const rows = findRows(arguments[0]);
+return rows.length ? describeRows(rows) : null;
+"""
+
+CLICK_ROW_SCRIPT = ROW_FUNCTIONS + "return clickRow(arguments[0], arguments[1]);"
+
+POPUP_CLICK_SCRIPT = ROW_FUNCTIONS + """
+const button = findPopupButton();
+if (button) button.click();
+return Boolean(button);
+"""
+
+
+class TabTask:
+    """
+    Where one tab is in its page: waiting to navigate, loading, clicking rows,
+    waiting for its next click to fit the politeness budget, or waiting on a
+    popup.
+
+    Every step the scheduler takes on a task is a single short script call,
+    so a tab that is waiting never holds up the others.
+    """
+
+    QUEUED = "queued"
+    LOADING = "loading"
+    CLICKING = "clicking"
+    ARMED = "armed"
+    POPUP = "popup"
+
+    def __init__(self, handle: str, page_number: int, url: str, not_before: float = 0.0):
+        self.handle = handle
+        self.page_number = page_number
+        self.url = url
+        self.state = self.QUEUED
+        self.not_before = not_before  # The budget's earliest time for this task's next action
+        self.deadline = 0.0
+        self.rows: List[Dict] = []
+        self.position = 0
+        self.clicked: Optional[Dict] = None
+
+
+class TabPoolTrackFinder(BeatportTrackFinder):
+    """
+    BeatportTrackFinder that spreads a page range over `tabs` tabs of its own
+    browser instead of one browser per worker.
+
+    A round-robin scheduler switches between tabs and advances each by one
+    step: while one tab is still rendering, waiting on a popup or waiting for
+    the politeness budget, the next is clicking. WebDriver only talks to one
+    tab at a time, so the gain comes from overlapping page loads and popup
+    waits, not from parallel clicks.
+
+    Replay, API listing, sync and downloads-page runs are left to the
+    single-tab engine.
+    """
+
+    def __init__(self, *args, tabs: int = 3, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.tabs = max(1, tabs)
+
+    def click_next_and_process(self):
+        if self.replay_failures or self.use_api or self.sync_mode or self.downloads_page_only:
+            logging.info("Replay, API, sync and downloads page runs use a single tab")
+            return super().click_next_and_process()
+
+        try:
+            self.run_selector_health_check()
+            self.load_dedup_index()
+            self.start_direct_downloads()
+            self.process_pages_in_tabs(list(range(self.start_page, self.end_page + 1)))
+            if self.check_downloads:
+                logging.info("\nChecking downloads page...")
+                self.check_downloads_page()
+        except Exception as e:
+            logging.error(f"Error in tab pool: {e}")
+        finally:
+            self.finish_run()
+
+    def process_pages_in_tabs(self, pages: List[int]) -> None:
+        """Work through pages with one task per tab until every page is done."""
+        main_handle = self.driver.current_window_handle
+        handles = [main_handle]
+        for _ in range(min(self.tabs, len(pages)) - 1):
+            self.driver.switch_to.new_window('tab')
+            handles.append(self.driver.current_window_handle)
+        logging.info(f"Processing {len(pages)} pages in {len(handles)} tabs")
+
+        queue: Deque[int] = deque(pages)
+        tasks: Dict[str, Optional[TabTask]] = {handle: None for handle in handles}
+        try:
+            while queue or any(tasks.values()):
+                progressed = False
+                for handle in handles:
+                    if tasks[handle] is None:
+                        if not queue or self.filter_limit_reached():
+                            continue
+                        tasks[handle] = self.start_task(handle, queue.popleft())
+                        progressed = True
+                        continue
+                    if tasks[handle].not_before > time.time():
+                        continue
+                    try:
+                        self.driver.switch_to.window(handle)
+                        progressed |= self.step(tasks[handle])
+                    except Exception as e:
+                        logging.error(f"Error processing page {tasks[handle].page_number}: {e}")
+                        self.record_unfinished_rows(tasks[handle], e)
+                        tasks[handle] = None
+                        continue
+                    if tasks[handle].state is None:
+                        tasks[handle] = None
+                if not progressed:
+                    time.sleep(IDLE_PASS_SLEEP)
+                if self.filter_limit_reached() and not any(t and t.state in (TabTask.ARMED, TabTask.POPUP) for t in tasks.values()):
+                    logging.info(f"Track filter limit of {self.track_filter.limit} reached")
+                    break
+        finally:
+            for handle in handles[1:]:
+                try:
+                    self.driver.switch_to.window(handle)
+                    self.driver.close()
+                except Exception as e:
+                    logging.debug(f"Could not close tab: {e}")
+            self.driver.switch_to.window(main_handle)
+
+    def start_task(self, handle: str, page_number: int) -> TabTask:
+        """Give a tab its page; it navigates once the page-load budget allows."""
+        url = f"https://www.beatport.com/library?page={page_number}&per_page={API_PAGE_SIZE}"
+        return TabTask(handle, page_number, url, time.time() + self.politeness.reserve('page_load'))
+
+    def step(self, task: TabTask) -> bool:
+        """
+        Advance a task by one step; sets task.state to None once its page is done.
+
+        Returns:
+            Whether the task made progress, as opposed to still waiting
+        """
+        if task.state == TabTask.QUEUED:
+            # Navigate without waiting for the load; the LOADING step polls for rows
+            self.driver.execute_script(NAVIGATE_SCRIPT, task.url)
+            task.state, task.deadline = TabTask.LOADING, time.time() + ROW_TIMEOUT
+            return True
+
+        if task.state == TabTask.LOADING:
+            rows = self.driver.execute_script(ROW_SNAPSHOT_SCRIPT, self.container_selectors())
+            if rows:
+                logging.info(f"Page {task.page_number}: found {len(rows)} tracks")
+                task.rows, task.state = rows, TabTask.CLICKING
+                self.rows_on_page = len(rows)
+                self.mark_page_visited(task.url)
+                self.check_page_health(len(rows), task.page_number, task.url)
+                return True
+            if time.time() > task.deadline:
+                logging.error(f"No tracks found on page {task.page_number}")
+                self.check_page_health(0, task.page_number, task.url)
+                task.state = None
+                return True
+            return False
+
+        if task.state == TabTask.ARMED:
+            self.click_armed_row(task)
+            return True
+
+        if task.state == TabTask.POPUP:
+            clicked = self.driver.execute_script(POPUP_CLICK_SCRIPT)
+            if not clicked and time.time() < task.deadline:
+                return False
+            if clicked:
+                logging.info("Clicked download button in popup")
+            row = task.clicked
+            self.current_page = task.page_number
+            self.record_success(None, row["name"], "tab_pool", row["artist"], row["track_id"])
+            logging.info(f"[SUCCESS] Added to downloads: {row['name']}")
+            task.clicked, task.state = None, TabTask.CLICKING
+            return True
+
+        self.click_next_row(task)
+        return True
+
+    def click_next_row(self, task: TabTask) -> None:
+        """Record rows that need no click and click the next downloadable one."""
+        # current_page is shared by all tabs; set it right before each record call
+        self.current_page = task.page_number
+        while task.position < len(task.rows):
+            if self.filter_limit_reached():
+                break
+            row = self.row_to_click(task.rows[task.position], task.url)
+            task.position += 1
+            if row:
+                # The click happens on a later pass, once the download-start budget allows it
+                task.clicked = row
+                task.state = TabTask.ARMED
+                task.not_before = time.time() + self.politeness.reserve('download_start')
+                return
+        task.state = None
+
+    def record_unfinished_rows(self, task: TabTask, error: Exception) -> None:
+        """Record the rows a failed tab never finished, so a replay picks them up."""
+        self.current_page = task.page_number
+        unfinished = [task.clicked] if task.clicked else []
+        unfinished += task.rows[task.position:]
+        for row in unfinished:
+            self.record_failure(row["name"] or "Track name not found", row["artist"] or "Artist name not found",
+                                f"Tab failed before the row was finished: {error}", classify_exception(error),
+                                row["track_id"], page_url=task.url)
+
+    def click_armed_row(self, task: TabTask) -> None:
+        """Click the row picked by click_next_row and start waiting for its popup."""
+        row = task.clicked
+        self.current_page = task.page_number
+        task.state = TabTask.CLICKING
+        # Expect before clicking: the download can begin while the popup is still open
+        if self.download_events:
+            self.download_events.expect(row["track_id"])
+        try:
+            clicked = self.driver.execute_script(CLICK_ROW_SCRIPT, self.container_selectors(), row["index"])
+        except Exception as e:
+            task.clicked = None
+            if self.download_events:
+                self.download_events.forget(row["track_id"])
+            self.record_failure(row["name"], row["artist"], f"Download button click failed: {e}",
+                                classify_exception(e), row["track_id"], page_url=task.url)
+            return
+        if not clicked:
+            task.clicked = None
+            if self.download_events:
+                self.download_events.forget(row["track_id"])
+            self.record_failure(row["name"], row["artist"], "Download button not found", FailureReason.NO_BUTTON,
+                                row["track_id"], page_url=task.url)
+            return
+        self.last_click_time = time.time()
+        task.state, task.deadline = TabTask.POPUP, time.time() + POPUP_TIMEOUT
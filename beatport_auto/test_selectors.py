@@ -14,10 +14,7 @@ from selenium.common.exceptions import NoSuchElementException, TimeoutException,
 from webdriver_manager.chrome import ChromeDriverManager
 from datetime import datetime
 
-# Import the SelectorsManager from main.py
-import sys
-sys.path.append(str(Path(__file__).parent))
-from main import SelectorsManager
+from beatport_auto.utils.selector_manager import SelectorsManager
 
 class SelectorTester:
     def __init__(self, test_downloads_page=False):
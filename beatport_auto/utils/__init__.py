@@ -0,0 +1,3 @@
+"""
+Utilities for the Beatport Auto Downloader
+"""
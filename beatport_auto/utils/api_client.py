@@ -0,0 +1,169 @@
+"""
+Fast-path JSON API client for Beatport library data.
+Reuses the browser's authenticated session to list library and downloads pages over pooled HTTP.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Unverified: the host, session URL and endpoints below are inferred from the web front end, not from
+# published API docs. Any failure makes the finder fall back to reading the pages themselves.
+API_BASE = "https://api.beatport.com/v4"
+SESSION_URL = "https://www.beatport.com/api/auth/session"
+
+# Endpoints assumed to back the library and downloads views
+ENDPOINTS = {
+    "library": "/my/beatport/tracks/",
+    "downloads": "/my/downloads/",
+}
+
+
+def create_session(pool_size: int = 4) -> requests.Session:
+    """Create a keep-alive session with a connection pool and retries on transient errors."""
+    session = requests.Session()
+    retries = Retry(total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504])
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size, max_retries=retries)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def copy_driver_session(driver, session: requests.Session) -> requests.Session:
+    """Copy the browser's cookies and user agent into a requests session."""
+    for cookie in driver.get_cookies():
+        session.cookies.set(
+            cookie["name"],
+            cookie["value"],
+            domain=cookie.get("domain"),
+            path=cookie.get("path", "/")
+        )
+    session.headers["User-Agent"] = driver.execute_script("return navigator.userAgent;")
+    return session
+
+
+class BeatportApiClient:
+    """
+    Lists library and downloads pages through the Beatport API.
+
+    Credentials are lifted from a logged-in WebDriver: its cookies are copied
+    into a pooled requests.Session, which is then used to fetch the same access
+    token the front end uses. Pages are fetched concurrently over keep-alive
+    connections, so scanning and status classification never touch the DOM.
+
+    The endpoints and the fields read by normalize_track are unverified
+    guesses at what the front end uses. Callers treat every failure, including
+    a failed login, as a reason to fall back to DOM scraping.
+    """
+
+    def __init__(self, session: Optional[requests.Session] = None, max_workers: int = 4, timeout: float = 15):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.session = session or create_session(max_workers)
+        self.session.headers.update({"Accept": "application/json"})
+
+    @classmethod
+    def from_driver(cls, driver, **kwargs) -> Optional["BeatportApiClient"]:
+        """
+        Build a client that shares the browser's login.
+
+        Args:
+            driver: Logged-in WebDriver on a beatport.com page
+            **kwargs: Passed through to the constructor
+
+        Returns:
+            A client with the browser's cookies, user agent and access token,
+            or None if no access token could be fetched
+        """
+        client = cls(**kwargs)
+        copy_driver_session(driver, client.session)
+        if not client.authenticate():
+            client.close()
+            return None
+        return client
+
+    def authenticate(self) -> bool:
+        """Fetch the front end's access token with the session cookies."""
+        try:
+            response = self.session.get(SESSION_URL, timeout=self.timeout)
+            response.raise_for_status()
+            token = (response.json().get("token") or {}).get("accessToken")
+            if not token:
+                logging.warning("No API access token in the browser session")
+                return False
+            self.session.headers["Authorization"] = f"Bearer {token}"
+            return True
+        except Exception as e:
+            logging.error(f"Error fetching API access token: {e}")
+            return False
+
+    def fetch_page(self, source: str, page: int, per_page: int = 100) -> List[Dict]:
+        """
+        Fetch one page of tracks.
+
+        Args:
+            source: 'library' or 'downloads'
+            page: 1-based page number, matching the page numbers of the web UI
+            per_page: Tracks per page
+
+        Returns:
+            Normalized track records (see normalize_track)
+        """
+        response = self.session.get(
+            API_BASE + ENDPOINTS[source],
+            params={"page": page, "per_page": per_page},
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        return [self.normalize_track(item) for item in response.json().get("results", [])]
+
+    def fetch_pages(self, source: str, pages: Iterable[int], per_page: int = 100) -> Optional[Dict[int, List[Dict]]]:
+        """
+        Fetch several pages concurrently.
+
+        Returns:
+            Mapping of page number to track records, or None if any page failed
+            so callers can fall back to scanning the DOM
+        """
+        pages = list(pages)
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                results = executor.map(lambda page: self.fetch_page(source, page, per_page), pages)
+                return dict(zip(pages, results))
+        except Exception as e:
+            logging.error(f"Error fetching {source} pages from the API: {e}")
+            return None
+
+    @staticmethod
+    def normalize_track(item: Dict) -> Dict:
+        """
+        Flatten an API track item into the fields the finder uses.
+
+        The downloaded flags checked here are unverified; an item with none of
+        them counts as available, and the download click then sorts it out.
+        """
+        track = item.get("track", item)
+        name = track.get("name", "")
+        if track.get("mix_name"):
+            name = f"{name} ({track['mix_name']})"
+
+        downloaded = item.get("is_downloaded") or item.get("download_count") or item.get("downloaded")
+        return {
+            "track_id": str(track.get("id", "")),
+            "name": name,
+            "artist": ", ".join(a.get("name", "") for a in track.get("artists", [])),
+            "label": (track.get("release", {}).get("label") or track.get("label") or {}).get("name"),
+            "genre": (track.get("genre") or {}).get("name"),
+            "bpm": track.get("bpm"),
+            "key": (track.get("key") or {}).get("name"),
+            "date": track.get("publish_date") or track.get("new_release_date"),
+            "status": "Already Downloaded" if downloaded else "Available for Download",
+        }
+
+    def close(self) -> None:
+        """Close pooled connections."""
+        self.session.close()
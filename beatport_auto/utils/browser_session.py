@@ -0,0 +1,181 @@
+"""
+Browser session helpers for the Beatport Auto Downloader.
+Samples Chrome's memory, spots dead sessions and carries a login across a driver restart.
+"""
+
+import logging
+from typing import Dict, List, Optional
+
+from selenium.common.exceptions import (
+    InvalidSessionIdException, NoSuchElementException, NoSuchWindowException, StaleElementReferenceException,
+    TimeoutException, WebDriverException
+)
+
+try:
+    import psutil
+except ImportError:  # Optional: without it only the JS heap is watched
+    psutil = None
+
+MB = 1024 * 1024
+
+# Fields Network.setCookies accepts out of what Network.getAllCookies returns
+COOKIE_FIELDS = ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite", "expires", "priority")
+
+
+def snapshot_cookies(driver) -> List[Dict]:
+    """Every cookie in the browser, including httpOnly and cross-domain ones, in CDP form."""
+    cookies = driver.execute_cdp_cmd('Network.getAllCookies', {}).get('cookies', [])
+    return [
+        {field: cookie[field] for field in COOKIE_FIELDS if field in cookie}
+        for cookie in cookies
+    ]
+
+
+def restore_cookies(driver, cookies: List[Dict]) -> None:
+    """Put cookies from snapshot_cookies back into a fresh browser before it visits any page."""
+    params = []
+    for cookie in cookies:
+        cookie = dict(cookie)
+        # Session cookies report expires=-1, which setCookies would treat as already expired
+        if cookie.get('expires', 0) <= 0:
+            cookie.pop('expires', None)
+        params.append(cookie)
+    if params:
+        driver.execute_cdp_cmd('Network.setCookies', {'cookies': params})
+
+
+def chrome_rss(driver) -> Optional[int]:
+    """
+    Resident memory in bytes of every Chrome process started by the driver.
+
+    Returns:
+        None when psutil is not installed or the process tree can't be read
+    """
+    if psutil is None:
+        return None
+    try:
+        service = psutil.Process(driver.service.process.pid)
+        total = 0
+        for process in service.children(recursive=True):
+            try:
+                total += process.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        return total
+    except Exception as e:
+        logging.debug(f"Could not read Chrome memory: {e}")
+        return None
+
+
+def js_heap_used(driver) -> Optional[int]:
+    """Bytes of JS heap used by the current tab, from Performance.getMetrics."""
+    try:
+        driver.execute_cdp_cmd('Performance.enable', {})
+        metrics = driver.execute_cdp_cmd('Performance.getMetrics', {}).get('metrics', [])
+    except Exception as e:
+        logging.debug(f"Could not read JS heap size: {e}")
+        return None
+    for metric in metrics:
+        if metric.get('name') == 'JSHeapUsedSize':
+            return int(metric['value'])
+    return None
+
+
+class MemoryWatchdog:
+    """
+    Decides when a long-running browser has grown too large to keep.
+
+    Chrome's process-tree RSS (needs psutil) and the tab's JS heap are
+    sampled between pages; once either passes its limit, check() returns the
+    reason and the finder recycles the browser. A limit of 0 turns that
+    check off.
+    """
+
+    def __init__(self, max_rss_mb: float = 2048, max_heap_mb: float = 768):
+        self.max_rss_mb = max_rss_mb
+        self.max_heap_mb = max_heap_mb
+        self.last_sample: Dict[str, Optional[float]] = {}
+        self.peak_rss_mb = 0.0
+        self.peak_heap_mb = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.max_rss_mb or self.max_heap_mb)
+
+    def sample(self, driver) -> Dict[str, Optional[float]]:
+        """Current RSS and JS heap in MB; a value is None when it could not be read."""
+        rss = chrome_rss(driver) if self.max_rss_mb else None
+        heap = js_heap_used(driver) if self.max_heap_mb else None
+        self.last_sample = {
+            'rss_mb': round(rss / MB, 1) if rss is not None else None,
+            'js_heap_mb': round(heap / MB, 1) if heap is not None else None,
+        }
+        self.peak_rss_mb = max(self.peak_rss_mb, self.last_sample['rss_mb'] or 0)
+        self.peak_heap_mb = max(self.peak_heap_mb, self.last_sample['js_heap_mb'] or 0)
+        return self.last_sample
+
+    def check(self, driver) -> Optional[str]:
+        """
+        Sample the browser and compare against the limits.
+
+        Returns:
+            Why the browser should be recycled, or None while it is within its limits
+        """
+        if not self.enabled:
+            return None
+        sample = self.sample(driver)
+        if self.max_rss_mb and sample['rss_mb'] is not None and sample['rss_mb'] > self.max_rss_mb:
+            return f"Chrome uses {sample['rss_mb']:.0f} MB (limit {self.max_rss_mb:.0f} MB)"
+        if self.max_heap_mb and sample['js_heap_mb'] is not None and sample['js_heap_mb'] > self.max_heap_mb:
+            return f"JS heap is {sample['js_heap_mb']:.0f} MB (limit {self.max_heap_mb:.0f} MB)"
+        return None
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        return dict(self.last_sample, peak_rss_mb=self.peak_rss_mb, peak_heap_mb=self.peak_heap_mb)
+
+
+class SessionLost(Exception):
+    """The WebDriver session died: Chrome crashed, its window closed or chromedriver went away."""
+
+
+# Error texts Selenium uses once the browser behind a session is gone
+SESSION_LOST_MARKERS = (
+    "invalid session id",
+    "session deleted",
+    "chrome not reachable",
+    "disconnected",
+    "target window already closed",
+    "no such window",
+    "connection refused",
+    "max retries exceeded",
+)
+
+# WebDriver errors about the page, which say nothing about the session
+ORDINARY_ERRORS = (NoSuchElementException, StaleElementReferenceException, TimeoutException)
+
+
+def is_session_lost(error: Exception, driver=None) -> bool:
+    """
+    Tell a dead browser session apart from an ordinary WebDriver error.
+
+    Most WebDriverExceptions (missing elements, stale rows, timeouts) leave
+    the session usable. When the error itself doesn't say, a trivial script
+    is sent to the driver to find out.
+    """
+    if isinstance(error, SessionLost):
+        return True
+    if isinstance(error, (InvalidSessionIdException, NoSuchWindowException, ConnectionError)):
+        return True
+    # A dead chromedriver surfaces as a urllib3 error rather than a WebDriverException
+    message = str(error).lower()
+    if any(marker in message for marker in SESSION_LOST_MARKERS):
+        return True
+    if not isinstance(error, WebDriverException) or isinstance(error, ORDINARY_ERRORS):
+        return False
+    if driver is None:
+        return False
+    try:
+        driver.execute_script("return 1")
+        return False
+    except Exception:
+        return True
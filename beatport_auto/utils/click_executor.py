@@ -0,0 +1,56 @@
+"""
+Batched download clicks for the Beatport Auto Downloader.
+Scrolls, clicks and checks several rows' buttons in one injected script, spaced by the politeness budget.
+"""
+
+from typing import List, Sequence
+
+from beatport_auto.utils.page_scripts import CLICK_BATCH_FUNCTION
+from beatport_auto.utils.rate_limiter import PolitenessBudget
+
+CLICK_BATCH_SCRIPT = CLICK_BATCH_FUNCTION + """
+clickBatch(arguments[0], arguments[1], arguments[2], arguments[arguments.length - 1]);
+"""
+
+DEFAULT_SCRIPT_TIMEOUT = 30  # Seconds; WebDriver's default for async scripts
+SCRIPT_TIMEOUT_MARGIN = 10  # Seconds allowed on top of a batch's planned duration
+
+CLICKED = "clicked"
+MISSING = "missing"
+POPUP = "popup"
+
+
+class ClickExecutor:
+    """
+    Clicks a batch of download buttons in a single execute_async_script.
+
+    Each click is charged to the 'download_start' budget up front, and the
+    script waits out the resulting offsets in the page, so the pacing is the
+    same as clicking one row at a time without a round trip per row. After
+    every click the script gives the page popup_wait seconds to open a popup;
+    if one does, the batch stops there and the caller confirms it.
+
+    run() returns one result per button it got to: CLICKED, MISSING or
+    POPUP. Buttons after a popup have no result and are left to the caller.
+    """
+
+    def __init__(self, driver, politeness: PolitenessBudget):
+        self.driver = driver
+        self.politeness = politeness
+
+    def run(self, buttons: Sequence, popup_wait: float) -> List[str]:
+        if not buttons:
+            return []
+        offsets = [self.politeness.reserve('download_start') for _ in buttons]
+        planned = offsets[-1] + popup_wait * len(buttons)
+        self.driver.set_script_timeout(max(DEFAULT_SCRIPT_TIMEOUT, planned + SCRIPT_TIMEOUT_MARGIN))
+        try:
+            results = self.driver.execute_async_script(
+                CLICK_BATCH_SCRIPT,
+                list(buttons),
+                [int(offset * 1000) for offset in offsets],
+                int(popup_wait * 1000)
+            )
+        finally:
+            self.driver.set_script_timeout(DEFAULT_SCRIPT_TIMEOUT)
+        return list(results or [])
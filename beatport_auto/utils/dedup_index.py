@@ -0,0 +1,106 @@
+"""
+Local-library duplicate check for the Beatport Auto Downloader.
+Builds an in-memory set of normalized artist/title keys from the library index so rows can be checked in O(1).
+"""
+
+import logging
+import os
+import re
+import unicodedata
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from beatport_auto.utils.library_organizer import LibraryOrganizer
+
+# Files smaller than this are truncated or placeholder downloads, not a copy of the track
+MIN_AUDIO_BYTES = 256 * 1024
+
+ARTIST_SEPARATORS = re.compile(r"\s*(?:,|&|/|;|\bfeat\.?|\bft\.?|\bvs\.?|\bx\b|\band\b)\s*", re.IGNORECASE)
+TRACK_ID_PREFIX = re.compile(r"^(\d{6,})[_ -]")
+
+
+def _fold(text: str) -> str:
+    """Lowercase, strip accents and reduce to space-separated alphanumeric words."""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    return " ".join(re.sub(r"[^0-9a-z]+", " ", text).split())
+
+
+def normalize_title(title: str) -> str:
+    """Normalize a title; '(Original Mix)' is Beatport's default and dropped so tagged and listed names match."""
+    return " ".join(_fold(title).replace("original mix", " ").split())
+
+
+def normalize_artists(artist: str) -> str:
+    """Normalize an artist credit so order and separator style don't matter."""
+    names = {_fold(name) for name in ARTIST_SEPARATORS.split(artist)}
+    return "|".join(sorted(name for name in names if name))
+
+
+def track_key(artist: Optional[str], title: Optional[str]) -> Optional[Tuple[str, str]]:
+    """Dedup key for an artist/title pair, or None if either is missing."""
+    if not artist or not title:
+        return None
+    key = (normalize_artists(artist), normalize_title(title))
+    return key if all(key) else None
+
+
+class DedupIndex:
+    """
+    Answers "do we already have this track?" from the local library.
+
+    Keys are normalized (artist, title) pairs of files big enough to be a real
+    copy; Beatport track IDs found in filenames are kept as well. Both live in
+    sets, so a lookup per row costs nothing noticeable next to the DOM work
+    around it.
+    """
+
+    def __init__(self):
+        self.keys: Set[Tuple[str, str]] = set()
+        self.track_ids = set()
+
+    def add(self, record: Dict) -> None:
+        """Add one library index record (path, size, artist, title)."""
+        if (record.get("size") or 0) < MIN_AUDIO_BYTES:
+            return
+        key = track_key(record.get("artist"), record.get("title"))
+        if key:
+            self.keys.add(key)
+        match = TRACK_ID_PREFIX.match(os.path.basename(record.get("path") or ""))
+        if match:
+            self.track_ids.add(match.group(1))
+
+    def contains(self, artist: Optional[str], title: Optional[str], track_id: Optional[str] = None) -> bool:
+        """Check whether a track is already in the library."""
+        if track_id and track_id in self.track_ids:
+            return True
+        key = track_key(artist, title)
+        return key is not None and key in self.keys
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @classmethod
+    def from_library(cls, library_root: str, extra_roots: Iterable[str] = (),
+                     max_workers: Optional[int] = None) -> "DedupIndex":
+        """
+        Load the library index kept in library_root, indexing roots it has never seen.
+
+        Roots already in the index are not walked again: organize_new_files()
+        indexes every download it files, and --rebuild-library-index rescans
+        the download folder on demand. Extra roots are indexed into the same
+        database the first run that lists them.
+        """
+        index = cls()
+        organizer = LibraryOrganizer(library_root, max_workers=max_workers)
+        try:
+            for root in [library_root, *extra_roots]:
+                if not os.path.isdir(root):
+                    logging.warning(f"Library folder not found: {root}")
+                elif not organizer.index.covers(root):
+                    organizer.scan(root)
+            for record in organizer.index.records():
+                index.add(record)
+        finally:
+            organizer.close()
+        logging.info(f"Loaded {len(index)} local tracks for the duplicate check")
+        return index
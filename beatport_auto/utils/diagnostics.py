@@ -0,0 +1,162 @@
+"""
+Debug artifact capture for the Beatport Auto Downloader.
+Grabs screenshots and page source when failures pile up and writes them compressed from a background thread.
+"""
+
+import gzip
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, Optional
+
+DIAGNOSTICS_DIRNAME = "diagnostics"
+MAX_STORE_BYTES = 50 * 1024 * 1024
+QUEUE_SIZE = 4  # Captures waiting for the writer; more than this are dropped rather than waited on
+
+
+class DiagnosticsStore:
+    """
+    Size-capped folder of compressed debug captures, written by one background thread.
+
+    submit() only queues the bytes a capture grabbed from the browser. The
+    writer thread gzips the page source, writes the screenshot and a small
+    JSON description, then deletes the oldest captures until the folder is
+    under max_bytes again. When the writer falls behind, new captures are
+    dropped and counted instead of blocking the run.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = MAX_STORE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.dropped = 0
+        self.written = 0
+        self._queue: "queue.Queue[Optional[Dict]]" = queue.Queue(maxsize=QUEUE_SIZE)
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, name: str, screenshot: Optional[bytes], page_source: Optional[str], meta: Dict) -> bool:
+        """Queue a capture for writing. Returns False if it was dropped because the writer is busy."""
+        if self._thread is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._thread = threading.Thread(target=self._run, name="diagnostics-writer", daemon=True)
+            self._thread.start()
+        try:
+            self._queue.put_nowait({"name": name, "screenshot": screenshot, "page_source": page_source, "meta": meta})
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def close(self, timeout: float = 10) -> None:
+        """Let the writer finish the queued captures and stop it."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            capture = self._queue.get()
+            if capture is None:
+                return
+            try:
+                self._write(capture)
+                self._rotate()
+            except Exception as e:
+                logging.error(f"Could not write diagnostics capture {capture['name']}: {e}")
+
+    def _write(self, capture: Dict) -> None:
+        base = os.path.join(self.directory, capture["name"])
+        if capture["screenshot"]:
+            # PNG is already compressed, gzip would only cost time
+            with open(base + ".png", "wb") as f:
+                f.write(capture["screenshot"])
+        if capture["page_source"]:
+            with gzip.open(base + ".html.gz", "wt", encoding="utf-8", compresslevel=6) as f:
+                f.write(capture["page_source"])
+        with open(base + ".json", "w", encoding="utf-8") as f:
+            json.dump(capture["meta"], f, indent=2)
+        self.written += 1
+        logging.info(f"Diagnostics captured to {base}.*")
+
+    def _rotate(self) -> None:
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if os.path.isfile(path):
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, name, stat.st_size, path))
+        total = sum(size for _, _, size, _ in entries)
+        for _, _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+
+
+class FailureRateTrigger:
+    """
+    Decides when failures are frequent enough to be worth a capture.
+
+    Outcomes are kept over the last `window` tracks. A capture is due once
+    at least `min_samples` have been seen and the failure share reaches
+    `threshold`. After a capture, the trigger stays quiet for `cooldown`
+    seconds, so a bad stretch yields one capture, not one per failure.
+    """
+
+    def __init__(self, threshold: float = 0.3, window: int = 20, min_samples: int = 5, cooldown: float = 300):
+        self.threshold = threshold
+        self.min_samples = min_samples
+        self.cooldown = cooldown
+        self.outcomes = deque(maxlen=window)
+        self.last_capture = float("-inf")
+        self._lock = threading.Lock()
+
+    def observe(self, success: bool) -> None:
+        # Direct downloads report from their worker threads
+        with self._lock:
+            self.outcomes.append(success)
+
+    def failure_rate(self) -> float:
+        with self._lock:
+            if not self.outcomes:
+                return 0.0
+            return self.outcomes.count(False) / len(self.outcomes)
+
+    def due(self) -> bool:
+        with self._lock:
+            if len(self.outcomes) < self.min_samples or time.monotonic() - self.last_capture < self.cooldown:
+                return False
+        return self.failure_rate() >= self.threshold
+
+    def fired(self) -> None:
+        with self._lock:
+            self.last_capture = time.monotonic()
+            self.outcomes.clear()
+
+
+def capture_page(driver, store: DiagnosticsStore, reason: str, meta: Optional[Dict] = None) -> bool:
+    """
+    Grab the browser's screenshot and page source and hand them to the store.
+
+    Only the two WebDriver calls run on the caller's thread; compression and
+    disk writes happen in the store's writer.
+    """
+    try:
+        screenshot = driver.get_screenshot_as_png()
+    except Exception as e:
+        logging.debug(f"Could not take a diagnostics screenshot: {e}")
+        screenshot = None
+    try:
+        page_source = driver.page_source
+        url = driver.current_url
+    except Exception as e:
+        logging.debug(f"Could not read page source for diagnostics: {e}")
+        page_source, url = None, None
+    name = f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{reason}"
+    return store.submit(name, screenshot, page_source, dict(meta or {}, reason=reason, url=url))
@@ -0,0 +1,211 @@
+"""
+Chrome download event tracking for the Beatport Auto Downloader.
+Reads CDP download events from the driver's performance log and ties them to clicked tracks.
+"""
+
+import json
+import logging
+import re
+import time
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional, Set
+from urllib.parse import urlparse
+
+# CDP events emitted for downloads started from the page
+DOWNLOAD_EVENTS = ("Page.downloadWillBegin", "Page.downloadProgress")
+# Browser-level equivalents, sent to raw CDP clients after Browser.setDownloadBehavior(eventsEnabled=True)
+BROWSER_DOWNLOAD_EVENTS = ("Browser.downloadWillBegin", "Browser.downloadProgress")
+# Response statuses that mean the site is rate limiting us
+THROTTLE_STATUSES = frozenset({429})
+# Only Beatport's own pages and API calls count; a 429 from an image CDN or tracker says nothing about the site
+THROTTLE_RESOURCE_TYPES = frozenset({"Document", "XHR", "Fetch"})
+THROTTLE_DOMAIN = "beatport.com"
+
+
+def is_throttle_response(params: Dict) -> bool:
+    """Check the params of a Network.responseReceived event for Beatport rate limiting a page or API call."""
+    response = params.get("response", {})
+    if response.get("status") not in THROTTLE_STATUSES or params.get("type") not in THROTTLE_RESOURCE_TYPES:
+        return False
+    host = urlparse(response.get("url") or "").hostname or ""
+    return host == THROTTLE_DOMAIN or host.endswith("." + THROTTLE_DOMAIN)
+
+
+def enable_performance_log(chrome_options) -> None:
+    """Ask chromedriver to record CDP events in the performance log."""
+    chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+
+class DownloadEventListener:
+    """
+    Tracks Chrome downloads from downloadWillBegin/downloadProgress events.
+
+    Requires the driver to be started with enable_performance_log(). Clicks
+    register the track they expect to download with expect() before they
+    happen. A download that begins is matched to the expectation whose track
+    ID appears in its URL or suggested filename; only when none does is it
+    matched to the oldest outstanding expectation. Every download then
+    carries its track ID, filename and live byte counts. Clients
+    holding their own CDP connection pass driver=None and feed events to
+    apply() instead of calling poll().
+
+    The same log carries every network response, so poll() also reports
+    throttled Beatport page and API responses (HTTP 429) to on_throttle.
+    """
+
+    def __init__(
+        self,
+        driver,
+        on_begin: Optional[Callable[[Dict], None]] = None,
+        on_complete: Optional[Callable[[Dict], None]] = None,
+        expectation_ttl: float = 30.0,
+        on_throttle: Optional[Callable[[str], None]] = None
+    ):
+        self.driver = driver
+        self.on_begin = on_begin
+        self.on_complete = on_complete
+        self.on_throttle = on_throttle
+        self.expectation_ttl = expectation_ttl
+        self.downloads: Dict[str, Dict] = {}
+        self._expected = deque()
+
+    def expect(self, track_id: Optional[str]) -> None:
+        """Register that a click should start a download for track_id."""
+        self._expected.append((track_id, time.time()))
+
+    def forget(self, track_id: Optional[str]) -> None:
+        """Withdraw the latest expectation for track_id, for a click that turned out not to happen."""
+        for position in range(len(self._expected) - 1, -1, -1):
+            if self._expected[position][0] == track_id:
+                del self._expected[position]
+                return
+
+    def _claim_expectation(self, url: Optional[str] = None, filename: Optional[str] = None) -> Optional[str]:
+        """
+        Return the track ID of the click that started a download.
+
+        A click whose track ID appears in the download's URL or filename wins
+        over queue order, so a click that started nothing can't shift later
+        downloads onto the wrong track.
+        """
+        cutoff = time.time() - self.expectation_ttl
+        while self._expected and self._expected[0][1] < cutoff:
+            logging.debug(f"Click for track {self._expected.popleft()[0]} never started a download")
+
+        names = " ".join(part for part in (url, filename) if part)
+        for position, (track_id, _) in enumerate(self._expected):
+            if track_id and re.search(rf"(?<!\d){re.escape(track_id)}(?!\d)", names):
+                del self._expected[position]
+                return track_id
+        if self._expected:
+            return self._expected.popleft()[0]
+        return None
+
+    def poll(self) -> List[Dict]:
+        """
+        Drain the performance log and apply the download events in it.
+
+        Returns:
+            List of {'method': ..., 'params': ...} dicts in the order Chrome emitted them
+        """
+        if self.driver is None:
+            return []
+        try:
+            entries = self.driver.get_log("performance")
+        except Exception as e:
+            logging.debug(f"Could not read performance log: {e}")
+            return []
+
+        events = []
+        for entry in entries:
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, ValueError):
+                continue
+            if message.get("method") in DOWNLOAD_EVENTS:
+                event = {"method": message["method"], "params": message.get("params", {})}
+                self.apply(event)
+                events.append(event)
+            elif message.get("method") == "Network.responseReceived" and self.on_throttle:
+                params = message.get("params", {})
+                if is_throttle_response(params):
+                    self.on_throttle(params["response"].get("url"))
+        return events
+
+    def apply(self, event: Dict) -> None:
+        """Update download state from one Page.* or Browser.* download event."""
+        params = event["params"]
+        guid = params.get("guid")
+        if not guid:
+            return
+
+        if event["method"].endswith(".downloadWillBegin"):
+            download = {
+                "guid": guid,
+                "url": params.get("url"),
+                "filename": params.get("suggestedFilename"),
+                "track_id": self._claim_expectation(params.get("url"), params.get("suggestedFilename")),
+                "state": "inProgress",
+                "received_bytes": 0,
+                "total_bytes": None,
+                "started_at": time.time(),
+                "completed_at": None,
+                "handed_off": False
+            }
+            self.downloads[guid] = download
+            logging.debug(f"Download began: {download['filename']} (track {download['track_id']})")
+            if self.on_begin:
+                self.on_begin(download)
+            return
+
+        download = self.downloads.get(guid)
+        if download is None:
+            return
+        download["received_bytes"] = params.get("receivedBytes", download["received_bytes"])
+        download["total_bytes"] = params.get("totalBytes") or download["total_bytes"]
+        state = params.get("state", download["state"])
+        if state != download["state"]:
+            download["state"] = state
+            if state == "completed":
+                download["completed_at"] = time.time()
+                logging.info(f"Download finished: {download['filename']} ({download['received_bytes']} bytes)")
+                if self.on_complete and not download["handed_off"]:
+                    self.on_complete(download)
+
+    def active(self) -> List[Dict]:
+        """Downloads Chrome is still transferring."""
+        # Copy first: status readers call this from other threads while poll() adds downloads
+        return [d for d in list(self.downloads.values()) if d["state"] == "inProgress" and not d["handed_off"]]
+
+    def started_track_ids(self) -> Set[str]:
+        """Track IDs whose click started a download."""
+        return {d["track_id"] for d in self.downloads.values() if d["track_id"]}
+
+    def wait_for_begin(self, track_ids: Iterable[str], timeout: float, interval: float = 0.25) -> Set[str]:
+        """
+        Wait until downloads have begun for all track_ids, or timeout.
+
+        Returns:
+            The track IDs whose downloads began
+        """
+        track_ids = set(track_ids)
+        deadline = time.time() + timeout
+        while True:
+            self.poll()
+            begun = track_ids & self.started_track_ids()
+            if begun == track_ids or time.time() >= deadline:
+                return begun
+            time.sleep(interval)
+
+    def wait_until_idle(self, timeout: float, interval: float = 0.5) -> bool:
+        """Wait until Chrome has no download in progress. Returns False on timeout."""
+        deadline = time.time() + timeout
+        while True:
+            self.poll()
+            active = self.active()
+            if not active:
+                return True
+            if time.time() >= deadline:
+                logging.warning(f"{len(active)} downloads still in progress after {timeout:.0f}s")
+                return False
+            time.sleep(interval)
@@ -0,0 +1,251 @@
+"""
+Structured failure records for Beatport downloads.
+Categorizes failures with reason codes and persists them so failed tracks can be replayed.
+"""
+
+import hashlib
+import itertools
+import json
+import logging
+import os
+import sys
+import threading
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from urllib.parse import parse_qs, urlsplit
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+
+MAX_REASON_LENGTH = 200  # Longer reasons (whole Selenium tracebacks) are cut and tagged with a hash of the full text
+
+# Names recorded when a row's text couldn't be read; they can't find the row again
+UNKNOWN_TRACK_PREFIX = "Unknown Track"
+PLACEHOLDER_NAMES = frozenset({"Unknown Artist", "Track name not found", "Artist name not found"})
+
+
+class FailureReason:
+    """Reason codes recorded with every failed download."""
+
+    NO_BUTTON = "no_button"
+    STALE_ELEMENT = "stale_element"
+    POPUP_TIMEOUT = "popup_timeout"
+    STATUS_UNKNOWN = "status_unknown"
+    ALREADY_DOWNLOADED = "already_downloaded"
+    CLICK_ERROR = "click_error"
+    DOWNLOAD_ERROR = "download_error"
+    IN_LOCAL_LIBRARY = "in_local_library"
+
+    # Codes worth retrying; an already downloaded or locally held track is not a real failure
+    REPLAYABLE = frozenset({NO_BUTTON, STALE_ELEMENT, POPUP_TIMEOUT, STATUS_UNKNOWN, CLICK_ERROR, DOWNLOAD_ERROR})
+
+
+def classify_exception(error: Exception) -> str:
+    """Map an exception raised while downloading a row to a reason code."""
+    if isinstance(error, StaleElementReferenceException):
+        return FailureReason.STALE_ELEMENT
+    if isinstance(error, TimeoutException):
+        return FailureReason.POPUP_TIMEOUT
+    return FailureReason.CLICK_ERROR
+
+
+def classify_status(svg_status: str) -> str:
+    """Map a row status that prevented a download to a reason code."""
+    if svg_status == "Already Downloaded":
+        return FailureReason.ALREADY_DOWNLOADED
+    return FailureReason.STATUS_UNKNOWN
+
+
+def compact_reason(reason: Optional[str], limit: int = MAX_REASON_LENGTH) -> Optional[str]:
+    """
+    Shorten a failure reason to its first line and at most limit characters.
+
+    Cut reasons end with a short hash of the full text, so identical errors
+    can still be grouped without storing their tracebacks.
+    """
+    if not reason:
+        return reason
+    first_line = reason.strip().split("\n", 1)[0]
+    if first_line == reason and len(reason) <= limit:
+        return reason
+    digest = hashlib.sha1(reason.encode("utf-8", "replace")).hexdigest()[:8]
+    return f"{first_line[:limit]} [#{digest}]"
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if value else value
+
+
+def replay_key(failure: Dict) -> Optional[str]:
+    """
+    The row key a replay looks for: the track ID, or name and artist when both were read.
+
+    Returns None for records that could never be matched to a row again.
+    """
+    if failure.get('track_id'):
+        return failure['track_id']
+    name, artist = failure.get('name'), failure.get('artist')
+    if not name or not artist or name.startswith(UNKNOWN_TRACK_PREFIX):
+        return None
+    if name in PLACEHOLDER_NAMES or artist in PLACEHOLDER_NAMES:
+        return None
+    return f"{name}|{artist}"
+
+
+def page_key(page_url: Optional[str]) -> Optional[Tuple[str, str]]:
+    """Library section and page number of a URL, so different spellings of one page compare equal."""
+    if not page_url:
+        return None
+    parts = urlsplit(page_url)
+    return parts.path.rstrip('/'), parse_qs(parts.query).get('page', ['1'])[0]
+
+
+class FailureRecord:
+    """
+    One failed track, kept small: __slots__ instead of a dict, interned reason
+    codes and page URLs (shared by every row of a page) and a compacted reason.
+    """
+
+    __slots__ = ("name", "artist", "reason", "reason_code", "track_id", "page", "page_url")
+
+    def __init__(self, name: Optional[str], artist: Optional[str], reason: Optional[str], reason_code: str,
+                 track_id: Optional[str] = None, page: Optional[int] = None, page_url: Optional[str] = None):
+        self.name = name
+        self.artist = artist
+        self.reason = compact_reason(reason)
+        self.reason_code = _intern(reason_code)
+        self.track_id = track_id
+        self.page = page
+        self.page_url = _intern(page_url)
+
+    def to_dict(self) -> Dict:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "FailureRecord":
+        return cls(*(data.get(slot) for slot in cls.__slots__))
+
+
+class FailureLog:
+    """
+    The failures of the current run, bounded in memory.
+
+    Only counts per reason code stay in memory; every record is appended to a
+    JSON-lines spool file as it happens and read back lazily when iterated,
+    so a 20,000-track run costs the same RAM as a 20-track one.
+    """
+
+    def __init__(self, spool_path: str):
+        self.spool_path = spool_path
+        self.counts: Counter = Counter()
+        self._file = None
+        self._lock = threading.Lock()
+
+    def append(self, record: FailureRecord) -> None:
+        with self._lock:
+            self.counts[record.reason_code] += 1
+            try:
+                if self._file is None:
+                    # The first failure of a run replaces the spool of the previous one
+                    self._file = open(self.spool_path, 'w', encoding='utf-8')
+                self._file.write(json.dumps(record.to_dict()) + "\n")
+                self._file.flush()
+            except Exception as e:
+                logging.error(f"Error spilling failure record: {e}")
+
+    def __len__(self) -> int:
+        return sum(self.counts.values())
+
+    def __bool__(self) -> bool:
+        return bool(self.counts)
+
+    def __iter__(self) -> Iterator[FailureRecord]:
+        """Read the records of this run back from the spool, one at a time."""
+        if not self.counts or not os.path.exists(self.spool_path):
+            return
+        with open(self.spool_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield FailureRecord.from_dict(json.loads(line))
+
+    def close(self) -> None:
+        """Close the spool file; the records stay readable until the next run's first failure."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class FailedDownloadsQueue:
+    """
+    Persists failed downloads to JSON so a later run can replay just those tracks.
+
+    Each record has name, artist, reason, reason_code, track_id, page and
+    page_url; save() takes dicts or FailureRecords (e.g. a FailureLog).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def save(self, failures: Iterable, visited_pages: Optional[Set[Tuple[str, str]]] = None) -> None:
+        """
+        Write the failure records.
+
+        Args:
+            failures: This run's failures
+            visited_pages: page_key()s of the pages this run processed; queued
+                failures from other pages are kept, those without a page are
+                dropped. None replaces the whole queue.
+        """
+        kept = []
+        if visited_pages is not None:
+            kept = [
+                failure for failure in self.load()
+                if page_key(failure.get('page_url')) not in visited_pages | {None}
+            ]
+        try:
+            count = 0
+            # Streamed one record at a time so a FailureLog is never loaded whole
+            with open(self.path, 'w', encoding='utf-8') as f:
+                f.write("[")
+                for failure in itertools.chain(kept, failures):
+                    record = failure.to_dict() if isinstance(failure, FailureRecord) else failure
+                    f.write(("," if count else "") + "\n  " + json.dumps(record))
+                    count += 1
+                f.write("\n]\n" if count else "]\n")
+            logging.info(f"Saved {count} failed downloads to {self.path}")
+        except Exception as e:
+            logging.error(f"Error saving failed downloads queue: {e}")
+
+    def load(self) -> List[Dict]:
+        """Load failure records, returning an empty list if there is no queue."""
+        if not os.path.exists(self.path):
+            return []
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logging.error(f"Error loading failed downloads queue: {e}")
+            return []
+
+    def replayable_by_page(self, failures: Optional[List[Dict]] = None) -> Dict[str, List[Dict]]:
+        """
+        Group replayable failures by the page they were seen on.
+
+        Args:
+            failures: Records to group, defaults to the saved queue
+
+        Returns:
+            Mapping of page URL to the failures recorded on that page; records
+            without a replay_key() are left out
+        """
+        if failures is None:
+            failures = self.load()
+
+        by_page = {}
+        for failure in failures:
+            if failure.get('reason_code') not in FailureReason.REPLAYABLE:
+                continue
+            page_url = failure.get('page_url')
+            if not page_url or replay_key(failure) is None:
+                continue
+            by_page.setdefault(page_url, []).append(failure)
+        return by_page
@@ -0,0 +1,188 @@
+"""
+Direct HTTP download engine for resolved Beatport file URLs.
+Fetches files with a pooled session, bounded concurrency and resumable ranged requests.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+import requests
+
+CHUNK_SIZE = 256 * 1024
+
+
+class DownloadJob:
+    """A file to fetch: where from, what to call it and how to verify it."""
+
+    def __init__(
+        self,
+        url: str,
+        filename: str,
+        expected_size: Optional[int] = None,
+        sha256: Optional[str] = None,
+        track_id: Optional[str] = None,
+        source_url: Optional[str] = None
+    ):
+        self.url = url
+        self.filename = filename
+        self.expected_size = expected_size
+        self.sha256 = sha256
+        self.track_id = track_id
+        self.source_url = source_url  # Page the download was started from
+
+
+def safe_filename(filename: str) -> str:
+    """Strip path separators and characters Windows can't store from a suggested filename."""
+    filename = os.path.basename(filename.replace('\\', '/'))
+    return re.sub(r'[<>:"/\\|?*\x00-\x1f]', '_', filename).strip() or "download"
+
+
+class HttpDownloader:
+    """
+    Downloads files over a shared requests.Session.
+
+    Each file streams into <name>.<track id>.part and is renamed into place
+    only after its size (and checksum, when known) has been verified, so the
+    download folder never holds a truncated file under its final name.
+    Interrupted transfers resume with a Range request from the bytes already
+    on disk.
+    """
+
+    def __init__(
+        self,
+        download_dir: str,
+        session: Optional[requests.Session] = None,
+        max_workers: int = 3,
+        max_retries: int = 3,
+        timeout: float = 30,
+        on_complete: Optional[Callable[[DownloadJob, Dict], None]] = None
+    ):
+        self.download_dir = download_dir
+        self.session = session or requests.Session()
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.on_complete = on_complete
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="http-download")
+        self.futures: List[Future] = []
+        self._lock = threading.Lock()
+
+    def submit(self, job: DownloadJob) -> Future:
+        """Queue a download; at most max_workers run at once."""
+        future = self.executor.submit(self.download, job)
+        with self._lock:
+            self.futures.append(future)
+        return future
+
+    def download(self, job: DownloadJob) -> Dict:
+        """
+        Fetch one file, retrying and resuming on errors.
+
+        Returns:
+            Result dict with ok, path, bytes, elapsed and error keys
+        """
+        final_path = os.path.join(self.download_dir, safe_filename(job.filename))
+        # Jobs whose files share a name must not write into the same partial file;
+        # the track ID keeps the name stable so a later run can still resume it
+        job_key = job.track_id or hashlib.sha256(job.url.encode()).hexdigest()[:16]
+        temp_path = f"{final_path}.{safe_filename(job_key)}.part"
+        started = time.time()
+        error = None
+
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                total = self._fetch(job, temp_path)
+                self._verify(job, temp_path, total)
+                os.replace(temp_path, final_path)
+                result = {
+                    "ok": True,
+                    "path": final_path,
+                    "bytes": os.path.getsize(final_path),
+                    "elapsed": time.time() - started,
+                    "completed_at": time.time(),
+                    "error": None
+                }
+                logging.info(f"Downloaded {os.path.basename(final_path)} ({result['bytes']} bytes)")
+                break
+            except ValueError as e:
+                # Verification failed: the partial data is bad, start over
+                error = str(e)
+                logging.warning(f"Verification failed for {job.filename} (attempt {attempt}): {e}")
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+            except Exception as e:
+                error = str(e)
+                logging.warning(f"Download error for {job.filename} (attempt {attempt}), resuming: {e}")
+                time.sleep(min(2 ** attempt, 10))
+        else:
+            result = {"ok": False, "path": None, "bytes": 0, "elapsed": time.time() - started,
+                      "completed_at": None, "error": error}
+            logging.error(f"Giving up on {job.filename}: {error}")
+
+        if self.on_complete:
+            try:
+                self.on_complete(job, result)
+            except Exception as e:
+                logging.error(f"Error in download completion callback: {e}")
+        return result
+
+    def _fetch(self, job: DownloadJob, temp_path: str) -> Optional[int]:
+        """Stream the file into temp_path, resuming from its current size. Returns the total size if known."""
+        offset = os.path.getsize(temp_path) if os.path.exists(temp_path) else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+
+        with self.session.get(job.url, headers=headers, stream=True, timeout=self.timeout) as response:
+            if response.status_code == 416:
+                # The partial file already holds everything the server has
+                return offset
+            response.raise_for_status()
+
+            if offset and response.status_code != 206:
+                # Server ignored the Range header, start from scratch
+                offset = 0
+
+            total = None
+            content_range = response.headers.get("Content-Range")
+            if content_range and "/" in content_range:
+                size = content_range.rsplit("/", 1)[1]
+                total = int(size) if size.isdigit() else None
+            elif response.headers.get("Content-Length"):
+                total = offset + int(response.headers["Content-Length"])
+
+            with open(temp_path, "ab" if offset else "wb") as f:
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    if chunk:
+                        f.write(chunk)
+        return total
+
+    @staticmethod
+    def _verify(job: DownloadJob, temp_path: str, total: Optional[int]) -> None:
+        """Raise ValueError if the file on disk doesn't match the expected size or checksum."""
+        size = os.path.getsize(temp_path)
+        expected = job.expected_size or total
+        if expected is not None and size != expected:
+            if size < expected:
+                raise IOError(f"incomplete transfer: {size} of {expected} bytes")
+            raise ValueError(f"size mismatch: got {size} bytes, expected {expected}")
+
+        if job.sha256:
+            digest = hashlib.sha256()
+            with open(temp_path, "rb") as f:
+                for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                    digest.update(chunk)
+            if digest.hexdigest().lower() != job.sha256.lower():
+                raise ValueError("checksum mismatch")
+
+    def pending(self) -> int:
+        """Number of queued or running downloads."""
+        with self._lock:
+            return sum(1 for future in self.futures if not future.done())
+
+    def close(self, wait: bool = True) -> None:
+        """Stop accepting jobs, optionally waiting for queued downloads to finish."""
+        self.executor.shutdown(wait=wait)
@@ -0,0 +1,91 @@
+"""
+Per-layout row profiles for the Beatport Auto Downloader.
+Resolves a layout's row selectors once and reuses them for every row until the window size changes.
+"""
+
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from selenium.webdriver.common.by import By
+
+from beatport_auto.utils.selector_manager import SelectorsManager, selector_strategy
+
+# A pinned selector that misses this many rows in a row is dropped and resolved again
+REPROBE_AFTER = 3
+
+# Status checks in order for each layout: (strategy, selector, status of a row that matches)
+LAYOUT_STATUS_CHECKS = {
+    "large": (
+        (By.CSS_SELECTOR, "svg[data-testid='icon-re-download']", "Available for Download"),
+        (By.CSS_SELECTOR, "svg[data-testid='icon-download-finished']", "Already Downloaded"),
+        (By.XPATH, ".//button/svg[contains(@viewBox, '0 0 16 16') and contains(@stroke, '#39C0DE')]",
+         "Available for Download"),
+    ),
+    "small": (
+        (By.CSS_SELECTOR, "svg[data-testid='icon-re-download']", "Available for Download"),
+        (By.CSS_SELECTOR, "svg[data-testid='icon-download-finished']", "Already Downloaded"),
+        (By.XPATH, ".//button/svg[contains(@viewBox, '0 0 16 16') and contains(@stroke, '#39C0DE')]",
+         "Available for Download"),
+        # The small layout's download buttons sometimes only carry the blue stroke on their path
+        (By.XPATH, ".//path[contains(@stroke, '#39') or contains(@fill, '#39')]", "Available for Download"),
+    ),
+}
+
+
+def detect_layout(sample_row) -> str:
+    """'large' for the library table, 'small' for the narrow-window track list."""
+    testid = sample_row.get_attribute('data-testid') or ''
+    classes = (sample_row.get_attribute('class') or '').lower()
+    return 'large' if 'library-tracks-table-row' in testid or 'table' in classes else 'small'
+
+
+class LayoutProfile:
+    """
+    A row layout with the selectors that worked for it.
+
+    The first row that needs a part (name, artist, download button) resolves
+    it through the selector manager and pins the winning selector. Every
+    later row is searched with that one selector only, so a page costs one
+    selector probe per part instead of one per row. A pinned selector that
+    misses REPROBE_AFTER rows in a row is dropped and resolved again.
+    """
+
+    def __init__(self, name: str, window_size: Optional[Tuple[int, int]] = None):
+        self.name = name
+        self.window_size = window_size
+        self.selectors: Dict[str, str] = {}
+        self.misses: Dict[str, int] = {}
+
+    @property
+    def status_checks(self):
+        return LAYOUT_STATUS_CHECKS.get(self.name, LAYOUT_STATUS_CHECKS["large"])
+
+    def find(self, manager: SelectorsManager, row, selector_type: str) -> List:
+        """Elements of selector_type in a row, through the pinned selector once one is known."""
+        selector = self.selectors.get(selector_type)
+        if selector is None:
+            selector, elements = manager.resolve_in_context(row, selector_type)
+            if selector:
+                logging.debug(f"{self.name} layout: pinned {selector_type} selector {selector}")
+                self.selectors[selector_type] = selector
+                self.misses[selector_type] = 0
+            return elements
+
+        # Only rows with several matches pay for a visibility check
+        elements = manager.visible_in_row(row, row.find_elements(selector_strategy(selector), selector))
+        if elements:
+            self.misses[selector_type] = 0
+            return elements
+        # Rows legitimately lack some parts (no download button once downloaded), so only repeated misses count
+        self.misses[selector_type] += 1
+        if self.misses[selector_type] >= REPROBE_AFTER:
+            logging.debug(f"{self.name} layout: {selector_type} selector {selector} stopped matching")
+            del self.selectors[selector_type]
+        return []
+
+    def status(self, row) -> str:
+        """The row's download status from this layout's status icons."""
+        for strategy, selector, status in self.status_checks:
+            if row.find_elements(strategy, selector):
+                return status
+        return "No Download Status Found"
@@ -0,0 +1,396 @@
+"""
+Post-download organizer for the Beatport Auto Downloader.
+Reads audio tags in a process pool, files tracks into a folder scheme and keeps an incremental SQLite library index.
+"""
+
+import logging
+import os
+import shutil
+import sqlite3
+import string
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from beatport_auto.utils.http_downloader import safe_filename
+
+try:
+    import mutagen
+except ImportError:  # Optional: the built-in ID3/RIFF/AIFF reader covers Beatport's formats
+    mutagen = None
+
+AUDIO_EXTENSIONS = (".mp3", ".wav", ".aif", ".aiff", ".flac", ".m4a")
+TAG_FIELDS = ("artist", "title", "label", "genre", "bpm", "key")
+SCHEME_FIELDS = ("artist", "title", "label", "genre")
+INDEX_FILENAME = "library_index.sqlite"
+
+# Below this many files a process pool costs more to start than it saves
+POOL_THRESHOLD = 16
+BATCH_SIZE = 256
+
+ID3_FRAMES = {
+    "artist": ("TPE1", "TP1"),
+    "title": ("TIT2", "TT2"),
+    "label": ("TPUB", "TPB"),
+    "genre": ("TCON", "TCO"),
+    "bpm": ("TBPM", "TBP"),
+    "key": ("TKEY", "TKE"),
+}
+RIFF_INFO = {b"IART": "artist", b"INAM": "title", b"IGNR": "genre"}
+AIFF_TEXT = {b"AUTH": "artist", b"NAME": "title"}
+EASY_KEYS = {"artist": "artist", "title": "title", "label": "organization", "genre": "genre", "bpm": "bpm"}
+
+
+def _decode_text_frame(data: bytes) -> Optional[str]:
+    """Decode an ID3 text frame body (encoding byte followed by text)."""
+    if not data:
+        return None
+    encoding = {0: "latin-1", 1: "utf-16", 2: "utf-16-be", 3: "utf-8"}.get(data[0], "latin-1")
+    text = data[1:].decode(encoding, errors="replace")
+    return text.split("\x00")[0].strip() or None
+
+
+def _syncsafe(data: bytes) -> int:
+    return (data[0] << 21) | (data[1] << 14) | (data[2] << 7) | data[3]
+
+
+def parse_id3(data: bytes) -> Dict[str, str]:
+    """Read the text frames we care about from an ID3v2.2/2.3/2.4 tag."""
+    if len(data) < 10 or data[:3] != b"ID3":
+        return {}
+    version = data[3]
+    size = _syncsafe(data[6:10])
+    body = data[10:10 + size]
+    pos = 0
+    if data[5] & 0x40 and version >= 3:
+        # Skip the extended header
+        ext_size = _syncsafe(body[:4]) if version == 4 else struct.unpack(">I", body[:4])[0] + 4
+        pos = ext_size
+
+    frame_ids = {}
+    for field, (v3_id, v2_id) in ID3_FRAMES.items():
+        frame_ids[v2_id if version == 2 else v3_id] = field
+
+    header_size = 6 if version == 2 else 10
+    tags = {}
+    while pos + header_size <= len(body):
+        if version == 2:
+            frame_id = body[pos:pos + 3].decode("latin-1")
+            frame_size = int.from_bytes(body[pos + 3:pos + 6], "big")
+        else:
+            frame_id = body[pos:pos + 4].decode("latin-1")
+            raw_size = body[pos + 4:pos + 8]
+            frame_size = _syncsafe(raw_size) if version == 4 else struct.unpack(">I", raw_size)[0]
+        if not frame_id.strip("\x00") or frame_size <= 0:
+            break
+        start = pos + header_size
+        if frame_id in frame_ids:
+            value = _decode_text_frame(body[start:start + frame_size])
+            if value:
+                tags[frame_ids[frame_id]] = value
+        pos = start + frame_size
+    return tags
+
+
+def _iter_chunks(f, end: int, byteorder: str) -> Iterator:
+    """Yield (chunk_id, size, data_offset) for the RIFF/IFF chunks up to end."""
+    fmt = "<I" if byteorder == "little" else ">I"
+    while f.tell() + 8 <= end:
+        header = f.read(8)
+        if len(header) < 8:
+            return
+        chunk_id, size = header[:4], struct.unpack(fmt, header[4:])[0]
+        offset = f.tell()
+        yield chunk_id, size, offset
+        f.seek(offset + size + (size & 1))
+
+
+def _read_container_tags(path: str) -> Dict[str, str]:
+    """Built-in reader for MP3 (ID3v2), WAV (RIFF INFO / id3 chunk) and AIFF (ID3 / NAME / AUTH chunks)."""
+    tags = {}
+    with open(path, "rb") as f:
+        head = f.read(12)
+        if head[:3] == b"ID3":
+            size = _syncsafe(head[6:10])
+            f.seek(0)
+            return parse_id3(f.read(10 + size))
+
+        if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+            end = struct.unpack("<I", head[4:8])[0] + 8
+            for chunk_id, size, offset in _iter_chunks(f, end, "little"):
+                if chunk_id in (b"id3 ", b"ID3 "):
+                    tags.update(parse_id3(f.read(size)))
+                elif chunk_id == b"LIST" and f.read(4) == b"INFO":
+                    for sub_id, sub_size, _ in _iter_chunks(f, offset + size, "little"):
+                        if sub_id in RIFF_INFO:
+                            value = f.read(sub_size).split(b"\x00")[0].decode("latin-1").strip()
+                            if value:
+                                tags.setdefault(RIFF_INFO[sub_id], value)
+
+        elif head[:4] == b"FORM" and head[8:12] in (b"AIFF", b"AIFC"):
+            end = struct.unpack(">I", head[4:8])[0] + 8
+            for chunk_id, size, _ in _iter_chunks(f, end, "big"):
+                if chunk_id in (b"ID3 ", b"id3 "):
+                    tags.update(parse_id3(f.read(size)))
+                elif chunk_id in AIFF_TEXT:
+                    value = f.read(size).decode("latin-1").strip("\x00 ")
+                    if value:
+                        tags.setdefault(AIFF_TEXT[chunk_id], value)
+    return tags
+
+
+def _read_mutagen_tags(path: str) -> Dict[str, str]:
+    audio = mutagen.File(path, easy=True)
+    if audio is None or audio.tags is None:
+        return {}
+    file_tags = audio.tags
+    tags = {}
+    if hasattr(file_tags, "getall"):
+        # Raw ID3 tags, as mutagen returns for WAV and AIFF
+        for field, (frame_id, _) in ID3_FRAMES.items():
+            if frame_id in file_tags and file_tags[frame_id].text:
+                tags[field] = str(file_tags[frame_id].text[0])
+        return tags
+    for field, key in EASY_KEYS.items():
+        values = file_tags.get(key)
+        if values:
+            tags[field] = str(values[0])
+    return tags
+
+
+def tags_from_filename(path: str) -> Dict[str, str]:
+    """Fall back to Beatport's 'Artist - Title (Mix).ext' naming."""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    if " - " in stem:
+        artist, title = stem.split(" - ", 1)
+        return {"artist": artist.strip(), "title": title.strip()}
+    return {"title": stem.strip()}
+
+
+def read_tags(path: str) -> Dict:
+    """
+    Read the tags of one audio file. Runs in worker processes, so it only takes and returns plain data.
+
+    Returns:
+        Dict with path, size, mtime_ns and the TAG_FIELDS that could be read
+    """
+    stat = os.stat(path)
+    record = {"path": path, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    try:
+        tags = _read_mutagen_tags(path) if mutagen else _read_container_tags(path)
+    except Exception as e:
+        logging.debug(f"Could not read tags from {path}: {e}")
+        tags = {}
+    for field, value in tags_from_filename(path).items():
+        tags.setdefault(field, value)
+    for field in TAG_FIELDS:
+        record[field] = tags.get(field)
+    return record
+
+
+def iter_audio_files(root: str, recursive: bool = True) -> Iterator[str]:
+    """Yield audio file paths under root, skipping partial downloads."""
+    try:
+        entries = list(os.scandir(root))
+    except OSError as e:
+        logging.warning(f"Could not scan {root}: {e}")
+        return
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            if recursive:
+                yield from iter_audio_files(entry.path, recursive)
+        elif entry.name.lower().endswith(AUDIO_EXTENSIONS):
+            yield entry.path
+
+
+def read_tags_many(paths: List[str], max_workers: Optional[int] = None) -> Iterator[Dict]:
+    """Read tags for many files, in a process pool when there are enough to be worth it."""
+    if len(paths) < POOL_THRESHOLD:
+        for path in paths:
+            yield read_tags(path)
+        return
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        yield from executor.map(read_tags, paths, chunksize=32)
+
+
+class LibraryIndex:
+    """
+    SQLite index of every audio file in the library, keyed by path.
+
+    Each row stores the file's size and mtime next to its tags, so a rescan
+    only re-reads files whose size or mtime changed and a single new file is
+    a one-row upsert.
+    """
+
+    COLUMNS = ("path", "size", "mtime_ns") + TAG_FIELDS
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS tracks ("
+            "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, "
+            "artist TEXT, title TEXT, label TEXT, genre TEXT, bpm TEXT, key TEXT)"
+        )
+        self.conn.commit()
+
+    def fingerprints(self) -> Dict[str, tuple]:
+        """Map of indexed path to (size, mtime_ns)."""
+        return {path: (size, mtime) for path, size, mtime in self.conn.execute("SELECT path, size, mtime_ns FROM tracks")}
+
+    def upsert_many(self, records: Iterable[Dict]) -> int:
+        rows = [tuple(record.get(column) for column in self.COLUMNS) for record in records]
+        self.conn.executemany(
+            f"INSERT OR REPLACE INTO tracks ({', '.join(self.COLUMNS)}) VALUES ({', '.join('?' * len(self.COLUMNS))})",
+            rows
+        )
+        self.conn.commit()
+        return len(rows)
+
+    def upsert(self, record: Dict) -> None:
+        self.upsert_many([record])
+
+    def remove_many(self, paths: Iterable[str]) -> None:
+        self.conn.executemany("DELETE FROM tracks WHERE path = ?", [(path,) for path in paths])
+        self.conn.commit()
+
+    def records(self) -> Iterator[Dict]:
+        """Stream every indexed track as a dict."""
+        cursor = self.conn.execute(f"SELECT {', '.join(self.COLUMNS)} FROM tracks")
+        for row in cursor:
+            yield dict(zip(self.COLUMNS, row))
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM tracks").fetchone()[0]
+
+    def covers(self, root: str) -> bool:
+        """True if any file under root has been indexed."""
+        prefix = os.path.join(root, "")
+        row = self.conn.execute("SELECT 1 FROM tracks WHERE substr(path, 1, ?) = ? LIMIT 1",
+                                (len(prefix), prefix)).fetchone()
+        return row is not None
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+class LibraryOrganizer:
+    """
+    Files finished downloads into a folder scheme and keeps the library index current.
+
+    The scheme is a format string over artist, title, label and genre, with '/'
+    separating folder levels, e.g. "{genre}/{label}". New files are picked up
+    from the top level of the download folder; everything below it is treated
+    as the organized library.
+    """
+
+    def __init__(self, library_root: str, scheme: str = "{artist}", index: Optional[LibraryIndex] = None,
+                 max_workers: Optional[int] = None):
+        fields = {name for _, name, _, _ in string.Formatter().parse(scheme) if name}
+        unknown = fields - set(SCHEME_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown folder scheme fields: {', '.join(sorted(unknown))}")
+        self.library_root = library_root
+        self.scheme = scheme
+        self.max_workers = max_workers
+        self.index = index or LibraryIndex(os.path.join(library_root, INDEX_FILENAME))
+
+    def scan(self, root: Optional[str] = None) -> Dict[str, int]:
+        """
+        Bring the index up to date with the files on disk.
+
+        Only new or changed files have their tags read; vanished files are dropped.
+        Every file under root is still stat'ed, so runs only call this for an
+        explicit rebuild and otherwise rely on organize_new_files() indexing
+        what it moves.
+
+        Args:
+            root: Folder to scan, defaults to the library root. Other folders' entries are left alone.
+
+        Returns:
+            Counts of added/updated, removed and unchanged files
+        """
+        root = root or self.library_root
+        prefix = os.path.join(root, "")
+        known = {path: fingerprint for path, fingerprint in self.index.fingerprints().items() if path.startswith(prefix)}
+        changed = []
+        seen = set()
+        for path in iter_audio_files(root):
+            seen.add(path)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if known.get(path) != (stat.st_size, stat.st_mtime_ns):
+                changed.append(path)
+
+        updated = 0
+        batch = []
+        for record in read_tags_many(changed, self.max_workers):
+            batch.append(record)
+            if len(batch) >= BATCH_SIZE:
+                updated += self.index.upsert_many(batch)
+                batch = []
+        updated += self.index.upsert_many(batch)
+
+        removed = [path for path in known if path not in seen]
+        self.index.remove_many(removed)
+        logging.info(f"Library index: {updated} updated, {len(removed)} removed, {len(seen) - len(changed)} unchanged")
+        return {"updated": updated, "removed": len(removed), "unchanged": len(seen) - len(changed)}
+
+    def destination(self, record: Dict) -> str:
+        """Folder and filename a track belongs at under the scheme."""
+        # Sanitize values first so a '/' inside a tag can't add a folder level
+        values = {
+            field: safe_filename((record.get(field) or f"Unknown {field.title()}").replace("/", "_").replace("\\", "_"))
+            for field in SCHEME_FIELDS
+        }
+        folders = [safe_filename(part) for part in self.scheme.format(**values).split("/") if part.strip()]
+        return os.path.join(self.library_root, *folders, os.path.basename(record["path"]))
+
+    def organize_new_files(self, source_dir: Optional[str] = None) -> List[str]:
+        """
+        Move audio files sitting in the top level of source_dir into the scheme and index them.
+
+        Returns:
+            The new paths of the moved files
+        """
+        source_dir = source_dir or self.library_root
+        paths = list(iter_audio_files(source_dir, recursive=False))
+        if not paths:
+            return []
+
+        moved = []
+        records = []
+        for record in read_tags_many(paths, self.max_workers):
+            target = self._unique_path(self.destination(record))
+            try:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                shutil.move(record["path"], target)
+            except OSError as e:
+                logging.error(f"Could not move {record['path']}: {e}")
+                continue
+            record["path"] = target
+            record["mtime_ns"] = os.stat(target).st_mtime_ns
+            records.append(record)
+            moved.append(target)
+
+        self.index.remove_many(paths)
+        self.index.upsert_many(records)
+        logging.info(f"Organized {len(moved)} downloaded files into {self.library_root}")
+        return moved
+
+    @staticmethod
+    def _unique_path(path: str) -> str:
+        """Append ' (n)' before the extension until the path is free."""
+        if not os.path.exists(path):
+            return path
+        stem, ext = os.path.splitext(path)
+        counter = 1
+        while os.path.exists(f"{stem} ({counter}){ext}"):
+            counter += 1
+        return f"{stem} ({counter}){ext}"
+
+    def close(self) -> None:
+        self.index.close()
@@ -0,0 +1,149 @@
+"""
+JavaScript shared by the page engines.
+Row extraction, row clicks and popup detection that run inside the page in a single round trip.
+"""
+
+# Reads a library row's label, genre, key, BPM and date cells
+ROW_DETAILS_FUNCTION = """
+function rowDetails(row) {
+    const text = el => el ? el.textContent.trim() : null;
+    const details = {
+        label: text(row.querySelector("a[href*='/label/']")),
+        genre: text(row.querySelector("a[href*='/genre/']")),
+        bpm: null, key: null, date: null
+    };
+    for (const div of row.querySelectorAll('div')) {
+        if (div.children.length) continue;
+        const value = div.textContent.trim();
+        if (!details.bpm && /^\\d+(\\.\\d+)?\\s*BPM$/i.test(value)) {
+            details.bpm = value;
+            details.key = text(div.previousElementSibling);
+        } else if (!details.date && /^\\d{4}-\\d{2}-\\d{2}$/.test(value)) {
+            details.date = value;
+        }
+    }
+    return details;
+}
+"""
+
+# The confirm button of a download popup, or null while none is open
+POPUP_BUTTON_FUNCTION = """
+function findPopupButton() {
+    for (const button of document.querySelectorAll("[role='dialog'] button, .modal button")) {
+        const label = button.textContent.toLowerCase();
+        if (label.includes('download') && !label.includes("don't") && !label.includes('cancel')) return button;
+    }
+    return null;
+}
+"""
+
+# findRows, describeRows, clickRow and findPopupButton, for engines that work a whole page per call
+ROW_FUNCTIONS = ROW_DETAILS_FUNCTION + POPUP_BUTTON_FUNCTION + """
+function findRows(containerSelectors) {
+    for (const selector of containerSelectors) {
+        const rows = document.querySelectorAll(selector);
+        if (rows.length) return Array.from(rows);
+    }
+    return [];
+}
+
+function describeRows(rows) {
+    const text = el => el ? el.textContent.replace(/\\s+/g, ' ').trim() : null;
+    return rows.map((row, index) => {
+        const link = row.querySelector("a[href*='/track/']");
+        const match = link ? link.getAttribute('href').match(/\\/track\\/[^/]+\\/(\\d+)/) : null;
+        const artists = Array.from(row.querySelectorAll("a[href*='/artist/']")).map(text).filter(Boolean);
+        let status = "No Download Status Found";
+        if (row.querySelector("svg[data-testid='icon-re-download']")) status = "Available for Download";
+        else if (row.querySelector("svg[data-testid='icon-download-finished']")) status = "Already Downloaded";
+        else if (row.querySelector("button svg path[stroke='#39C0DE']")) status = "Available for Download";
+        return Object.assign({
+            index: index,
+            track_id: match ? match[1] : null,
+            name: text(link),
+            artist: artists.join(', '),
+            status: status
+        }, rowDetails(row));
+    });
+}
+
+function clickRow(containerSelectors, index) {
+    const row = findRows(containerSelectors)[index];
+    if (!row) return false;
+    const icon = row.querySelector("svg[data-testid='icon-re-download']")
+        || row.querySelector("button svg path[stroke='#39C0DE']");
+    if (!icon) return false;
+    const button = icon.closest('button') || icon.parentElement;
+    button.scrollIntoView({block: 'center'});
+    button.click();
+    return true;
+}
+"""
+
+# armPopupWatch runs before a click and awaitPopup after it, so a popup rendered in between is never missed
+POPUP_WATCH_FUNCTIONS = POPUP_BUTTON_FUNCTION + """
+function armPopupWatch() {
+    if (window.__popupWatch) window.__popupWatch.observer.disconnect();
+    const watch = {button: findPopupButton(), listeners: []};
+    watch.observer = new MutationObserver(() => {
+        if (watch.button) return;
+        watch.button = findPopupButton();
+        if (watch.button) watch.listeners.forEach(listener => listener());
+    });
+    watch.observer.observe(document.body, {childList: true, subtree: true});
+    window.__popupWatch = watch;
+}
+
+function awaitPopup(timeoutMs, done) {
+    const watch = window.__popupWatch;
+    if (!watch) return done(null);
+    let finished = false;
+    const finish = () => {
+        if (finished) return;
+        finished = true;
+        clearTimeout(timer);
+        watch.observer.disconnect();
+        window.__popupWatch = null;
+        done(Boolean(watch.button));
+    };
+    const timer = setTimeout(finish, timeoutMs);
+    if (watch.button) finish();
+    else watch.listeners.push(finish);
+}
+"""
+
+# Clicks buttons at the given offsets (ms from the start), giving each click popupMs to open a popup.
+# Results are 'clicked', 'missing' (button left the page) or 'popup'; a popup ends the batch early.
+CLICK_BATCH_FUNCTION = POPUP_BUTTON_FUNCTION + """
+function clickBatch(buttons, offsets, popupMs, done) {
+    const started = performance.now();
+    const results = [];
+    let lastClick = -Infinity;
+    const step = index => {
+        const due = index < buttons.length
+            ? Math.max(started + offsets[index], lastClick + popupMs)
+            : lastClick + popupMs;
+        setTimeout(() => {
+            // The previous click has had popupMs to open a popup; stop there so it can be confirmed
+            if (index > 0 && results[index - 1] === 'clicked' && findPopupButton()) {
+                results[index - 1] = 'popup';
+                return done(results);
+            }
+            if (index === buttons.length) return done(results);
+            const button = buttons[index];
+            if (!button || !button.isConnected) {
+                results.push('missing');
+            } else {
+                button.scrollIntoView({block: 'center'});
+                button.click();
+                lastClick = performance.now();
+                results.push('clicked');
+            }
+            step(index + 1);
+        }, Math.max(0, due - performance.now()));
+    };
+    // A popup left open by an earlier click has to be confirmed first
+    if (findPopupButton()) return done(results);
+    step(0);
+}
+"""
@@ -0,0 +1,159 @@
+"""
+Rate limiting primitives for the Beatport Auto Downloader.
+Thread-safe token buckets, and the per-phase politeness budget for browser actions.
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+# Actions per second allowed for each browser phase when the site is healthy
+DEFAULT_BUDGETS = {
+    "page_load": 0.5,
+    "click": 2.0,
+    "download_start": 1.0
+}
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled at rate tokens per second.
+
+    consume() never rejects: it takes the tokens straight away, letting the
+    bucket go into debt, and sleeps the caller until the debt is paid back.
+    A request larger than the bucket (a 256 KB chunk against a 100 KB/s cap)
+    therefore just waits longer instead of blocking forever, and concurrent
+    consumers share the rate between them.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_consume(self, amount: float = 1) -> bool:
+        """Take tokens only if they are available right now."""
+        with self._lock:
+            self._refill()
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return True
+            return False
+
+    def reserve(self, amount: float = 1) -> float:
+        """
+        Take tokens without waiting.
+
+        Returns:
+            Seconds the caller should wait before acting, for callers that sleep on their own (e.g. asyncio)
+        """
+        with self._lock:
+            self._refill()
+            self.tokens -= amount
+            return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+    def consume(self, amount: float = 1) -> float:
+        """
+        Take tokens, sleeping until the bucket is out of debt.
+
+        Returns:
+            Seconds spent waiting
+        """
+        wait = self.reserve(amount)
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+def parse_budgets(text: str) -> Dict[str, float]:
+    """
+    Parse "phase=rate,..." (e.g. "page_load=0.5,click=2") into per-phase rates.
+
+    Raises:
+        ValueError: On an unknown phase or a rate that is not a positive number
+    """
+    budgets = {}
+    for item in filter(None, (part.strip() for part in text.split(","))):
+        phase, _, rate = item.partition("=")
+        phase = phase.strip()
+        if phase not in DEFAULT_BUDGETS:
+            raise ValueError(f"Unknown budget phase '{phase}', expected one of {', '.join(DEFAULT_BUDGETS)}")
+        try:
+            budgets[phase] = float(rate)
+        except ValueError:
+            raise ValueError(f"Budget for {phase} must be a number of actions per second, got '{rate.strip()}'")
+        if budgets[phase] <= 0:
+            raise ValueError(f"Budget for {phase} must be positive")
+    return budgets
+
+
+class PolitenessBudget:
+    """
+    One token bucket per browser phase (page loads, clicks, download starts)
+    plus a shared slowdown factor.
+
+    While the site looks healthy actions run at the configured rates, with a
+    small burst allowed. Each sign of throttling (HTTP 429, an empty track
+    list, an error banner) doubles the slowdown, up to max_slowdown; every
+    healthy page afterwards eases it back towards 1. Under a slowdown of N
+    each action costs N tokens, so every phase runs N times slower.
+
+    burst is how many seconds' worth of actions may run back to back before
+    pacing starts, with at least one action always allowed.
+    """
+
+    def __init__(self, budgets: Optional[Dict[str, float]] = None, burst: float = 2,
+                 max_slowdown: float = 16, recovery: float = 0.75):
+        self.rates = dict(DEFAULT_BUDGETS, **(budgets or {}))
+        self.buckets = {phase: TokenBucket(rate, capacity=max(1.0, rate * burst)) for phase, rate in self.rates.items()}
+        self.max_slowdown = max_slowdown
+        self.recovery = recovery
+        self.slowdown = 1.0
+        self.throttle_signals: Dict[str, int] = {}
+        self.waited = {phase: 0.0 for phase in self.rates}
+        self._lock = threading.Lock()
+
+    def reserve(self, phase: str) -> float:
+        """Charge one action to phase and return how long to wait before performing it."""
+        wait = self.buckets[phase].reserve(self.slowdown)
+        with self._lock:
+            self.waited[phase] += wait
+        return wait
+
+    def wait(self, phase: str) -> float:
+        """Block until one more action of phase is within budget. Returns seconds waited."""
+        wait = self.reserve(phase)
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    def throttled(self, reason: str) -> None:
+        """Report a sign of throttling; slows every phase down."""
+        with self._lock:
+            self.throttle_signals[reason] = self.throttle_signals.get(reason, 0) + 1
+            self.slowdown = min(self.max_slowdown, self.slowdown * 2)
+            slowdown = self.slowdown
+        logging.warning(f"Throttling detected ({reason}), slowing down to 1/{slowdown:g} of the budget")
+
+    def healthy(self) -> None:
+        """Report a page that loaded normally; eases the slowdown back towards the configured rates."""
+        with self._lock:
+            if self.slowdown > 1:
+                self.slowdown = max(1.0, self.slowdown * self.recovery)
+
+    def stats(self) -> Dict:
+        return {
+            "slowdown": round(self.slowdown, 2),
+            "throttle_signals": dict(self.throttle_signals),
+            "seconds_waited": {phase: round(seconds, 1) for phase, seconds in self.waited.items()}
+        }
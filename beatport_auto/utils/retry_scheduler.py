@@ -0,0 +1,79 @@
+"""
+Retry scheduling for the downloads page.
+Tracks which rows are still pending between rounds and backs off based on observed completions.
+"""
+
+import logging
+from typing import Iterable, Optional, Set
+
+
+class PendingRetryScheduler:
+    """
+    Schedules retry rounds over the set of rows that are still pending.
+
+    Each round reports the rows that are still "Available for Download". The
+    scheduler keeps only those rows for the next round, resets its delay when
+    some rows completed since the previous round and doubles it otherwise.
+    It stops as soon as nothing is pending or the round budget is exhausted.
+    """
+
+    def __init__(
+        self,
+        max_rounds: int = 5,
+        base_delay: float = 2.0,
+        max_delay: float = 30.0,
+        backoff_factor: float = 2.0
+    ):
+        self.max_rounds = max_rounds
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.backoff_factor = backoff_factor
+        self.rounds = 0
+        self.pending: Optional[Set[str]] = None
+        self.completed: Set[str] = set()
+        self.delay = base_delay
+
+    def update(self, still_pending: Iterable[str]) -> Set[str]:
+        """
+        Record the rows that are still pending after a round.
+
+        Args:
+            still_pending: Keys of rows that still show as available
+
+        Returns:
+            The rows to revisit in the next round
+        """
+        still_pending = set(still_pending)
+
+        if self.pending is None:
+            # First observation only seeds the pending set
+            self.pending = still_pending
+            return self.pending
+
+        # Rows that were not pending before are not revisited
+        still_pending &= self.pending
+        newly_completed = self.pending - still_pending
+        self.completed |= newly_completed
+        self.rounds += 1
+
+        if newly_completed:
+            self.delay = self.base_delay
+        else:
+            self.delay = min(self.delay * self.backoff_factor, self.max_delay)
+
+        logging.debug(
+            f"Retry round {self.rounds}: {len(newly_completed)} completed, "
+            f"{len(still_pending)} pending, next delay {self.delay:.1f}s"
+        )
+        self.pending = still_pending
+        return self.pending
+
+    def should_continue(self) -> bool:
+        """Return True while there are pending rows and rounds left."""
+        if self.pending is not None and not self.pending:
+            return False
+        return self.rounds < self.max_rounds
+
+    def next_delay(self) -> float:
+        """Seconds to wait before checking the pending rows again."""
+        return self.delay
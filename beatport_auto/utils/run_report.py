@@ -0,0 +1,91 @@
+"""
+Machine-readable run reports for the Beatport Auto Downloader.
+Streams one record per track event to JSON-lines and CSV files as the run progresses.
+"""
+
+import csv
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+
+
+REPORT_FIELDS = [
+    "timestamp",
+    "page",
+    "track_id",
+    "name",
+    "artist",
+    "status",
+    "reason_code",
+    "strategy",
+    "click_time",
+    "completion_time",
+    "bytes",
+]
+
+
+class RunReportWriter:
+    """
+    Writes every track seen during a run to run_report_<timestamp>.jsonl and .csv.
+
+    Files are opened on the first record and each record is flushed straight to
+    disk, so nothing is accumulated in memory and a crashed run still leaves a
+    usable report behind.
+    """
+
+    def __init__(self, directory: str, run_id: Optional[str] = None):
+        self.directory = directory
+        self.run_id = run_id or datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.jsonl_path = os.path.join(directory, f"run_report_{self.run_id}.jsonl")
+        self.csv_path = os.path.join(directory, f"run_report_{self.run_id}.csv")
+        self._jsonl_file = None
+        self._csv_file = None
+        self._csv_writer = None
+        self._lock = threading.Lock()
+        self.records_written = 0
+
+    def _open(self) -> None:
+        self._jsonl_file = open(self.jsonl_path, 'a', encoding='utf-8')
+        self._csv_file = open(self.csv_path, 'a', encoding='utf-8', newline='')
+        self._csv_writer = csv.DictWriter(self._csv_file, fieldnames=REPORT_FIELDS, extrasaction='ignore')
+        if self._csv_file.tell() == 0:
+            self._csv_writer.writeheader()
+        logging.info(f"Writing run report to {self.jsonl_path} and {self.csv_path}")
+
+    def write(self, record: Dict) -> None:
+        """
+        Append one track record to both report files.
+
+        Args:
+            record: Track fields; missing REPORT_FIELDS are written as empty values
+        """
+        row = {field: record.get(field) for field in REPORT_FIELDS}
+        if row["timestamp"] is None:
+            row["timestamp"] = datetime.now().isoformat()
+
+        try:
+            # Download workers report completions from their own threads
+            with self._lock:
+                if self._jsonl_file is None:
+                    self._open()
+
+                self._jsonl_file.write(json.dumps(row) + "\n")
+                self._jsonl_file.flush()
+                self._csv_writer.writerow({k: ("" if v is None else v) for k, v in row.items()})
+                self._csv_file.flush()
+                self.records_written += 1
+        except Exception as e:
+            logging.error(f"Error writing run report: {e}")
+
+    def close(self) -> None:
+        """Close the report files; a later write reopens them in append mode."""
+        with self._lock:
+            for f in (self._jsonl_file, self._csv_file):
+                if f is not None:
+                    f.close()
+            self._jsonl_file = None
+            self._csv_file = None
+            self._csv_writer = None
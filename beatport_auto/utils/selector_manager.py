@@ -5,118 +5,337 @@ Handles dynamic selector management, fallback mechanisms, and adaptive learning.
 
 import json
 import logging
-from pathlib import Path
-from typing import List, Dict, Union, Optional
+import os
+import time
+from typing import List, Dict, Union, Optional, Tuple
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.common.by import By
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from selenium.common.exceptions import InvalidSelectorException, StaleElementReferenceException, TimeoutException
+
+from beatport_auto.utils.selector_stats import SelectorStatsStore, write_json_atomically
+
+DEFAULT_SELECTORS = {
+    "track_containers": [
+        "[data-testid='library-tracks-table-row']",
+        "[data-testid='tracks-list-item']"
+    ],
+    "track_name": [
+        "[data-testid='track-title']",
+        ".Tables-shared-style__ReleaseName-sc-792178d5-4",
+        ".TracksList-style__TrackName-sc-921ce1b-0"
+    ],
+    "artist_name": [
+        "[data-testid='artist-name']",
+        "a[href*='/artist/']"
+    ],
+    "download_button": [
+        "svg[data-testid='icon-re-download']",
+        "svg path[stroke='#39C0DE']"
+    ],
+    "pagination": [
+        "[data-testid='pagination-container']"
+    ],
+    "next_button": [
+        "a[data-testid='pagination-next']",
+        "a:has(span:contains('Next'))"
+    ],
+    "popup_download_button": [
+        "//button[contains(text(), 'Download') or .//span[contains(text(), 'Download')]]"
+    ]
+}
+
+# Keeps only the candidates that are rendered, in a single round-trip.
+# Mirrors what is_displayed() checks per element: a non-empty box and a visible computed style.
+VISIBILITY_FILTER_SCRIPT = """
+return arguments[0].filter(function (el) {
+    var rect = el.getBoundingClientRect();
+    if (rect.width === 0 && rect.height === 0) {
+        return false;
+    }
+    var style = window.getComputedStyle(el);
+    return style.display !== 'none'
+        && style.visibility !== 'hidden'
+        && style.visibility !== 'collapse'
+        && parseFloat(style.opacity) > 0;
+});
+"""
+
+
+def selector_strategy(selector: str) -> str:
+    """Return By.XPATH for XPath expressions and By.CSS_SELECTOR for everything else."""
+    if selector.startswith(('/', './', '(', '..')):
+        return By.XPATH
+    return By.CSS_SELECTOR
+
 
 class SelectorsManager:
     """
     Manages dynamic selectors for Beatport web scraping with resilient element selection.
     Features:
     1. Dynamic selector management for various elements
-    2. Fallback mechanisms when primary selectors fail
-    3. Adaptive learning from successful selections
-    4. Support for both large and small layouts
-    5. Detailed logging for debugging
+    2. CSS and XPath selectors, told apart by syntax rather than by trial and error
+    3. Optional visibility filtering done in one script call per lookup, skipped for single elements inside a row
+    4. Adaptive learning: selectors are ranked by persisted hit rate and cost
+    5. Pluggable stat persistence through the stats_store argument
     """
-    
-    def __init__(self, selectors_file: str = "selectors.json"):
+
+    def __init__(self, selectors_file: str = "selectors.json", stats_store: Optional[SelectorStatsStore] = None):
         self.selectors_file = selectors_file
         self.selectors = self.load_selectors()
-        self.selector_stats = {}  # Track success/failure of selectors
-        
+        self.selector_stats = {}  # Hits and misses per selector for this run
+        self.stats_store = stats_store if stats_store is not None else SelectorStatsStore()
+        self.invalid_selectors = set()
+
     def load_selectors(self) -> Dict[str, List[str]]:
         """Load selectors from JSON file with fallback to defaults."""
         try:
-            with open(self.selectors_file, 'r') as f:
-                selectors = json.load(f)
-            logging.info("Loaded selectors from selectors.json")
-            return selectors
+            if os.path.exists(self.selectors_file):
+                with open(self.selectors_file, 'r') as f:
+                    selectors = json.load(f)
+                logging.info(f"Loaded selectors from {self.selectors_file}")
+                return selectors
+            logging.warning(f"{self.selectors_file} not found, using default selectors")
+            return {key: list(values) for key, values in DEFAULT_SELECTORS.items()}
         except Exception as e:
-            logging.error(f"Error loading selectors: {e}")
-            return {}
-            
+            logging.error(f"Error loading selectors, using default selectors: {e}")
+            return {key: list(values) for key, values in DEFAULT_SELECTORS.items()}
+
     def save_selectors(self) -> None:
         """Save current selectors to JSON file."""
         try:
-            with open(self.selectors_file, 'w') as f:
-                json.dump(self.selectors, f, indent=2)
-            logging.info("Saved updated selectors to selectors.json")
+            write_json_atomically(self.selectors_file, self.selectors, indent=2)
+            logging.debug(f"Saved updated selectors to {self.selectors_file}")
         except Exception as e:
             logging.error(f"Error saving selectors: {e}")
-            
+
+    def update_selector_stats(self, selector_type: str, selector: str, success: bool, elapsed_ms: float = 0.0,
+                              page_level: bool = True) -> None:
+        """Track which selectors work and which don't, and how long each lookup took."""
+        stats = self.selector_stats.setdefault(selector_type, {}).setdefault(selector, {"hits": 0, "misses": 0})
+        if success:
+            stats["hits"] += 1
+        else:
+            stats["misses"] += 1
+        self.stats_store.record(selector_type, selector, success, elapsed_ms, page_level)
+
+    def visible_in_row(self, row: WebElement, elements: List[WebElement]) -> List[WebElement]:
+        """Drop hidden copies when a row lookup matched several elements; a single match is returned as is."""
+        if len(elements) < 2:
+            return elements
+        return self.filter_visible(row, elements)
+
+    def filter_visible(self, driver: Union[WebDriver, WebElement], elements: List[WebElement]) -> List[WebElement]:
+        """Return only the rendered elements, checked in one execute_script call."""
+        if not elements:
+            return elements
+        webdriver = driver.parent if isinstance(driver, WebElement) else driver
+        return webdriver.execute_script(VISIBILITY_FILTER_SCRIPT, elements) or []
+
+    def _try_selectors(
+        self,
+        driver: Union[WebDriver, WebElement],
+        search_element: Union[WebDriver, WebElement],
+        selector_type: str,
+        visible_only: bool,
+        try_all: bool = False
+    ) -> Tuple[Optional[str], List[WebElement], List[Tuple[str, bool, float]]]:
+        """
+        Try each selector in order, returning the winner, its elements and per-selector outcomes.
+
+        With try_all, selectors after the winner are timed too instead of stopping at the first hit.
+        """
+        outcomes = []
+        winner, found = None, []
+        for selector in self.selectors[selector_type]:
+            if selector in self.invalid_selectors:
+                continue
+            started = time.perf_counter()
+            try:
+                elements = search_element.find_elements(selector_strategy(selector), selector)
+            except InvalidSelectorException:
+                logging.debug(f"Invalid selector skipped for the rest of the run: {selector}")
+                self.invalid_selectors.add(selector)
+                elements = []
+            except StaleElementReferenceException:
+                # The search root was re-rendered mid-lookup
+                elements = []
+            if elements and visible_only:
+                try:
+                    elements = self.filter_visible(driver, elements)
+                except StaleElementReferenceException:
+                    # React re-rendered the matches away; a miss for this poll, the wait polls again
+                    elements = []
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            outcomes.append((selector, bool(elements), elapsed_ms))
+            if elements and winner is None:
+                winner, found = selector, elements
+                if not try_all:
+                    break
+        return winner, found, outcomes
+
     def find_element_with_learning(
         self,
         driver: Union[WebDriver, WebElement],
         selector_type: str,
-        wait: Optional[WebDriverWait] = None,
+        context_element: Optional[WebElement] = None,
         multiple: bool = True,
-        context_element: Optional[WebElement] = None
+        wait: Optional[WebDriverWait] = None,
+        visible_only: bool = True
     ) -> Union[List[WebElement], WebElement, None]:
         """
         Find elements using dynamic selector management with learning capabilities.
-        
+
         Args:
             driver: WebDriver or WebElement to search within
             selector_type: Type of element to find (e.g., 'track_containers')
-            wait: Optional WebDriverWait for explicit waits
-            multiple: Whether to return multiple elements
             context_element: Optional parent element to search within
-        
+            multiple: Whether to return multiple elements
+            wait: Optional WebDriverWait; polls all selectors until one matches
+            visible_only: Only return elements that are rendered. Ignored for single-element
+                lookups inside a context element, which was already filtered when it was found;
+                multiple lookups in a row are still filtered, since a row can hold a hidden
+                copy of a control for the other layout
+
         Returns:
-            Found WebElement(s) or None if not found
+            Found WebElement(s), or an empty list / None if not found
         """
-        if selector_type not in self.selectors:
-            logging.error(f"No selectors defined for type: {selector_type}")
-            return None
-            
-        # Initialize stats for this selector type if needed
-        if selector_type not in self.selector_stats:
-            self.selector_stats[selector_type] = {
-                selector: {"hits": 0, "misses": 0}
-                for selector in self.selectors[selector_type]
-            }
-            
-        search_element = context_element if context_element else driver
-        
-        for selector in self.selectors[selector_type]:
+        if not self.selectors.get(selector_type):
+            logging.warning(f"No selectors defined for {selector_type}")
+            return [] if multiple else None
+
+        search_element = context_element if context_element is not None else driver
+        if context_element is not None and not multiple:
+            visible_only = False
+        result = (None, [], [])
+
+        if wait is not None and context_element is None:
+            # One wait over every selector instead of a full timeout per broken selector
+            def poll(_):
+                nonlocal result
+                result = self._try_selectors(driver, search_element, selector_type, visible_only)
+                return result[0] is not None
             try:
-                if wait:
-                    elements = wait.until(
-                        lambda d: search_element.find_elements(By.CSS_SELECTOR, selector)
-                    )
-                else:
-                    elements = search_element.find_elements(By.CSS_SELECTOR, selector)
-                    
-                if elements:
-                    # Update stats for successful selector
-                    self.selector_stats[selector_type][selector]["hits"] += 1
-                    
-                    if not multiple:
-                        return elements[0]
-                    return elements
-                    
-                self.selector_stats[selector_type][selector]["misses"] += 1
-                
-            except (NoSuchElementException, TimeoutException) as e:
-                self.selector_stats[selector_type][selector]["misses"] += 1
-                continue
-                
-        return None
-        
-    def add_successful_selector(self, selector_type: str, selector: str) -> None:
-        """Add a new successful selector to the repertoire."""
+                wait.until(poll)
+            except TimeoutException:
+                pass
+        else:
+            result = self._try_selectors(driver, search_element, selector_type, visible_only)
+
+        winner, elements, outcomes = result
+        self._record_outcomes(selector_type, winner, outcomes, page_level=context_element is None)
+
+        if multiple:
+            return elements
+        return elements[0] if elements else None
+
+    def resolve_in_context(self, context_element: WebElement, selector_type: str) -> Tuple[Optional[str], List[WebElement]]:
+        """
+        Find selector_type inside an element, also returning which selector matched.
+
+        Callers that search many similar elements (e.g. the rows of a page) pin
+        the returned selector instead of trying every selector on each one.
+        Candidates are filtered for visibility here, so the pinned selector is
+        one that matches the rendered copy of the part.
+
+        Returns:
+            The winning selector, or None, and the elements it found
+        """
+        if not self.selectors.get(selector_type):
+            logging.warning(f"No selectors defined for {selector_type}")
+            return None, []
+        winner, elements, outcomes = self._try_selectors(context_element, context_element, selector_type, True)
+        self._record_outcomes(selector_type, winner, outcomes, page_level=False)
+        return winner, elements
+
+    def _record_outcomes(self, selector_type: str, winner: Optional[str], outcomes: List[Tuple[str, bool, float]],
+                         page_level: bool = True) -> None:
+        for selector, success, elapsed_ms in outcomes:
+            self.update_selector_stats(selector_type, selector, success, elapsed_ms, page_level)
+
+        if winner is None:
+            logging.debug(f"No elements found for selector type: {selector_type}")
+        elif winner != self.selectors[selector_type][0]:
+            # If a later selector won, re-rank so the best one is tried first next time
+            self.rank_selector_type(selector_type)
+
+    def rank_selector_type(self, selector_type: str, prune: bool = False) -> bool:
+        """Reorder one selector type by success rate and lookup cost, saving if the order changed."""
+        current = self.selectors.get(selector_type, [])
+        # Built-in selectors stay even after long unused stretches, e.g. the other layout's
+        ranked = self.stats_store.rank(selector_type, current, prune=prune,
+                                       protected=DEFAULT_SELECTORS.get(selector_type, ()))
+        if ranked != current:
+            self.selectors[selector_type] = ranked
+            self.save_selectors()
+            return True
+        return False
+
+    def rank_selectors(self, prune: bool = True) -> None:
+        """Rank every selector type so the cheapest working selector is tried first."""
+        for selector_type in list(self.selectors):
+            if self.rank_selector_type(selector_type, prune=prune):
+                logging.info(f"Reordered {selector_type} selectors: first is now {self.selectors[selector_type][0]}")
+        self.save_stats()
+
+    def save_stats(self) -> None:
+        """Persist selector statistics for the next run."""
+        self.stats_store.save()
+
+    def add_selector(self, selector_type: str, new_selector: str) -> None:
+        """Add a new selector that was found to work."""
         if selector_type not in self.selectors:
             self.selectors[selector_type] = []
-            
-        if selector not in self.selectors[selector_type]:
-            self.selectors[selector_type].insert(0, selector)  # Add to start of list
+
+        if new_selector not in self.selectors[selector_type]:
+            self.selectors[selector_type].insert(0, new_selector)  # Add to start of list
             self.save_selectors()
-            
+            logging.info(f"Added new working selector for {selector_type}: {new_selector}")
+
+    # Name used by older callers of the utils module
+    add_successful_selector = add_selector
+
     def get_selector_stats(self) -> Dict:
         """Get statistics about selector usage and success rates."""
         return self.selector_stats
+
+    def verify_selectors_health(self, driver: WebDriver, wait: Optional[WebDriverWait]) -> bool:
+        """Test if critical selectors still work, log their stats and re-rank them."""
+        try:
+            logging.info("Running selector health check...")
+            working_selectors = {}
+            broken_selectors = {}
+
+            for selector_type in ["track_containers", "track_name", "artist_name", "download_button"]:
+                # Time every selector once, so ones behind the current winner get a real cost to rank by
+                winner, elements, outcomes = self._try_selectors(driver, driver, selector_type, True, try_all=True)
+                self._record_outcomes(selector_type, winner, outcomes)
+                if not elements and wait is not None:
+                    elements = self.find_element_with_learning(driver, selector_type, wait=wait)
+                if elements:
+                    working_selectors[selector_type] = True
+                else:
+                    broken_selectors[selector_type] = True
+
+            if broken_selectors:
+                logging.warning("Some selectors appear to be broken and need updating:")
+                for key in broken_selectors:
+                    logging.warning(f"- {key}: No working selectors found")
+            else:
+                logging.info("All selectors appear to be healthy")
+
+            for selector_type in working_selectors:
+                for row in self.stats_store.summary(selector_type):
+                    logging.info(
+                        f"  {selector_type}: {row['selector']} - {row['success_rate']:.0%} hit rate, "
+                        f"{row['cost_ms']:.1f} ms/lookup, {row['expected_cost_ms']:.1f} ms/hit"
+                    )
+
+            # Put the cheapest working selector first and drop ones that stopped matching
+            self.rank_selectors(prune=True)
+
+            return len(broken_selectors) == 0
+        except Exception as e:
+            logging.error(f"Error during selector health check: {e}")
+            return False
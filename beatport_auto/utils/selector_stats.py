@@ -0,0 +1,228 @@
+"""
+Persistent selector statistics for the SelectorsManager.
+Keeps hit/miss counts and lookup cost per selector across runs and ranks selectors by them,
+and, separately, whether each page layout shows a download popup.
+"""
+
+import json
+import logging
+import os
+import tempfile
+from typing import Any, Collection, Dict, List, Optional
+
+# Index of each counter in the compact per-selector record
+HITS, MISSES, TOTAL_MS, MISSES_SINCE_HIT = range(4)
+# Index of each counter in the compact per-layout popup record
+SEEN, ABSENT, ABSENT_SINCE_SEEN = range(3)
+# Lowest cost a lookup is credited with, so a selector that happened to time at 0 ms can't outrank everything
+MIN_COST_MS = 0.5
+# Assumed cost of an untried selector when no selector of its type has been timed yet
+UNTRIED_COST_MS = 10.0
+
+
+def write_json_atomically(path: str, data: Any, **dump_args) -> None:
+    """
+    Write JSON to a temporary file next to path and move it into place.
+
+    Several account threads share the selector files, so a reader must never
+    see a half-written file and two writers must not share a temporary file.
+    """
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, **dump_args)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+class SelectorStatsStore:
+    """
+    Compact on-disk store of selector hit rates and lookup cost.
+
+    Each selector is stored as [hits, misses, total_ms, misses_since_hit] under
+    its selector type, so the file stays small even after thousands of runs.
+    """
+
+    def __init__(self, stats_file: Optional[str] = "selector_stats.json", prune_after: int = 50):
+        self.stats_file = stats_file
+        self.prune_after = prune_after
+        self.stats = self.load()
+
+    def load(self) -> Dict[str, Dict[str, List[float]]]:
+        """Load stats from disk, starting empty if the file is missing or unreadable."""
+        if self.stats_file is None or not os.path.exists(self.stats_file):
+            return {}
+        try:
+            with open(self.stats_file, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            logging.error(f"Error loading selector stats: {e}")
+            return {}
+
+    def save(self) -> None:
+        """Write stats to disk in compact form; a store without a file keeps stats in memory only."""
+        if self.stats_file is None:
+            return
+        try:
+            write_json_atomically(self.stats_file, self.stats, separators=(',', ':'))
+            logging.debug("Saved selector stats")
+        except Exception as e:
+            logging.error(f"Error saving selector stats: {e}")
+
+    def record(self, selector_type: str, selector: str, success: bool, elapsed_ms: float,
+               page_level: bool = True) -> None:
+        """
+        Record the outcome and cost of one selector lookup.
+
+        Args:
+            selector_type: Type of element looked up (e.g., 'track_containers')
+            selector: The selector that was tried
+            success: Whether the selector found usable elements
+            elapsed_ms: Time the lookup took in milliseconds
+            page_level: False for lookups inside one row, whose misses count
+                towards the success rate but not towards pruning, since a row
+                can simply lack the element (no download button once downloaded)
+        """
+        entry = self.stats.setdefault(selector_type, {}).setdefault(selector, [0, 0, 0.0, 0])
+        if success:
+            entry[HITS] += 1
+            entry[MISSES_SINCE_HIT] = 0
+        else:
+            entry[MISSES] += 1
+            if page_level:
+                entry[MISSES_SINCE_HIT] += 1
+        entry[TOTAL_MS] = round(entry[TOTAL_MS] + elapsed_ms, 3)
+
+    def success_rate(self, selector_type: str, selector: str) -> float:
+        """Smoothed success rate; selectors that were never tried score 0.5."""
+        entry = self.stats.get(selector_type, {}).get(selector)
+        if not entry:
+            return 0.5
+        return (entry[HITS] + 1) / (entry[HITS] + entry[MISSES] + 2)
+
+    def cost_ms(self, selector_type: str, selector: str) -> float:
+        """Average milliseconds per lookup, 0 for selectors that were never tried."""
+        entry = self.stats.get(selector_type, {}).get(selector)
+        if not entry or not (entry[HITS] + entry[MISSES]):
+            return 0.0
+        return entry[TOTAL_MS] / (entry[HITS] + entry[MISSES])
+
+    def expected_cost_ms(self, selector_type: str, selector: str) -> float:
+        """
+        Lookup cost divided by success rate: the milliseconds spent per element found.
+
+        Trying selectors in ascending order of this score keeps the expected
+        time to a hit lowest, so a cheap selector that usually works beats a
+        slow one that always does. Untried selectors are costed at the average
+        of their timed siblings.
+        """
+        entry = self.stats.get(selector_type, {}).get(selector)
+        if entry and entry[HITS] + entry[MISSES]:
+            cost = self.cost_ms(selector_type, selector)
+        else:
+            timed = [self.cost_ms(selector_type, s) for s, e in self.stats.get(selector_type, {}).items()
+                     if e[HITS] + e[MISSES]]
+            cost = sum(timed) / len(timed) if timed else UNTRIED_COST_MS
+        return max(cost, MIN_COST_MS) / self.success_rate(selector_type, selector)
+
+    def misses_since_hit(self, selector_type: str, selector: str) -> int:
+        """Page-level lookups the selector has missed since its last hit."""
+        entry = self.stats.get(selector_type, {}).get(selector)
+        return int(entry[MISSES_SINCE_HIT]) if entry else 0
+
+    def is_stale(self, selector_type: str, selector: str) -> bool:
+        """True if the selector has missed prune_after page-level lookups in a row."""
+        entry = self.stats.get(selector_type, {}).get(selector)
+        return bool(entry) and entry[MISSES_SINCE_HIT] >= self.prune_after
+
+    def rank(self, selector_type: str, selectors: List[str], prune: bool = False,
+             protected: Collection[str] = ()) -> List[str]:
+        """
+        Order selectors by expected cost, cheapest first.
+
+        Args:
+            selector_type: Type of element the selectors find
+            selectors: Current selectors in their current order
+            prune: Drop selectors with no recent hits, always keeping at least one
+            protected: Selectors that are never pruned, e.g. the built-in defaults
+
+        Returns:
+            The ranked (and optionally pruned) selectors
+        """
+        ranked = sorted(selectors, key=lambda s: self.expected_cost_ms(selector_type, s))
+
+        if prune:
+            kept = [s for s in ranked if s in protected or not self.is_stale(selector_type, s)]
+            for selector in ranked:
+                if selector not in kept:
+                    logging.info(f"Pruning {selector_type} selector with no recent hits: {selector}")
+                    self.stats.get(selector_type, {}).pop(selector, None)
+            ranked = kept or ranked[:1]
+
+        return ranked
+
+    def summary(self, selector_type: str) -> List[Dict]:
+        """Per-selector hit rate and cost for logging and health reports."""
+        rows = []
+        for selector, entry in self.stats.get(selector_type, {}).items():
+            rows.append({
+                "selector": selector,
+                "hits": entry[HITS],
+                "misses": entry[MISSES],
+                "success_rate": round(self.success_rate(selector_type, selector), 3),
+                "cost_ms": round(self.cost_ms(selector_type, selector), 2),
+                "expected_cost_ms": round(self.expected_cost_ms(selector_type, selector), 2)
+            })
+        return rows
+
+
+class PopupPresenceStore:
+    """
+    Compact on-disk record of whether each row layout shows a download popup.
+
+    Each layout is stored as [seen, absent, absent_since_seen]. It lives in its
+    own file so popup learning never shows up among the selector ranks, pruning
+    or health reports.
+    """
+
+    def __init__(self, stats_file: Optional[str] = "popup_stats.json"):
+        self.stats_file = stats_file
+        self.stats = self.load()
+
+    def load(self) -> Dict[str, List[int]]:
+        """Load popup counts from disk, starting empty if the file is missing or unreadable."""
+        if self.stats_file is None or not os.path.exists(self.stats_file):
+            return {}
+        try:
+            with open(self.stats_file, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            logging.error(f"Error loading popup stats: {e}")
+            return {}
+
+    def save(self) -> None:
+        """Write popup counts to disk; a store without a file keeps them in memory only."""
+        if self.stats_file is None:
+            return
+        try:
+            write_json_atomically(self.stats_file, self.stats, separators=(',', ':'))
+            logging.debug("Saved popup stats")
+        except Exception as e:
+            logging.error(f"Error saving popup stats: {e}")
+
+    def record(self, layout: str, seen: bool) -> None:
+        """Record whether a click on this layout opened a popup."""
+        entry = self.stats.setdefault(layout, [0, 0, 0])
+        if seen:
+            entry[SEEN] += 1
+            entry[ABSENT_SINCE_SEEN] = 0
+        else:
+            entry[ABSENT] += 1
+            entry[ABSENT_SINCE_SEEN] += 1
+
+    def absent_since_seen(self, layout: str) -> int:
+        """Clicks on this layout without a popup since the last one that had one."""
+        entry = self.stats.get(layout)
+        return int(entry[ABSENT_SINCE_SEEN]) if entry else 0
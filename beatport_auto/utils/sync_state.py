@@ -0,0 +1,66 @@
+"""
+Sync state for incremental "new since last run" runs.
+Keeps the newest library track IDs seen by the last completed sync as a high-water mark.
+"""
+
+import json
+import logging
+import os
+from datetime import datetime
+from typing import List, Optional
+
+
+class SyncState:
+    """
+    High-water mark for the library, which lists the newest purchases first.
+
+    A completed sync stores the IDs of the first anchor_count rows of page 1.
+    The next sync walks from page 1 and stops at the first row whose ID is one
+    of those anchors. Several anchors are kept rather than one so that removing
+    the single newest track from the library doesn't make the next sync walk
+    the whole library.
+    """
+
+    def __init__(self, path: str, anchor_count: int = 10):
+        self.path = path
+        self.anchor_count = anchor_count
+        self.anchor_ids = set()
+        self.last_sync: Optional[str] = None
+        self.newest_ids: List[str] = []  # Newest rows seen by this run, in page order
+        self.load()
+
+    def load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            self.anchor_ids = set(state.get('anchor_ids', []))
+            self.last_sync = state.get('last_sync')
+        except Exception as e:
+            logging.error(f"Error loading sync state, syncing the whole library: {e}")
+
+    @property
+    def has_anchor(self) -> bool:
+        return bool(self.anchor_ids)
+
+    def observe(self, track_id: Optional[str]) -> None:
+        """Note a row in page order; the first anchor_count become the next high-water mark."""
+        if track_id and len(self.newest_ids) < self.anchor_count and track_id not in self.newest_ids:
+            self.newest_ids.append(track_id)
+
+    def is_synced(self, track_id: Optional[str]) -> bool:
+        """Whether a row was already in the library at the last completed sync."""
+        return bool(track_id) and track_id in self.anchor_ids
+
+    def save(self) -> None:
+        """Move the high-water mark to the newest rows seen; call only after a sync ran to completion."""
+        if self.newest_ids:
+            self.anchor_ids = set(self.newest_ids)
+        self.last_sync = datetime.now().isoformat()
+        try:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump({'anchor_ids': self.newest_ids or sorted(self.anchor_ids), 'last_sync': self.last_sync}, f, indent=2)
+            logging.info(f"Saved sync state to {self.path}")
+        except Exception as e:
+            logging.error(f"Error saving sync state: {e}")
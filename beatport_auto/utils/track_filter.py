@@ -0,0 +1,182 @@
+"""
+Track selection filters for the Beatport Auto Downloader.
+Parses a small filter expression and matches it against row records before any download is clicked.
+"""
+
+import re
+import shlex
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+# Fields that can't be read from the title/artist cells and need the row's detail cells
+DETAIL_FIELDS = ("label", "genre", "bpm", "key", "date")
+
+FILTER_HELP = (
+    "artist:REGEX  title:REGEX  label:NAME[,NAME]  genre:NAME[,NAME]  "
+    "bpm:120-128  key:\"A Minor\"[,...]  date:2024-01-01..2024-12-31  limit:200"
+)
+
+
+def _parse_number_range(value: str) -> Tuple[Optional[float], Optional[float]]:
+    """Parse '120-128', '120..128', '>=120', '<=128' or '126' into (low, high)."""
+    try:
+        if value.startswith(">="):
+            return float(value[2:]), None
+        if value.startswith("<="):
+            return None, float(value[2:])
+        for separator in ("..", "-"):
+            if separator in value:
+                low, high = value.split(separator, 1)
+                return (float(low) if low else None), (float(high) if high else None)
+        return float(value), float(value)
+    except ValueError:
+        raise ValueError(f"Invalid BPM range: {value}")
+
+
+def _parse_date_range(value: str) -> Tuple[Optional[date], Optional[date]]:
+    """Parse 'FROM..TO' with either end optional, '>=FROM', '<=TO' or a single day."""
+    try:
+        if value.startswith(">="):
+            return date.fromisoformat(value[2:]), None
+        if value.startswith("<="):
+            return None, date.fromisoformat(value[2:])
+        if ".." in value:
+            low, high = value.split("..", 1)
+            return (date.fromisoformat(low) if low else None), (date.fromisoformat(high) if high else None)
+        day = date.fromisoformat(value)
+        return day, day
+    except ValueError:
+        raise ValueError(f"Invalid date range (use YYYY-MM-DD..YYYY-MM-DD): {value}")
+
+
+def _parse_bpm(value) -> Optional[float]:
+    if value is None:
+        return None
+    match = re.search(r"\d+(?:\.\d+)?", str(value))
+    return float(match.group()) if match else None
+
+
+def _parse_date(value) -> Optional[date]:
+    if not value:
+        return None
+    match = re.search(r"\d{4}-\d{2}-\d{2}", str(value))
+    try:
+        return date.fromisoformat(match.group()) if match else None
+    except ValueError:
+        return None
+
+
+class TrackFilter:
+    """
+    Decides which rows are worth clicking.
+
+    Rows are matched on the records the finder builds for them (name, artist,
+    label, genre, bpm, key, date). Text fields are case-insensitive; label and
+    genre accept a comma-separated list of names. A row missing a field that
+    is being filtered on does not match. limit caps how many matching rows
+    are accepted over the whole run.
+    """
+
+    def __init__(
+        self,
+        artist: Optional[str] = None,
+        title: Optional[str] = None,
+        labels: Optional[List[str]] = None,
+        genres: Optional[List[str]] = None,
+        bpm_range: Tuple[Optional[float], Optional[float]] = (None, None),
+        keys: Optional[List[str]] = None,
+        date_range: Tuple[Optional[date], Optional[date]] = (None, None),
+        limit: Optional[int] = None
+    ):
+        self.artist = re.compile(artist, re.IGNORECASE) if artist else None
+        self.title = re.compile(title, re.IGNORECASE) if title else None
+        self.labels = {label.lower() for label in labels} if labels else None
+        self.genres = {genre.lower() for genre in genres} if genres else None
+        self.bpm_range = bpm_range
+        self.keys = {key.lower() for key in keys} if keys else None
+        self.date_range = date_range
+        self.limit = limit
+        self.accepted = 0
+
+    @classmethod
+    def parse(cls, expression: str) -> "TrackFilter":
+        """
+        Build a filter from an expression such as
+        'genre:house,techno bpm:120-128 artist:"^Jansons" limit:200'.
+
+        Raises:
+            ValueError: On an unknown field or a malformed value
+        """
+        options = {}
+        try:
+            clauses = shlex.split(expression or "")
+        except ValueError as e:
+            raise ValueError(f"Invalid filter expression: {e}")
+
+        for clause in clauses:
+            field, separator, value = clause.partition(":")
+            field = field.lower()
+            if not separator or not value:
+                raise ValueError(f"Filter clauses look like field:value, got '{clause}'. Fields: {FILTER_HELP}")
+            if field in ("artist", "title"):
+                try:
+                    re.compile(value)
+                except re.error as e:
+                    raise ValueError(f"Invalid {field} pattern '{value}': {e}")
+                options[field] = value
+            elif field in ("label", "genre"):
+                options[field + "s"] = [item.strip() for item in value.split(",") if item.strip()]
+            elif field == "key":
+                options["keys"] = [item.strip() for item in value.split(",") if item.strip()]
+            elif field == "bpm":
+                options["bpm_range"] = _parse_number_range(value)
+            elif field == "date":
+                options["date_range"] = _parse_date_range(value)
+            elif field == "limit":
+                if not value.isdigit():
+                    raise ValueError(f"limit must be a whole number, got '{value}'")
+                options["limit"] = int(value)
+            else:
+                raise ValueError(f"Unknown filter field '{field}'. Fields: {FILTER_HELP}")
+        return cls(**options)
+
+    @property
+    def needs_details(self) -> bool:
+        """Whether matching needs the label/genre/BPM/key/date cells of a row."""
+        return bool(self.labels or self.genres or self.keys or any(self.bpm_range) or any(self.date_range))
+
+    def matches(self, record: Dict) -> bool:
+        """Check a row record against every clause, ignoring the limit."""
+        if self.artist and not self.artist.search(record.get("artist") or ""):
+            return False
+        if self.title and not self.title.search(record.get("name") or ""):
+            return False
+        if self.labels and (record.get("label") or "").lower() not in self.labels:
+            return False
+        if self.genres and (record.get("genre") or "").lower() not in self.genres:
+            return False
+        if self.keys and (record.get("key") or "").lower() not in self.keys:
+            return False
+
+        low, high = self.bpm_range
+        if low is not None or high is not None:
+            bpm = _parse_bpm(record.get("bpm"))
+            if bpm is None or (low is not None and bpm < low) or (high is not None and bpm > high):
+                return False
+
+        low, high = self.date_range
+        if low is not None or high is not None:
+            day = _parse_date(record.get("date"))
+            if day is None or (low is not None and day < low) or (high is not None and day > high):
+                return False
+        return True
+
+    def limit_reached(self) -> bool:
+        return self.limit is not None and self.accepted >= self.limit
+
+    def accept(self, record: Dict) -> bool:
+        """Match a row and count it towards the limit if it is accepted."""
+        if self.limit_reached() or not self.matches(record):
+            return False
+        self.accepted += 1
+        return True
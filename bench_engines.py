@@ -0,0 +1,99 @@
+"""
+Benchmark for the Selenium and async CDP page engines
+Extracts every row of the saved page-source fixtures in headless Chrome and reports pages per second
+"""
+import argparse
+import asyncio
+import logging
+import time
+from pathlib import Path
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+from beatport_auto.async_engine import ROWS_SCRIPT, CdpClient, CdpTab, browser_websocket_url
+from beatport_auto.utils.selector_manager import SelectorsManager
+from beatport_auto.utils.selector_stats import SelectorStatsStore
+
+ROOT = Path(__file__).parent
+FIXTURES = {
+    "large": ROOT / "large_screen_source.html",
+    "small": ROOT / "small_screen_source.html",
+}
+CONTAINER_SELECTORS = ["[data-testid='library-tracks-table-row']", "[data-testid='tracks-list-item']"]
+
+def create_driver():
+    chrome_options = Options()
+    chrome_options.add_argument('--headless=new')
+    chrome_options.add_argument('--window-size=1920,1080')
+    return webdriver.Chrome(
+        service=Service(ChromeDriverManager().install()),
+        options=chrome_options
+    )
+
+def bench_selenium(driver, manager, url, pages):
+    """Load and extract pages one after another the way the Selenium engine does, row by row"""
+    started = time.perf_counter()
+    rows = 0
+    for _ in range(pages):
+        driver.get(url)
+        for track in manager.find_element_with_learning(driver, 'track_containers') or []:
+            manager.find_element_with_learning(driver, 'track_name', context_element=track, multiple=False)
+            manager.find_element_with_learning(driver, 'artist_name', context_element=track)
+            manager.find_element_with_learning(driver, 'download_button', context_element=track)
+            rows += 1
+    return pages / (time.perf_counter() - started), rows
+
+async def bench_async(driver, url, pages, tabs):
+    """Load and extract pages from a shared queue across several CDP tabs"""
+    client = await CdpClient.connect(browser_websocket_url(driver))
+    opened = [await CdpTab.open(client) for _ in range(tabs)]
+    queue = asyncio.Queue()
+    for page in range(pages):
+        queue.put_nowait(page)
+    rows = []
+
+    async def worker(tab):
+        while not queue.empty():
+            queue.get_nowait()
+            await tab.navigate(url)
+            rows.extend(await tab.call(ROWS_SCRIPT, CONTAINER_SELECTORS, 5000))
+
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(tab) for tab in opened))
+        return pages / (time.perf_counter() - started), len(rows)
+    finally:
+        for tab in opened:
+            await tab.close()
+        await client.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Selenium and async engines against the HTML fixtures")
+    parser.add_argument('--pages', type=int, default=20, help='Page loads per engine and layout')
+    parser.add_argument('--tabs', type=int, default=3, help='Tabs used by the async engine')
+    parser.add_argument('--selectors', default=str(ROOT / "beatport_auto" / "data"), help='Selectors JSON file')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    driver = create_driver()
+
+    try:
+        print(f"{'layout':<10}{'engine':<16}{'pages/s':>10}{'rows':>8}")
+        for layout, fixture in FIXTURES.items():
+            url = fixture.resolve().as_uri()
+            # In-memory stats so benchmarking doesn't touch selector_stats.json
+            manager = SelectorsManager(args.selectors, stats_store=SelectorStatsStore(None))
+            manager.save_selectors = lambda: None
+
+            rate, rows = bench_selenium(driver, manager, url, args.pages)
+            print(f"{layout:<10}{'selenium':<16}{rate:>10.2f}{rows:>8}")
+            rate, rows = asyncio.run(bench_async(driver, url, args.pages, args.tabs))
+            print(f"{layout:<10}{f'async x{args.tabs}':<16}{rate:>10.2f}{rows:>8}")
+    finally:
+        driver.quit()
+
+if __name__ == "__main__":
+    main()
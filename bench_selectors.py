@@ -0,0 +1,68 @@
+"""
+Micro-benchmark for the SelectorsManager engine
+Loads the saved page-source fixtures in headless Chrome and reports lookups per second
+"""
+import argparse
+import logging
+import time
+from pathlib import Path
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+from beatport_auto.utils.selector_manager import SelectorsManager
+from beatport_auto.utils.selector_stats import SelectorStatsStore
+
+ROOT = Path(__file__).parent
+FIXTURES = {
+    "large": ROOT / "large_screen_source.html",
+    "small": ROOT / "small_screen_source.html",
+}
+SELECTOR_TYPES = ["track_containers", "track_name", "artist_name", "download_button"]
+
+def create_driver():
+    chrome_options = Options()
+    chrome_options.add_argument('--headless=new')
+    chrome_options.add_argument('--window-size=1920,1080')
+    return webdriver.Chrome(
+        service=Service(ChromeDriverManager().install()),
+        options=chrome_options
+    )
+
+def bench_lookups(manager, driver, selector_type, iterations, visible_only):
+    """Return lookups per second for one selector type"""
+    started = time.perf_counter()
+    for _ in range(iterations):
+        manager.find_element_with_learning(driver, selector_type, visible_only=visible_only)
+    elapsed = time.perf_counter() - started
+    return iterations / elapsed if elapsed else float('inf')
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark selector lookups against the HTML fixtures")
+    parser.add_argument('--iterations', type=int, default=200, help='Lookups per selector type')
+    parser.add_argument('--selectors', default=str(ROOT / "beatport_auto" / "data"), help='Selectors JSON file')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    driver = create_driver()
+
+    try:
+        for layout, fixture in FIXTURES.items():
+            driver.get(fixture.resolve().as_uri())
+            # In-memory stats so benchmarking doesn't touch selector_stats.json
+            manager = SelectorsManager(args.selectors, stats_store=SelectorStatsStore(None))
+            manager.save_selectors = lambda: None
+
+            print(f"\n{layout} layout ({fixture.name})")
+            print(f"{'selector type':<20}{'visible':>12}{'any':>12}  (lookups/s)")
+            for selector_type in SELECTOR_TYPES:
+                visible = bench_lookups(manager, driver, selector_type, args.iterations, True)
+                unfiltered = bench_lookups(manager, driver, selector_type, args.iterations, False)
+                print(f"{selector_type:<20}{visible:>12.1f}{unfiltered:>12.1f}")
+    finally:
+        driver.quit()
+
+if __name__ == "__main__":
+    main()
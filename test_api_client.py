@@ -0,0 +1,73 @@
+"""
+Tests for the API data source against a local HTTP server
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from beatport_auto.utils import api_client
+from beatport_auto.utils.api_client import BeatportApiClient
+
+class LibraryHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        page = int(query["page"][0])
+        body = json.dumps({"results": [{
+            "id": page,
+            "name": f"Track {page}",
+            "mix_name": "Original Mix",
+            "artists": [{"name": "A"}, {"name": "B"}],
+            "genre": {"name": "House"},
+            "bpm": 126,
+            "download_count": 1 if page == 2 else 0,
+        }]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def api_server(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), LibraryHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(api_client, "API_BASE", f"http://127.0.0.1:{server.server_port}")
+    yield server
+    server.shutdown()
+
+def test_fetch_pages_concurrently(api_server):
+    client = BeatportApiClient(max_workers=3)
+    pages = client.fetch_pages("library", [1, 2, 3])
+    client.close()
+
+    assert sorted(pages) == [1, 2, 3]
+    track = pages[1][0]
+    assert track["track_id"] == "1"
+    assert track["name"] == "Track 1 (Original Mix)"
+    assert track["artist"] == "A, B"
+    assert track["status"] == "Available for Download"
+    assert pages[2][0]["status"] == "Already Downloaded"
+
+def test_failed_listing_returns_none(monkeypatch):
+    monkeypatch.setattr(api_client, "API_BASE", "http://127.0.0.1:9")
+    client = BeatportApiClient(timeout=1)
+    client.session.adapters["http://"].max_retries.total = 0
+    assert client.fetch_pages("library", [1]) is None
+
+class LoggedOutDriver:
+    def get_cookies(self):
+        return []
+
+    def execute_script(self, script):
+        return "Mozilla/5.0"
+
+def test_client_without_access_token_is_not_returned(api_server, monkeypatch):
+    # The session endpoint answers, but without a token
+    monkeypatch.setattr(api_client, "SESSION_URL", f"http://127.0.0.1:{api_server.server_port}/session?page=1")
+    assert BeatportApiClient.from_driver(LoggedOutDriver()) is None
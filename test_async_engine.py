@@ -0,0 +1,85 @@
+"""
+Tests for the asyncio CDP engine
+"""
+import asyncio
+import json
+
+from beatport_auto.async_engine import AsyncBeatportTrackFinder, CdpClient, CdpError
+from beatport_auto.utils.download_events import DownloadEventListener
+
+class FakeWebSocket:
+    """Answers every command with a canned result and lets tests push events"""
+
+    def __init__(self):
+        self.sent = []
+        self.incoming = asyncio.Queue()
+
+    async def send(self, raw):
+        message = json.loads(raw)
+        self.sent.append(message)
+        if message["method"] == "Fail.me":
+            await self.incoming.put(json.dumps({"id": message["id"], "error": {"message": "nope"}}))
+        else:
+            await self.incoming.put(json.dumps({"id": message["id"], "result": {"echo": message["params"]}}))
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        raw = await self.incoming.get()
+        if raw is None:
+            raise StopAsyncIteration
+        return raw
+
+    async def close(self):
+        await self.incoming.put(None)
+
+def test_client_matches_responses_and_dispatches_events():
+    async def scenario():
+        websocket = FakeWebSocket()
+        client = CdpClient(websocket)
+        client._reader = asyncio.ensure_future(client._read())
+        seen = []
+        client.on("Page.loadEventFired", lambda params, session: seen.append(session))
+
+        results = await asyncio.gather(client.send("A.one", {"n": 1}), client.send("A.two", {"n": 2}, session_id="s1"))
+        assert [r["echo"]["n"] for r in results] == [1, 2]
+        assert websocket.sent[1]["sessionId"] == "s1"
+
+        loaded = client.wait_for("Page.loadEventFired", "s2")
+        await websocket.incoming.put(json.dumps({"method": "Page.loadEventFired", "params": {}, "sessionId": "s1"}))
+        await websocket.incoming.put(json.dumps({"method": "Page.loadEventFired", "params": {"t": 1}, "sessionId": "s2"}))
+        assert await asyncio.wait_for(loaded, 1) == {"t": 1}
+        assert seen == ["s1", "s2"]
+
+        try:
+            await client.send("Fail.me")
+            assert False, "expected CdpError"
+        except CdpError as e:
+            assert "nope" in str(e)
+        await client.close()
+
+    asyncio.run(scenario())
+
+def test_download_events_are_routed_to_the_clicking_tab():
+    finder = AsyncBeatportTrackFinder.__new__(AsyncBeatportTrackFinder)
+    finder.http_downloader = None
+    completed = []
+    finder.on_download_complete = completed.append
+    finder._tab_listeners = {
+        "tab1": DownloadEventListener(None, on_begin=finder.on_download_begin, on_complete=completed.append),
+        "tab2": DownloadEventListener(None, on_begin=finder.on_download_begin, on_complete=completed.append),
+    }
+    finder._guid_listeners = {}
+    finder._fallback_listener = DownloadEventListener(None)
+
+    finder._tab_listeners["tab1"].expect("111")
+    finder._tab_listeners["tab2"].expect("222")
+    finder._route_download_event("Browser.downloadWillBegin", {"guid": "b", "frameId": "tab2", "url": "https://x/b.mp3"})
+    finder._route_download_event("Browser.downloadWillBegin", {"guid": "a", "frameId": "tab1", "url": "https://x/a.mp3"})
+    finder._route_download_event("Browser.downloadProgress", {"guid": "a", "state": "completed", "receivedBytes": 5, "totalBytes": 5})
+
+    assert finder._tab_listeners["tab1"].downloads["a"]["track_id"] == "111"
+    assert finder._tab_listeners["tab2"].downloads["b"]["track_id"] == "222"
+    assert [d["track_id"] for d in completed] == ["111"]
+    assert {d["guid"] for d in finder._all_downloads()} == {"a", "b"}
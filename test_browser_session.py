@@ -0,0 +1,144 @@
+"""
+Tests for the browser memory watchdog and crash recovery
+"""
+import pytest
+from selenium.common.exceptions import InvalidSessionIdException, NoSuchElementException, WebDriverException
+
+from beatport_auto import main
+from beatport_auto.main import BeatportTrackFinder
+from beatport_auto.utils import browser_session
+from beatport_auto.utils.browser_session import (
+    MB, MemoryWatchdog, SessionLost, is_session_lost, restore_cookies, snapshot_cookies
+)
+from beatport_auto.utils.diagnostics import FailureRateTrigger
+from beatport_auto.utils.rate_limiter import PolitenessBudget
+
+class FakeDriver:
+    def __init__(self, heap_mb=10, url="https://www.beatport.com/library?page=7"):
+        self.heap_mb = heap_mb
+        self.current_url = url
+        self.cookies = []
+        self.visited = []
+        self.quit_called = False
+
+    def execute_cdp_cmd(self, method, params):
+        if method == 'Performance.getMetrics':
+            return {'metrics': [{'name': 'Nodes', 'value': 5}, {'name': 'JSHeapUsedSize', 'value': self.heap_mb * MB}]}
+        if method == 'Network.getAllCookies':
+            return {'cookies': self.cookies}
+        if method == 'Network.setCookies':
+            self.cookies = params['cookies']
+        return {}
+
+    def get(self, url):
+        self.visited.append(url)
+        self.current_url = url
+
+    def quit(self):
+        self.quit_called = True
+
+    def execute_script(self, script):
+        if self.quit_called:
+            raise WebDriverException("unknown error: cannot reach the browser")
+        return 1
+
+def test_cookies_survive_a_snapshot_and_restore():
+    old = FakeDriver()
+    old.cookies = [
+        {'name': 'session', 'value': 'abc', 'domain': '.beatport.com', 'path': '/', 'expires': -1,
+         'httpOnly': True, 'secure': True, 'size': 10, 'session': True},
+        {'name': 'pref', 'value': '1', 'domain': 'www.beatport.com', 'path': '/', 'expires': 1900000000.0},
+    ]
+    new = FakeDriver()
+    restore_cookies(new, snapshot_cookies(old))
+    assert new.cookies[0] == {'name': 'session', 'value': 'abc', 'domain': '.beatport.com', 'path': '/',
+                              'httpOnly': True, 'secure': True}
+    assert new.cookies[1]['expires'] == 1900000000.0
+
+def test_watchdog_flags_a_large_heap(monkeypatch):
+    monkeypatch.setattr(browser_session, "psutil", None)
+    watchdog = MemoryWatchdog(max_rss_mb=100, max_heap_mb=50)
+    assert watchdog.check(FakeDriver(heap_mb=20)) is None
+    assert "JS heap" in watchdog.check(FakeDriver(heap_mb=80))
+    assert watchdog.stats()['peak_heap_mb'] == 80
+    assert watchdog.stats()['rss_mb'] is None
+    assert MemoryWatchdog(0, 0).check(FakeDriver(heap_mb=80)) is None
+
+class RecyclingFinder(BeatportTrackFinder):
+    def __init__(self, driver):
+        self.driver = driver
+        self.download_events = None
+        self.memory_watchdog = MemoryWatchdog(max_rss_mb=0, max_heap_mb=50)
+        self.politeness = PolitenessBudget({"page_load": 1000, "click": 1000, "download_start": 1000})
+        self.browser_recycles = 0
+        self.failure_trigger = FailureRateTrigger()
+        self.launched = []
+
+    def initialize_browser(self, cookies=None):
+        self.driver = FakeDriver(url="https://www.beatport.com/library?name=")
+        self.driver.cookies = cookies
+        self.launched.append(self.driver)
+
+def test_recycle_relaunches_with_the_login_on_the_same_page():
+    old = FakeDriver(heap_mb=80)
+    old.cookies = [{'name': 'session', 'value': 'abc', 'domain': '.beatport.com'}]
+    finder = RecyclingFinder(old)
+    finder.check_browser_memory()
+
+    assert old.quit_called
+    assert finder.browser_recycles == 1
+    assert finder.driver.cookies == old.cookies
+    assert finder.driver.visited == ["https://www.beatport.com/library?page=7"]
+
+    # A browser within its limits is left alone
+    finder.check_browser_memory()
+    assert len(finder.launched) == 1
+
+def test_only_dead_sessions_count_as_lost():
+    alive, dead = FakeDriver(), FakeDriver()
+    dead.quit()
+    assert is_session_lost(InvalidSessionIdException("invalid session id"))
+    assert is_session_lost(Exception("Max retries exceeded with url: /session/abc/url"))
+    assert not is_session_lost(NoSuchElementException("no such element"), dead)
+    assert not is_session_lost(WebDriverException("element click intercepted"), alive)
+    assert is_session_lost(WebDriverException("element click intercepted"), dead)
+    assert not is_session_lost(ValueError("bad row"), dead)
+
+class CrashingFinder(RecyclingFinder):
+    """Its browser dies once, after two rows of the page are done"""
+
+    def __init__(self, driver, relaunch_fails=False):
+        super().__init__(driver)
+        self.session_cookies = [{'name': 'session', 'value': 'abc'}]
+        self.session_restarts = 0
+        self.relaunch_fails = relaunch_fails
+        self.resumed_from = []
+
+    def initialize_browser(self, cookies=None):
+        if self.relaunch_fails:
+            raise WebDriverException("chrome failed to start")
+        super().initialize_browser(cookies)
+
+    def process_page_rows(self, page_number, pending_keys=None):
+        self.page_url = self.page_url or self.driver.current_url
+        self.resumed_from.append(self.rows_done)
+        if len(self.resumed_from) == 1:
+            self.rows_done = 2
+            raise SessionLost("invalid session id")
+        return True
+
+def test_crashed_page_resumes_after_the_last_finished_row(monkeypatch):
+    monkeypatch.setattr(main, "SESSION_RESTART_DELAY", 0)
+    finder = CrashingFinder(FakeDriver())
+    assert finder.process_page(7)
+    assert finder.resumed_from == [0, 2]
+    assert finder.session_restarts == 1
+    assert finder.driver.cookies == [{'name': 'session', 'value': 'abc'}]
+    assert finder.driver.visited == ["https://www.beatport.com/library?page=7"]
+
+def test_restarts_are_bounded(monkeypatch):
+    monkeypatch.setattr(main, "SESSION_RESTART_DELAY", 0)
+    finder = CrashingFinder(FakeDriver(), relaunch_fails=True)
+    with pytest.raises(SessionLost):
+        finder.process_page(7)
+    assert finder.session_restarts == main.MAX_SESSION_RESTARTS
@@ -0,0 +1,81 @@
+"""
+Tests for batched download clicks
+"""
+from beatport_auto.main import CLICK_POPUP_SCRIPT, BeatportTrackFinder
+from beatport_auto.utils.click_executor import CLICK_BATCH_SCRIPT, ClickExecutor
+from beatport_auto.utils.download_events import DownloadEventListener
+from beatport_auto.utils.rate_limiter import PolitenessBudget
+from beatport_auto.utils.selector_manager import SelectorsManager
+from beatport_auto.utils.selector_stats import PopupPresenceStore, SelectorStatsStore
+
+class FakeDriver:
+    def __init__(self, results):
+        self.results = results
+        self.batches = []
+        self.timeouts = []
+        self.single_clicks = []
+
+    def set_script_timeout(self, seconds):
+        self.timeouts.append(seconds)
+
+    def execute_async_script(self, script, buttons, offsets, popup_ms):
+        assert script == CLICK_BATCH_SCRIPT
+        self.batches.append((buttons, offsets, popup_ms))
+        return self.results
+
+    def execute_script(self, script, *args):
+        if script.endswith("arguments[0].click();"):
+            self.single_clicks.append(args[0])
+        return script == CLICK_POPUP_SCRIPT
+
+    def get_log(self, log_type):
+        return []
+
+def test_clicks_are_spaced_by_the_download_budget():
+    driver = FakeDriver(["clicked", "clicked", "clicked"])
+    executor = ClickExecutor(driver, PolitenessBudget({"download_start": 1}, burst=1))
+    assert executor.run(["a", "b", "c"], popup_wait=0.2) == ["clicked", "clicked", "clicked"]
+
+    buttons, offsets, popup_ms = driver.batches[0]
+    assert buttons == ["a", "b", "c"]
+    assert [round(offset, -1) for offset in offsets] == [0, 1000, 2000]
+    assert popup_ms == 200
+    assert driver.timeouts == [30, 30]
+
+class BatchFinder(BeatportTrackFinder):
+    def __init__(self, driver):
+        self.driver = driver
+        self.layout_type = 'large'
+        self.popup_watch_armed = False
+        self.short_popup_waits = {}
+        self.popup_stats = PopupPresenceStore(None)
+        self.last_click_time = None
+        self.politeness = PolitenessBudget({"page_load": 1000, "click": 1000, "download_start": 1000})
+        self.selector_manager = SelectorsManager(stats_store=SelectorStatsStore(None))
+        self.download_events = DownloadEventListener(driver)
+        self.successes = []
+        self.failures = []
+
+    def handle_download_popup(self):
+        return False
+
+    def record_success(self, track, track_name, strategy, artist_name=None, track_id=None):
+        self.successes.append((track_id, strategy))
+
+    def record_failure(self, track_name, artist_name, reason, reason_code, track_id=None, page_url=None):
+        self.failures.append((track_id, reason_code))
+
+def test_unreached_rows_fall_back_to_single_clicks():
+    driver = FakeDriver(["clicked", "missing", "popup"])
+    finder = BatchFinder(driver)
+    pending = [(None, f"Track {n}", "Artist", str(n), f"button{n}") for n in range(1, 5)]
+    finder.flush_clicks(pending)
+
+    assert pending == []
+    assert finder.successes == [("1", "batch_click"), ("3", "batch_click"), ("4", "re_download_icon")]
+    assert finder.failures == [("2", "stale_element")]
+    assert driver.single_clicks == ["button4"]
+    # Expectations are left for exactly the rows whose clicks happened, in click order
+    assert [track_id for track_id, _ in finder.download_events._expected] == ["1", "3", "4"]
+    assert finder.popup_stats.stats["large"][:2] == [1, 1]
+    assert "popup_presence" not in finder.selector_manager.stats_store.stats
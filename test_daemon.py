@@ -0,0 +1,103 @@
+"""
+Tests for the sync daemon and its status endpoint
+"""
+import json
+import logging
+import urllib.request
+from types import SimpleNamespace
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from beatport_auto.daemon import SyncDaemon
+
+class FakeFinder:
+    def __init__(self):
+        self.driver = None
+        self.successful_downloads = 0
+        self.failed_downloads = []
+        self.sync_reached = False
+        self.cycles_started = 0
+
+    def start_new_cycle(self):
+        self.cycles_started += 1
+
+    def click_next_and_process(self):
+        self.successful_downloads += 3
+        self.sync_reached = True
+        logging.error("Could not click row 4")
+
+    def progress_snapshot(self):
+        return {"successful_downloads": self.successful_downloads}
+
+def test_next_delay_stays_within_jitter():
+    daemon = SyncDaemon(FakeFinder(), interval=100, jitter=0.2, status_port=None)
+    for _ in range(50):
+        assert 80 <= daemon.next_delay() <= 120
+
+def test_cycles_and_status_endpoint(monkeypatch):
+    finder = FakeFinder()
+    daemon = SyncDaemon(finder, interval=0, jitter=0, status_port=0)
+    monkeypatch.setattr(daemon, "ensure_browser", lambda: None)
+
+    # Stop after the second cycle
+    original_run_cycle = daemon.run_cycle
+    def run_cycle():
+        original_run_cycle()
+        if daemon.cycles == 2:
+            with urllib.request.urlopen(f"http://127.0.0.1:{daemon.server.server_address[1]}/status") as response:
+                daemon.seen_status = json.loads(response.read())
+            daemon.stop()
+    monkeypatch.setattr(daemon, "run_cycle", run_cycle)
+
+    daemon.run_forever()
+    assert finder.cycles_started == 2
+    assert daemon.state == "stopped"
+    status = daemon.seen_status
+    assert status["cycles"] == 2
+    assert status["last_cycle"]["downloads_added"] == 3
+    assert status["last_cycle"]["sync_completed"] is True
+    assert status["last_error"] == "Could not click row 4"
+    assert status["progress"] == {"successful_downloads": 6}
+
+class DeadDriver:
+    @property
+    def current_url(self):
+        raise WebDriverException("chrome not reachable")
+
+    def quit(self):
+        pass
+
+class RestartingFinder(FakeFinder):
+    def __init__(self, restarted_url):
+        super().__init__()
+        self.driver = DeadDriver()
+        self.restarted_url = restarted_url
+        self.restarts = []
+
+    def restart_browser(self, url, error):
+        self.restarts.append(error)
+        if self.restarted_url is None:
+            return False
+        self.driver = SimpleNamespace(current_url=self.restarted_url, quit=lambda: None)
+        return True
+
+    def save_session_cookies(self):
+        pass
+
+def test_dead_browser_is_restarted_with_the_saved_login():
+    finder = RestartingFinder("https://www.beatport.com/library?name=")
+    daemon = SyncDaemon(finder, status_port=None)
+    daemon.run_cycle()
+    assert len(finder.restarts) == 1
+    assert finder.successful_downloads == 3
+
+@pytest.mark.parametrize("restarted_url", [None, "https://www.beatport.com/account/login?next=/library"])
+def test_daemon_stops_when_login_cannot_be_restored(restarted_url, caplog):
+    finder = RestartingFinder(restarted_url)
+    daemon = SyncDaemon(finder, interval=0, jitter=0, status_port=None)
+    daemon.run_forever()
+    assert finder.cycles_started == 1
+    assert finder.successful_downloads == 0
+    assert daemon.state == "login_lost"
+    assert "stopping the daemon" in caplog.text
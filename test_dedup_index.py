@@ -0,0 +1,80 @@
+"""
+Tests for the local-library duplicate check
+"""
+import os
+import struct
+
+import pytest
+
+from beatport_auto.utils.dedup_index import MIN_AUDIO_BYTES, DedupIndex, normalize_artists, normalize_title, track_key
+from beatport_auto.utils.library_organizer import LibraryOrganizer
+
+def id3_tag(artist, title):
+    frames = b""
+    for frame_id, text in (("TPE1", artist), ("TIT2", title)):
+        body = b"\x03" + text.encode("utf-8")
+        frames += frame_id.encode() + struct.pack(">I", len(body)) + b"\x00\x00" + body
+    size = len(frames)
+    syncsafe = bytes([(size >> 21) & 0x7F, (size >> 14) & 0x7F, (size >> 7) & 0x7F, size & 0x7F])
+    return b"ID3\x03\x00\x00" + syncsafe + frames
+
+def test_normalization():
+    assert normalize_title("Switch (Original Mix)") == "switch"
+    assert normalize_title("Switch\nOriginal Mix") == "switch"
+    assert normalize_title("Switch (Extended Mix)") == "switch extended mix"
+    assert normalize_artists("Björk & Someone feat. Other") == normalize_artists("Other, Someone, Bjork")
+    assert track_key("", "Title") is None
+
+def test_contains():
+    index = DedupIndex()
+    index.add({"path": "/lib/a.mp3", "size": MIN_AUDIO_BYTES, "artist": "DJ One, MC Two", "title": "Tune (Original Mix)"})
+    index.add({"path": "/lib/12345678_other.mp3", "size": MIN_AUDIO_BYTES, "artist": None, "title": None})
+    assert index.contains("MC Two & DJ One", "Tune")
+    assert index.contains("DJ One, MC Two", "Tune (Original Mix)")
+    assert not index.contains("DJ One", "Tune (Extended Mix)")
+    assert index.contains("Anyone", "Anything", track_id="12345678")
+
+def test_ignores_truncated_files():
+    index = DedupIndex()
+    index.add({"path": "/lib/a.mp3", "size": 10, "artist": "Artist", "title": "Title"})
+    assert not index.contains("Artist", "Title")
+
+def test_from_library_with_extra_root(tmp_path, monkeypatch):
+    library = tmp_path / "downloads"
+    extra = tmp_path / "extra"
+    library.mkdir()
+    extra.mkdir()
+    padding = b"\x00" * MIN_AUDIO_BYTES
+    (library / "a.mp3").write_bytes(id3_tag("Artist", "Local") + padding)
+    (extra / "b.mp3").write_bytes(id3_tag("Artist", "Elsewhere") + padding)
+
+    index = DedupIndex.from_library(str(library), [str(extra)])
+    assert index.contains("Artist", "Local")
+    assert index.contains("Artist", "Elsewhere")
+
+    # Indexed roots are loaded from the index, not walked again
+    os.remove(library / "a.mp3")
+    monkeypatch.setattr(LibraryOrganizer, "scan", lambda self, root=None: pytest.fail(f"rescanned {root}"))
+    index = DedupIndex.from_library(str(library), [str(extra)])
+    assert index.contains("Artist", "Local")
+    assert index.contains("Artist", "Elsewhere")
+
+class DownloadsApi:
+    def fetch_page(self, page_type, page, per_page=100):
+        return [
+            {"track_id": "1", "name": "Have", "artist": "Artist", "status": "Available for Download"},
+            {"track_id": "2", "name": "Want", "artist": "Artist", "status": "Available for Download"},
+            {"track_id": "3", "name": "Done", "artist": "Artist", "status": "Already Downloaded"},
+        ]
+
+def test_downloads_page_skips_tracks_in_local_library(tmp_path):
+    from beatport_auto.main import BeatportTrackFinder
+    finder = BeatportTrackFinder(1, 1, True, str(tmp_path), True, check_local_library=True)
+    finder.api_client = DownloadsApi()
+    finder.dedup_index = DedupIndex()
+    finder.dedup_index.add({"path": "/lib/have.mp3", "size": MIN_AUDIO_BYTES, "artist": "Artist", "title": "Have"})
+
+    # Every round rereads the page; the duplicate is recorded the first time only
+    assert finder.find_pending_track_keys() == {"2"}
+    assert finder.find_pending_track_keys() == {"2"}
+    assert finder.duplicate_count == 1
@@ -0,0 +1,61 @@
+"""
+Tests for background diagnostics capture
+"""
+import gzip
+import json
+import os
+import threading
+
+from beatport_auto.utils import diagnostics
+from beatport_auto.utils.diagnostics import DiagnosticsStore, FailureRateTrigger, capture_page
+
+class FakeDriver:
+    current_url = "https://www.beatport.com/library?page=3"
+    page_source = "<html>" + "row " * 1000 + "</html>"
+
+    def get_screenshot_as_png(self):
+        return b"\x89PNG" + b"\x00" * 100
+
+def test_capture_is_written_compressed_in_the_background(tmp_path):
+    store = DiagnosticsStore(str(tmp_path))
+    assert capture_page(FakeDriver(), store, "failure_rate", {"page": 3})
+    store.close()
+
+    files = sorted(os.listdir(tmp_path))
+    assert [name.split("_failure_rate")[1] for name in files] == [".html.gz", ".json", ".png"]
+    base = os.path.join(tmp_path, files[0][:-len(".html.gz")])
+    with gzip.open(base + ".html.gz", "rt", encoding="utf-8") as f:
+        assert f.read() == FakeDriver.page_source
+    assert os.path.getsize(base + ".html.gz") < len(FakeDriver.page_source) / 10
+    with open(base + ".json") as f:
+        assert json.load(f) == {"page": 3, "reason": "failure_rate", "url": FakeDriver.current_url}
+
+def test_oldest_captures_are_rotated_out(tmp_path):
+    store = DiagnosticsStore(str(tmp_path), max_bytes=2500)
+    for n in range(5):
+        store.submit(f"capture{n}", b"x" * 1000, None, {})
+        store.close()
+    names = os.listdir(tmp_path)
+    assert sum(os.path.getsize(os.path.join(tmp_path, name)) for name in names) <= 2500
+    assert "capture4.png" in names and "capture0.png" not in names
+
+def test_busy_writer_drops_captures_instead_of_blocking(tmp_path, monkeypatch):
+    release = threading.Event()
+    store = DiagnosticsStore(str(tmp_path))
+    monkeypatch.setattr(store, "_write", lambda capture: release.wait(5))
+    results = [store.submit(f"c{n}", None, None, {}) for n in range(diagnostics.QUEUE_SIZE + 3)]
+    release.set()
+    store.close()
+    assert results.count(False) == store.dropped >= 2
+
+def test_trigger_fires_on_failure_rate_then_cools_down():
+    trigger = FailureRateTrigger(threshold=0.5, window=4, min_samples=4, cooldown=60)
+    for success in (True, False, True):
+        trigger.observe(success)
+    assert not trigger.due()
+    trigger.observe(False)
+    assert trigger.due()
+    trigger.fired()
+    for _ in range(4):
+        trigger.observe(False)
+    assert not trigger.due()
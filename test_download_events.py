@@ -0,0 +1,98 @@
+"""
+Tests for the CDP download event listener
+"""
+import json
+
+from beatport_auto.utils.download_events import DownloadEventListener
+
+class FakeDriver:
+    def __init__(self):
+        self.entries = []
+
+    def emit(self, method, **params):
+        self.entries.append({"message": json.dumps({"message": {"method": method, "params": params}})})
+
+    def get_log(self, log_type):
+        entries, self.entries = self.entries, []
+        return entries
+
+def test_ties_downloads_to_clicks_in_order():
+    driver = FakeDriver()
+    listener = DownloadEventListener(driver)
+    listener.expect("111")
+    listener.expect("222")
+    driver.emit("Page.downloadWillBegin", guid="a", url="https://x/a.mp3", suggestedFilename="a.mp3")
+    driver.emit("Page.downloadWillBegin", guid="b", url="https://x/b.mp3", suggestedFilename="b.mp3")
+    driver.emit("Network.requestWillBeSent", requestId="1")
+    events = listener.poll()
+    assert len(events) == 2
+    assert listener.downloads["a"]["track_id"] == "111"
+    assert listener.downloads["b"]["track_id"] == "222"
+    assert listener.started_track_ids() == {"111", "222"}
+
+def test_progress_and_completion():
+    driver = FakeDriver()
+    completed = []
+    listener = DownloadEventListener(driver, on_complete=completed.append)
+    listener.expect("111")
+    driver.emit("Page.downloadWillBegin", guid="a", url="https://x/a.mp3", suggestedFilename="a.mp3")
+    driver.emit("Page.downloadProgress", guid="a", receivedBytes=10, totalBytes=100, state="inProgress")
+    listener.poll()
+    assert listener.downloads["a"]["received_bytes"] == 10
+    assert len(listener.active()) == 1
+
+    driver.emit("Page.downloadProgress", guid="a", receivedBytes=100, totalBytes=100, state="completed")
+    assert listener.wait_until_idle(timeout=1, interval=0)
+    assert [d["track_id"] for d in completed] == ["111"]
+    assert completed[0]["total_bytes"] == 100
+
+def test_expired_click_is_not_matched():
+    driver = FakeDriver()
+    listener = DownloadEventListener(driver, expectation_ttl=-1)
+    listener.expect("111")
+    driver.emit("Page.downloadWillBegin", guid="a", url="https://x/a.mp3")
+    listener.poll()
+    assert listener.downloads["a"]["track_id"] is None
+
+def test_handed_off_download_is_not_active():
+    driver = FakeDriver()
+    completed = []
+    listener = DownloadEventListener(driver, on_begin=lambda d: d.update(handed_off=True), on_complete=completed.append)
+    driver.emit("Page.downloadWillBegin", guid="a", url="https://x/a.mp3")
+    driver.emit("Page.downloadProgress", guid="a", receivedBytes=5, totalBytes=5, state="completed")
+    listener.poll()
+    assert listener.active() == []
+    assert completed == []
+
+def test_wait_for_begin_times_out():
+    listener = DownloadEventListener(FakeDriver())
+    assert listener.wait_for_begin({"111"}, timeout=0, interval=0) == set()
+
+def test_reports_throttled_responses():
+    driver = FakeDriver()
+    throttled = []
+    listener = DownloadEventListener(driver, on_throttle=throttled.append)
+    page = "https://www.beatport.com/library?page=2"
+    driver.emit("Network.responseReceived", requestId="1", type="Document", response={"url": page, "status": 200})
+    driver.emit("Network.responseReceived", requestId="2", type="Document", response={"url": page, "status": 429})
+    driver.emit("Network.responseReceived", requestId="3", type="Fetch",
+                response={"url": "https://api.beatport.com/v4/my/library", "status": 429})
+    # Subresources and other sites don't count
+    driver.emit("Network.responseReceived", requestId="4", type="Image",
+                response={"url": "https://geo-media.beatport.com/image.jpg", "status": 429})
+    driver.emit("Network.responseReceived", requestId="5", type="XHR",
+                response={"url": "https://tracker.example.com/beatport.com", "status": 429})
+    listener.poll()
+    assert throttled == [page, "https://api.beatport.com/v4/my/library"]
+
+def test_downloads_are_matched_by_track_id_before_queue_order():
+    driver = FakeDriver()
+    listener = DownloadEventListener(driver)
+    listener.expect("111")  # A click that never starts a download
+    listener.expect("222")
+    driver.emit("Page.downloadWillBegin", guid="b", url="https://x/download/222?t=1", suggestedFilename="222_Track.mp3")
+    driver.emit("Page.downloadWillBegin", guid="c", url="https://x/download/9", suggestedFilename="2223_Other.mp3")
+    listener.poll()
+    assert listener.downloads["b"]["track_id"] == "222"
+    # Without its ID in the URL or filename, a download falls back to the oldest click
+    assert listener.downloads["c"]["track_id"] == "111"
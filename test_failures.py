@@ -0,0 +1,141 @@
+"""
+Tests for structured failure records and the replay queue
+"""
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+
+from beatport_auto.main import BeatportTrackFinder
+from beatport_auto.utils.failures import (
+    MAX_REASON_LENGTH, FailedDownloadsQueue, FailureLog, FailureReason, FailureRecord, classify_exception,
+    classify_status, compact_reason, page_key, replay_key
+)
+
+def test_classify_exception():
+    assert classify_exception(StaleElementReferenceException()) == FailureReason.STALE_ELEMENT
+    assert classify_exception(TimeoutException()) == FailureReason.POPUP_TIMEOUT
+    assert classify_exception(ValueError("boom")) == FailureReason.CLICK_ERROR
+
+def test_classify_status():
+    assert classify_status("Already Downloaded") == FailureReason.ALREADY_DOWNLOADED
+    assert classify_status("No Download Status Found") == FailureReason.STATUS_UNKNOWN
+
+def test_replayable_by_page(tmp_path):
+    queue = FailedDownloadsQueue(str(tmp_path / "failed_downloads.json"))
+    page_2 = "https://www.beatport.com/library?page=2"
+    queue.save([
+        {'name': 'A', 'artist': 'X', 'reason_code': FailureReason.NO_BUTTON, 'track_id': '1', 'page': 2, 'page_url': page_2},
+        {'name': 'B', 'artist': 'Y', 'reason_code': FailureReason.ALREADY_DOWNLOADED, 'track_id': '2', 'page': 2, 'page_url': page_2},
+        {'name': 'C', 'artist': 'Z', 'reason_code': FailureReason.STALE_ELEMENT, 'track_id': '3', 'page': 3, 'page_url': None},
+    ])
+
+    by_page = queue.replayable_by_page()
+    assert list(by_page) == [page_2]
+    assert [f['track_id'] for f in by_page[page_2]] == ['1']
+
+def test_missing_queue_is_empty(tmp_path):
+    assert FailedDownloadsQueue(str(tmp_path / "missing.json")).load() == []
+
+def test_compact_reason_cuts_tracebacks():
+    assert compact_reason("Track status: Already Downloaded") == "Track status: Already Downloaded"
+    traceback = "Message: stale element reference\nStacktrace:\n" + "#0 0x55d1 <unknown>\n" * 200
+    short = compact_reason(traceback)
+    assert short.startswith("Message: stale element reference [#")
+    assert "Stacktrace" not in short
+    # Identical errors hash the same, different ones don't
+    assert compact_reason(traceback) == short
+    assert compact_reason(traceback + "x") != short
+    assert len(compact_reason("x" * 1000)) <= MAX_REASON_LENGTH + 12
+
+def test_failure_record_is_compact():
+    url = "https://www.beatport.com/library?page=" + "7"
+    a = FailureRecord("A", "X", "boom", "no_" + "button", "1", 7, url)
+    b = FailureRecord("B", "Y", "boom", "no_" + "button", "2", 7, "https://www.beatport.com/library?page=" + "7")
+    assert not hasattr(a, "__dict__")
+    assert a.reason_code is b.reason_code
+    assert a.page_url is b.page_url
+    assert FailureRecord.from_dict(a.to_dict()).to_dict() == a.to_dict()
+
+def test_failure_log_spills_to_disk_and_counts(tmp_path):
+    log = FailureLog(str(tmp_path / "spool.jsonl"))
+    assert not log and list(log) == []
+    for i in range(3):
+        log.append(FailureRecord(f"T{i}", "X", "boom", FailureReason.NO_BUTTON, str(i), 2, "https://x/?page=2"))
+    log.append(FailureRecord("S", "Y", "status", FailureReason.ALREADY_DOWNLOADED, "9", 2, "https://x/?page=2"))
+    assert len(log) == 4
+    assert log.counts == {FailureReason.NO_BUTTON: 3, FailureReason.ALREADY_DOWNLOADED: 1}
+    assert [r.track_id for r in log] == ["0", "1", "2", "9"]
+
+    log.close()
+    queue = FailedDownloadsQueue(str(tmp_path / "failed_downloads.json"))
+    queue.save(log)
+    assert [f["track_id"] for f in queue.load()] == ["0", "1", "2", "9"]
+    assert list(queue.replayable_by_page()) == ["https://x/?page=2"]
+
+    # A new run with no failures doesn't read back the old spool
+    assert list(FailureLog(str(tmp_path / "spool.jsonl"))) == []
+
+def test_empty_queue_is_valid_json(tmp_path):
+    queue = FailedDownloadsQueue(str(tmp_path / "failed_downloads.json"))
+    queue.save([])
+    assert queue.load() == []
+
+def test_replay_keys_skip_rows_that_were_never_read():
+    assert replay_key({'name': 'A', 'artist': 'X', 'track_id': '7'}) == '7'
+    assert replay_key({'name': 'A', 'artist': 'X', 'track_id': None}) == 'A|X'
+    assert replay_key({'name': 'Unknown Track 3', 'artist': 'Unknown Artist', 'track_id': None}) is None
+    assert replay_key({'name': 'Track name not found', 'artist': 'X', 'track_id': None}) is None
+
+    queue = FailedDownloadsQueue(None)
+    by_page = queue.replayable_by_page([
+        {'name': 'Unknown Track 3', 'artist': 'Unknown Artist', 'reason_code': FailureReason.CLICK_ERROR,
+         'page_url': 'https://x/library?page=2'},
+    ])
+    assert by_page == {}
+
+def test_save_only_replaces_failures_of_visited_pages(tmp_path):
+    queue = FailedDownloadsQueue(str(tmp_path / "failed_downloads.json"))
+    page_2 = "https://www.beatport.com/library?page=2"
+    page_3 = "https://www.beatport.com/library?page=3&per_page=100"
+    queue.save([
+        {'name': 'A', 'artist': 'X', 'reason_code': FailureReason.NO_BUTTON, 'track_id': '1', 'page_url': page_2},
+        {'name': 'B', 'artist': 'Y', 'reason_code': FailureReason.NO_BUTTON, 'track_id': '2', 'page_url': page_3},
+        {'name': 'C', 'artist': 'Z', 'reason_code': FailureReason.NO_BUTTON, 'track_id': '3', 'page_url': None},
+    ])
+    assert page_key(page_3) == page_key("https://www.beatport.com/library/?per_page=50&page=3")
+
+    # A downloads-page run leaves the library failures queued
+    queue.save([], {page_key("https://www.beatport.com/library/downloads?page=1&per_page=100")})
+    assert [f['track_id'] for f in queue.load()] == ['1', '2']
+
+    # Visiting page 3 again replaces its failures with this run's
+    queue.save([FailureRecord('D', 'W', 'boom', FailureReason.NO_BUTTON, '4', 3, page_3)], {page_key(page_3)})
+    assert [f['track_id'] for f in queue.load()] == ['1', '4']
+
+class ReplayFinder(BeatportTrackFinder):
+    def __init__(self, download_location):
+        super().__init__(1, 1, False, download_location, True, replay_failures=True)
+        self.replayed = []
+
+    def open_page(self, url):
+        self.opened = url
+
+    def process_page(self, page_number, pending_keys=None):
+        self.replayed.append(('library', page_number, pending_keys))
+
+    def download_tracks_from_page(self, pending_keys=None):
+        self.replayed.append(('downloads', self.current_page, pending_keys))
+
+    def find_pending_track_keys(self):
+        return {'5'}
+
+def test_replay_routes_library_failures_through_the_row_checks(tmp_path):
+    finder = ReplayFinder(str(tmp_path))
+    finder.failures_queue.save([
+        {'name': 'A', 'artist': 'X', 'reason_code': FailureReason.NO_BUTTON, 'track_id': None, 'page': 2,
+         'page_url': "https://www.beatport.com/library?page=2"},
+        {'name': 'B', 'artist': 'Y', 'reason_code': FailureReason.NO_BUTTON, 'track_id': '5', 'page': 1,
+         'page_url': "https://www.beatport.com/library/downloads?page=1"},
+        {'name': 'C', 'artist': 'Z', 'reason_code': FailureReason.NO_BUTTON, 'track_id': '6', 'page': 1,
+         'page_url': "https://www.beatport.com/library/downloads?page=1"},
+    ])
+    finder.replay_failed_downloads()
+    assert finder.replayed == [('library', 2, {'A|X'}), ('downloads', 1, {'5'})]
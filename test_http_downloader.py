@@ -0,0 +1,88 @@
+"""
+Tests for the direct HTTP downloader against a local HTTP server with Range support
+"""
+import hashlib
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from beatport_auto.utils.http_downloader import DownloadJob, HttpDownloader
+
+PAYLOAD = os.urandom(300 * 1024)
+
+class RangeHandler(BaseHTTPRequestHandler):
+    requests_seen = []
+
+    def do_GET(self):
+        RangeHandler.requests_seen.append(self.headers.get("Range"))
+        start = 0
+        if self.headers.get("Range"):
+            start = int(self.headers["Range"].split("=")[1].rstrip("-"))
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(PAYLOAD) - 1}/{len(PAYLOAD)}")
+        else:
+            self.send_response(200)
+        body = PAYLOAD[start:]
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server_url():
+    RangeHandler.requests_seen = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/track.mp3"
+    server.shutdown()
+
+def test_download_with_checksum(tmp_path, server_url):
+    completed = []
+    downloader = HttpDownloader(str(tmp_path), max_workers=2, on_complete=lambda job, result: completed.append(result))
+    job = DownloadJob(server_url, "Artist - Title.mp3", sha256=hashlib.sha256(PAYLOAD).hexdigest(), track_id="7")
+    result = downloader.submit(job).result()
+    downloader.close()
+
+    assert result["ok"]
+    assert result["bytes"] == len(PAYLOAD)
+    with open(tmp_path / "Artist - Title.mp3", "rb") as f:
+        assert f.read() == PAYLOAD
+    assert not (tmp_path / "Artist - Title.mp3.7.part").exists()
+    assert completed == [result]
+
+def test_resumes_partial_download(tmp_path, server_url):
+    (tmp_path / "track.mp3.42.part").write_bytes(PAYLOAD[:1000])
+    downloader = HttpDownloader(str(tmp_path))
+    result = downloader.download(DownloadJob(server_url, "track.mp3", track_id="42"))
+
+    assert result["ok"]
+    assert RangeHandler.requests_seen == ["bytes=1000-"]
+    assert (tmp_path / "track.mp3").read_bytes() == PAYLOAD
+
+def test_checksum_mismatch_is_not_renamed(tmp_path, server_url):
+    downloader = HttpDownloader(str(tmp_path), max_retries=2)
+    result = downloader.download(DownloadJob(server_url, "track.mp3", sha256="0" * 64))
+
+    assert not result["ok"]
+    assert "checksum" in result["error"]
+    assert not (tmp_path / "track.mp3").exists()
+
+def test_unsafe_filenames_stay_in_download_dir(tmp_path, server_url):
+    downloader = HttpDownloader(str(tmp_path))
+    result = downloader.download(DownloadJob(server_url, "../../evil:name?.mp3"))
+    assert os.path.dirname(result["path"]) == str(tmp_path)
+
+def test_jobs_with_the_same_filename_use_their_own_partial_file(tmp_path, server_url):
+    # Another job's partial data under the same filename must not be resumed
+    (tmp_path / "track.mp3.1.part").write_bytes(b"x" * 1000)
+    downloader = HttpDownloader(str(tmp_path))
+    result = downloader.download(DownloadJob(server_url, "track.mp3", track_id="2"))
+
+    assert result["ok"]
+    assert RangeHandler.requests_seen == [None]
+    assert (tmp_path / "track.mp3").read_bytes() == PAYLOAD
+    assert (tmp_path / "track.mp3.1.part").exists()
@@ -0,0 +1,73 @@
+"""
+Tests for per-layout row profiles
+"""
+from beatport_auto.utils.layout_profile import REPROBE_AFTER, LayoutProfile, detect_layout
+from beatport_auto.utils.selector_manager import SelectorsManager
+from beatport_auto.utils.selector_stats import SelectorStatsStore
+
+class FakeRow:
+    """Answers find_elements for the selectors it contains and counts every lookup"""
+
+    def __init__(self, matches, attributes=None):
+        self.matches = matches
+        self.attributes = attributes or {}
+        self.lookups = []
+
+    def find_elements(self, strategy, selector):
+        self.lookups.append(selector)
+        return self.matches.get(selector, [])
+
+    def get_attribute(self, name):
+        return self.attributes.get(name)
+
+    def execute_script(self, script, elements):
+        # Stands in for the visibility filter
+        return [element for element in elements if not element.startswith("hidden")]
+
+def manager(tmp_path):
+    selectors = SelectorsManager(selectors_file=str(tmp_path / "selectors.json"), stats_store=SelectorStatsStore(None))
+    selectors.selectors["track_name"] = ["[data-testid='track-title']", ".TrackName"]
+    return selectors
+
+def test_detects_layout_from_the_first_row():
+    assert detect_layout(FakeRow({}, {"data-testid": "library-tracks-table-row"})) == "large"
+    assert detect_layout(FakeRow({}, {"data-testid": "tracks-list-item", "class": "List"})) == "small"
+    assert detect_layout(FakeRow({})) == "small"
+
+def test_selector_is_pinned_after_the_first_row(tmp_path):
+    selectors = manager(tmp_path)
+    profile = LayoutProfile("small", (800, 600))
+    rows = [FakeRow({".TrackName": [f"name {i}"]}) for i in range(3)]
+
+    assert profile.find(selectors, rows[0], "track_name") == ["name 0"]
+    assert rows[0].lookups == ["[data-testid='track-title']", ".TrackName"]
+    for i, row in enumerate(rows[1:], 1):
+        assert profile.find(selectors, row, "track_name") == [f"name {i}"]
+        assert row.lookups == [".TrackName"]
+
+def test_pinned_selector_is_dropped_after_repeated_misses(tmp_path):
+    selectors = manager(tmp_path)
+    profile = LayoutProfile("large")
+    profile.find(selectors, FakeRow({".TrackName": ["x"]}), "track_name")
+    for _ in range(REPROBE_AFTER):
+        assert profile.find(selectors, FakeRow({}), "track_name") == []
+    assert "track_name" not in profile.selectors
+
+    row = FakeRow({"[data-testid='track-title']": ["y"]})
+    assert profile.find(selectors, row, "track_name") == ["y"]
+    assert profile.selectors["track_name"] == "[data-testid='track-title']"
+
+def test_hidden_copies_are_dropped_from_row_matches(tmp_path):
+    selectors = manager(tmp_path)
+    profile = LayoutProfile("large")
+    assert profile.find(selectors, FakeRow({".TrackName": ["hidden name", "name"]}), "track_name") == ["name"]
+    assert profile.selectors["track_name"] == ".TrackName"
+    assert profile.find(selectors, FakeRow({".TrackName": ["hidden name", "name 2"]}), "track_name") == ["name 2"]
+
+def test_status_checks_follow_the_layout():
+    blue_path = ".//path[contains(@stroke, '#39') or contains(@fill, '#39')]"
+    row = FakeRow({blue_path: ["path"]})
+    assert LayoutProfile("small").status(row) == "Available for Download"
+    assert LayoutProfile("large").status(row) == "No Download Status Found"
+    finished = FakeRow({"svg[data-testid='icon-download-finished']": ["svg"]})
+    assert LayoutProfile("large").status(finished) == "Already Downloaded"
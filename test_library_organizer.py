@@ -0,0 +1,91 @@
+"""
+Tests for the post-download library organizer
+"""
+import os
+import struct
+
+import pytest
+
+from beatport_auto.utils import library_organizer
+from beatport_auto.utils.library_organizer import LibraryOrganizer, parse_id3, read_tags
+
+def id3_frame(frame_id, text):
+    body = b"\x03" + text.encode("utf-8")
+    return frame_id.encode() + struct.pack(">I", len(body)) + b"\x00\x00" + body
+
+def id3_tag(**frames):
+    body = b"".join(id3_frame(frame_id, text) for frame_id, text in frames.items())
+    size = len(body)
+    syncsafe = bytes([(size >> 21) & 0x7F, (size >> 14) & 0x7F, (size >> 7) & 0x7F, size & 0x7F])
+    return b"ID3\x03\x00\x00" + syncsafe + body
+
+def write_mp3(path, **frames):
+    with open(path, "wb") as f:
+        f.write(id3_tag(**frames) + b"\xff\xfb" + b"\x00" * 100)
+
+def write_wav(path, artist, title):
+    def chunk(chunk_id, data):
+        return chunk_id + struct.pack("<I", len(data)) + data + (b"\x00" if len(data) % 2 else b"")
+    info = b"INFO" + chunk(b"IART", artist.encode() + b"\x00") + chunk(b"INAM", title.encode() + b"\x00")
+    body = b"WAVE" + chunk(b"fmt ", b"\x00" * 16) + chunk(b"LIST", info) + chunk(b"data", b"\x00" * 8)
+    with open(path, "wb") as f:
+        f.write(b"RIFF" + struct.pack("<I", len(body)) + body)
+
+@pytest.fixture(autouse=True)
+def builtin_reader(monkeypatch):
+    # Exercise the built-in reader whether or not mutagen is installed
+    monkeypatch.setattr(library_organizer, "mutagen", None)
+
+def test_parse_id3_frames():
+    tags = parse_id3(id3_tag(TPE1="Artist", TIT2="Song", TPUB="Label", TCON="House"))
+    assert tags == {"artist": "Artist", "title": "Song", "label": "Label", "genre": "House"}
+
+def test_read_wav_info(tmp_path):
+    path = tmp_path / "track.wav"
+    write_wav(path, "Wav Artist", "Wav Song")
+    record = read_tags(str(path))
+    assert record["artist"] == "Wav Artist"
+    assert record["title"] == "Wav Song"
+    assert record["size"] == os.path.getsize(path)
+
+def test_filename_fallback(tmp_path):
+    path = tmp_path / "Some Artist - Some Title (Original Mix).mp3"
+    path.write_bytes(b"\x00" * 10)
+    record = read_tags(str(path))
+    assert record["artist"] == "Some Artist"
+    assert record["title"] == "Some Title (Original Mix)"
+
+def test_organize_into_scheme(tmp_path):
+    write_mp3(tmp_path / "a.mp3", TPE1="Artist", TIT2="Song", TPUB="Label/Records", TCON="Techno")
+    organizer = LibraryOrganizer(str(tmp_path), "{genre}/{label}")
+    moved = organizer.organize_new_files()
+    assert moved == [str(tmp_path / "Techno" / "Label_Records" / "a.mp3")]
+    assert organizer.index.count() == 1
+    organizer.close()
+
+def test_scan_is_incremental(tmp_path):
+    write_mp3(tmp_path / "a.mp3", TPE1="Artist", TIT2="Song")
+    os.makedirs(tmp_path / "sub")
+    write_mp3(tmp_path / "sub" / "b.mp3", TPE1="Other", TIT2="Tune")
+    organizer = LibraryOrganizer(str(tmp_path))
+    assert organizer.scan() == {"updated": 2, "removed": 0, "unchanged": 0}
+    assert organizer.scan() == {"updated": 0, "removed": 0, "unchanged": 2}
+    os.remove(tmp_path / "a.mp3")
+    assert organizer.scan() == {"updated": 0, "removed": 1, "unchanged": 1}
+    organizer.close()
+
+def test_rejects_unknown_scheme_field(tmp_path):
+    with pytest.raises(ValueError):
+        LibraryOrganizer(str(tmp_path), "{artist}/{year}")
+
+def test_organize_downloads_does_not_rescan_library(tmp_path, monkeypatch):
+    from types import SimpleNamespace
+    from beatport_auto.main import BeatportTrackFinder
+    write_mp3(tmp_path / "a.mp3", TPE1="Artist", TIT2="Song", TCON="Techno")
+    scans = []
+    monkeypatch.setattr(LibraryOrganizer, "scan", lambda self, root=None: scans.append(root))
+    BeatportTrackFinder.organize_downloads(SimpleNamespace(download_location=str(tmp_path), organize_scheme="{genre}"))
+    assert scans == []
+    organizer = LibraryOrganizer(str(tmp_path))
+    assert organizer.index.count() == 1
+    organizer.close()
@@ -0,0 +1,77 @@
+"""
+Tests for the multi-account runner
+"""
+import json
+import threading
+import time
+
+import pytest
+
+from beatport_auto.multi_account import AccountRunner, load_accounts
+
+class FakeFinder:
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def __init__(self, account, **kwargs):
+        self.account = account
+        self.kwargs = kwargs
+        self.driver = None
+
+    def initialize_browser(self):
+        with FakeFinder.lock:
+            FakeFinder.active += 1
+            FakeFinder.peak = max(FakeFinder.peak, FakeFinder.active)
+
+    def navigate_to_my_library(self):
+        return True
+
+    def click_next_and_process(self):
+        time.sleep(0.05)
+        if self.account["name"] == "broken":
+            raise RuntimeError("boom")
+        with FakeFinder.lock:
+            FakeFinder.active -= 1
+
+    def progress_snapshot(self):
+        return {"successful_downloads": 2, "failed_downloads": 0}
+
+def test_load_accounts_defaults(tmp_path):
+    path = tmp_path / "accounts.json"
+    path.write_text(json.dumps([{"name": "a", "download_location": str(tmp_path / "a")}]))
+    accounts = load_accounts(str(path))
+    assert accounts[0]["profile_dir"] == str(tmp_path / "profiles" / "a")
+    assert accounts[0]["sync"] is True
+
+@pytest.mark.parametrize("accounts", [
+    [],
+    [{"name": "a"}],
+    [{"name": "a", "download_location": "x"}] * 2,
+    [{"name": "a", "download_location": "x", "budget": "clicks=2"}]
+])
+def test_load_accounts_rejects_bad_files(tmp_path, accounts):
+    path = tmp_path / "accounts.json"
+    path.write_text(json.dumps(accounts))
+    with pytest.raises(ValueError):
+        load_accounts(str(path))
+
+def test_runs_accounts_under_browser_cap(tmp_path):
+    FakeFinder.active = FakeFinder.peak = 0
+    accounts = [
+        {"name": name, "download_location": str(tmp_path / name), "profile_dir": str(tmp_path / "p" / name)}
+        for name in ("a", "b", "c", "d")
+    ]
+    runner = AccountRunner(accounts, FakeFinder, max_browsers=2, bandwidth_limit=1000)
+    results = runner.run()
+    assert FakeFinder.peak == 2
+    assert all(result["ok"] for result in results)
+    assert sum(result["successful_downloads"] for result in results) == 8
+    # Each browser is throttled to an even share of the limit
+    assert runner.browser_throughput == 500
+
+def test_failed_account_is_reported(tmp_path):
+    accounts = [{"name": "broken", "download_location": str(tmp_path / "x"), "profile_dir": str(tmp_path / "p")}]
+    results = AccountRunner(accounts, FakeFinder).run()
+    assert results[0]["ok"] is False
+    assert results[0]["error"] == "boom"
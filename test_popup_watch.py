@@ -0,0 +1,126 @@
+"""
+Tests for the popup fast path and its per-layout learning
+"""
+import json
+
+from beatport_auto.main import (
+    ARM_POPUP_WATCH_SCRIPT, AWAIT_POPUP_SCRIPT, CLICK_POPUP_SCRIPT, POPUP_ABSENT_WAIT, POPUP_LEARN_CLICKS,
+    POPUP_PROBE_CLICKS, POPUP_WAIT, BeatportTrackFinder
+)
+from beatport_auto.utils.download_events import DownloadEventListener
+from beatport_auto.utils.rate_limiter import PolitenessBudget
+from beatport_auto.utils.selector_manager import SelectorsManager
+from beatport_auto.utils.selector_stats import PopupPresenceStore, SelectorStatsStore
+
+class FakeDriver:
+    """Shows a popup after the clicks listed in popup_clicks"""
+
+    def __init__(self, popup_clicks=()):
+        self.popup_clicks = set(popup_clicks)
+        self.clicks = 0
+        self.waits = []
+        self.popup_confirmed = 0
+
+    def execute_script(self, script, *args):
+        if script == ARM_POPUP_WATCH_SCRIPT:
+            return None
+        if script == CLICK_POPUP_SCRIPT:
+            self.popup_confirmed += 1
+            return True
+        if script.endswith("arguments[0].click();"):
+            self.clicks += 1
+
+    def execute_async_script(self, script, timeout_ms):
+        assert script == AWAIT_POPUP_SCRIPT
+        self.waits.append(timeout_ms)
+        return self.clicks in self.popup_clicks
+
+class PopupFinder(BeatportTrackFinder):
+    def __init__(self, driver):
+        self.driver = driver
+        self.download_events = None
+        self.layout_type = 'large'
+        self.popup_watch_armed = False
+        self.short_popup_waits = {}
+        self.popup_stats = PopupPresenceStore(None)
+        self.politeness = PolitenessBudget({"page_load": 1000, "click": 1000, "download_start": 1000})
+        self.selector_manager = SelectorsManager(stats_store=SelectorStatsStore(None))
+
+    def find_popup_with_selectors(self):
+        raise AssertionError("the slow path should not run")
+
+def test_popups_are_confirmed_and_absence_is_learned(monkeypatch):
+    driver = FakeDriver(popup_clicks={1})
+    finder = PopupFinder(driver)
+
+    finder.click_element(object())
+    assert finder.handle_download_popup()
+    assert driver.popup_confirmed == 1
+
+    for _ in range(POPUP_LEARN_CLICKS):
+        finder.click_element(object())
+        assert not finder.handle_download_popup()
+
+    # After enough clicks without a popup the layout only gets the short wait
+    finder.click_element(object())
+    finder.handle_download_popup()
+    assert driver.waits[1] == POPUP_WAIT * 1000
+    assert driver.waits[-1] == POPUP_ABSENT_WAIT * 1000
+    assert finder.popup_wait('small') == POPUP_WAIT
+
+def test_unarmed_watcher_falls_back_to_the_selectors():
+    finder = PopupFinder(FakeDriver())
+    calls = []
+    finder.find_popup_with_selectors = lambda: calls.append(True) or False
+    assert not finder.handle_download_popup()
+    assert calls == [True]
+
+class DownloadingDriver(FakeDriver):
+    """Chrome announces the download as soon as the row is clicked"""
+
+    def __init__(self):
+        super().__init__(popup_clicks={1})
+        self.entries = []
+
+    def execute_script(self, script, *args):
+        result = super().execute_script(script, *args)
+        if script.endswith("arguments[0].click();"):
+            self.entries.append({"message": json.dumps({"message": {
+                "method": "Page.downloadWillBegin",
+                "params": {"guid": "a", "url": "https://x/a", "suggestedFilename": "a.mp3"}
+            }})})
+        return result
+
+    def get_log(self, log_type):
+        entries, self.entries = self.entries, []
+        return entries
+
+def test_download_announced_during_the_popup_belongs_to_the_click():
+    driver = DownloadingDriver()
+    finder = PopupFinder(driver)
+    finder.download_events = DownloadEventListener(driver)
+    finder.click_element(object(), "42")
+    # Confirming the popup paces, and pacing drains the log before record_success runs
+    assert finder.handle_download_popup()
+    assert finder.download_events.downloads["a"]["track_id"] == "42"
+
+class SlowPopupDriver(FakeDriver):
+    """Every click opens a popup that takes longer than the short wait to render"""
+
+    def execute_async_script(self, script, timeout_ms):
+        self.waits.append(timeout_ms)
+        return timeout_ms >= POPUP_WAIT * 1000
+
+def test_learned_absence_is_probed_with_the_full_wait():
+    driver = SlowPopupDriver()
+    finder = PopupFinder(driver)
+    for _ in range(POPUP_LEARN_CLICKS):
+        finder.record_popup_presence('large', False, POPUP_WAIT)
+
+    for _ in range(POPUP_PROBE_CLICKS + 1):
+        finder.click_element(object())
+        finder.handle_download_popup()
+    # The slow popup is missed by the short waits, then seen by the probe, which relearns it
+    assert driver.waits == [POPUP_ABSENT_WAIT * 1000] * POPUP_PROBE_CLICKS + [POPUP_WAIT * 1000]
+    assert driver.popup_confirmed == 1
+    assert finder.popup_wait('large') == POPUP_WAIT
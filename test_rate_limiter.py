@@ -0,0 +1,69 @@
+"""
+Tests for the per-phase politeness budget
+"""
+import time
+
+import pytest
+
+from beatport_auto.utils.rate_limiter import DEFAULT_BUDGETS, PolitenessBudget, TokenBucket, parse_budgets
+
+def test_parse_budgets():
+    assert parse_budgets("") == {}
+    assert parse_budgets("page_load=0.25, click=3") == {"page_load": 0.25, "click": 3.0}
+
+@pytest.mark.parametrize("text", ["clicks=2", "click=fast", "click=0", "download_start=-1"])
+def test_parse_budgets_rejects_bad_input(text):
+    with pytest.raises(ValueError):
+        parse_budgets(text)
+
+def test_reserve_returns_the_wait_instead_of_sleeping():
+    bucket = TokenBucket(rate=10, capacity=1)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+
+def test_token_bucket_paces_consumers():
+    bucket = TokenBucket(rate=1000, capacity=100)
+    started = time.monotonic()
+    for _ in range(3):
+        bucket.consume(100)
+    # 100 tokens were available up front, the other 200 take 0.2s to accrue
+    assert 0.15 <= time.monotonic() - started < 0.5
+    assert not bucket.try_consume(100)
+
+def test_budget_allows_a_burst_then_paces():
+    budget = PolitenessBudget({"click": 1}, burst=2)
+    assert budget.reserve("click") == 0
+    assert budget.reserve("click") == 0
+    assert budget.reserve("click") == pytest.approx(1, abs=0.05)
+    assert budget.rates["page_load"] == DEFAULT_BUDGETS["page_load"]
+
+def test_throttling_slows_every_phase_and_recovers():
+    budget = PolitenessBudget({"click": 1}, burst=1, max_slowdown=4, recovery=0.5)
+    budget.reserve("click")
+    budget.throttled("HTTP 429")
+    assert budget.slowdown == 2
+    # Each click now costs two tokens
+    assert budget.reserve("click") == pytest.approx(2, abs=0.05)
+
+    budget.throttled("empty track list")
+    budget.throttled("empty track list")
+    assert budget.slowdown == 4
+    assert budget.stats()["throttle_signals"] == {"HTTP 429": 1, "empty track list": 2}
+
+    budget.healthy()
+    assert budget.slowdown == 2
+    budget.healthy()
+    budget.healthy()
+    assert budget.slowdown == 1
+
+def test_empty_pages_past_the_last_library_page_are_not_throttling(tmp_path):
+    from beatport_auto.main import BeatportTrackFinder
+    finder = BeatportTrackFinder(1, 4, False, str(tmp_path), True)
+    url = "https://www.beatport.com/library?page={}&per_page=100"
+    finder.report_page_health(0, page_number=2, page_url=url.format(2))
+    assert finder.politeness.stats()["throttle_signals"] == {"empty track list": 1}
+
+    finder.report_page_health(37, page_number=3, page_url=url.format(3))
+    finder.report_page_health(0, page_number=4, page_url=url.format(4))
+    assert finder.last_library_page == 3
+    assert finder.politeness.stats()["throttle_signals"] == {"empty track list": 1}
@@ -0,0 +1,119 @@
+"""
+Tests for the downloads-page retry scheduler
+"""
+from types import SimpleNamespace
+
+from beatport_auto.utils.retry_scheduler import PendingRetryScheduler
+
+def test_stops_when_nothing_pending():
+    scheduler = PendingRetryScheduler()
+    scheduler.update(set())
+    assert not scheduler.should_continue()
+
+def test_only_revisits_pending_rows():
+    scheduler = PendingRetryScheduler()
+    scheduler.update({"1", "2", "3"})
+    # A row that was not pending before is not picked up
+    pending = scheduler.update({"2", "4"})
+    assert pending == {"2"}
+    assert scheduler.completed == {"1", "3"}
+
+def test_backoff_resets_on_completions():
+    scheduler = PendingRetryScheduler(base_delay=1.0, max_delay=3.0)
+    scheduler.update({"1", "2"})
+    scheduler.update({"1", "2"})
+    assert scheduler.next_delay() == 2.0
+    scheduler.update({"1", "2"})
+    assert scheduler.next_delay() == 3.0
+    scheduler.update({"2"})
+    assert scheduler.next_delay() == 1.0
+    scheduler.update(set())
+    assert not scheduler.should_continue()
+
+def test_round_budget():
+    scheduler = PendingRetryScheduler(max_rounds=2)
+    scheduler.update({"1"})
+    scheduler.update({"1"})
+    assert scheduler.should_continue()
+    scheduler.update({"1"})
+    assert not scheduler.should_continue()
+
+class PendingEvents:
+    def __init__(self):
+        self.waited_on = []
+
+    def wait_for_begin(self, track_ids, timeout):
+        self.waited_on.append(set(track_ids))
+        return set(track_ids)
+
+class DownloadsPageFinder:
+    """Downloads page with one row that has a track ID and one that only has a name and artist"""
+    def __init__(self):
+        self.driver = SimpleNamespace(get=lambda url: None, refresh=lambda: None)
+        self.download_events = PendingEvents()
+        self.rechecks = 0
+
+    def pace(self, phase):
+        pass
+
+    def find_pending_track_keys(self):
+        self.rechecks += 1
+        return {"111", "Tune|Artist"} if self.rechecks == 1 else {"Tune|Artist"}
+
+    def download_tracks_from_page(self, pending_keys):
+        return True
+
+    def wait_for_browser_downloads(self):
+        pass
+
+def test_downloads_page_only_waits_on_track_ids():
+    from beatport_auto.main import BeatportTrackFinder
+    finder = DownloadsPageFinder()
+    BeatportTrackFinder.check_downloads_page(finder)
+    # The name|artist row can't be tied to a download, so it is only ever rechecked on the page
+    assert finder.download_events.waited_on == [{"111"}]
+    assert finder.rechecks == 6
+
+class PendingRowsFinder:
+    """One pending downloads-page row whose button is found by the layout profile"""
+    def __init__(self):
+        self.wait = SimpleNamespace(until=lambda condition: True)
+        self.driver = SimpleNamespace(current_url="https://www.beatport.com/library/downloads?page=1")
+        self.successes = []
+
+    def find_track_containers(self):
+        return ["row"], "large"
+
+    def mark_page_visited(self, page_url):
+        pass
+
+    def extract_track_id(self, track):
+        return None
+
+    def extract_track_name(self, track, layout_type):
+        return "Tune"
+
+    def extract_artist_name(self, track, layout_type):
+        return "Artist"
+
+    def find_in_row(self, track, selector_type, layout_type):
+        return [SimpleNamespace(tag_name="button")]
+
+    def click_element(self, element, track_id=None):
+        pass
+
+    def handle_download_popup(self):
+        pass
+
+    def record_success(self, track, track_name, strategy, artist_name=None, track_id=None):
+        self.successes.append((track_name, artist_name, strategy))
+
+    def capture_diagnostics(self, reason):
+        pass
+
+def test_pending_rows_are_reported_with_their_artist():
+    from beatport_auto.main import BeatportTrackFinder
+    finder = PendingRowsFinder()
+    finder.download_track_large_layout = lambda *row: BeatportTrackFinder.download_track_large_layout(finder, *row)
+    assert BeatportTrackFinder.download_tracks_from_page(finder, pending_keys={"Tune|Artist"})
+    assert finder.successes == [("Tune", "Artist", "adaptive_selector")]
@@ -0,0 +1,33 @@
+"""
+Tests for the streaming JSON-lines/CSV run report
+"""
+import csv
+import json
+
+from beatport_auto.utils.run_report import REPORT_FIELDS, RunReportWriter
+
+def test_records_are_streamed_to_both_files(tmp_path):
+    report = RunReportWriter(str(tmp_path), run_id="test")
+    report.write({'track_id': '1', 'name': 'Switch', 'status': 'clicked', 'strategy': 'xpath', 'click_time': 1.5})
+
+    # Records are on disk before the report is closed
+    with open(report.jsonl_path) as f:
+        assert json.loads(f.readline())['strategy'] == 'xpath'
+
+    report.write({'track_id': '1', 'status': 'completed', 'bytes': 1024})
+    report.close()
+
+    with open(report.jsonl_path) as f:
+        records = [json.loads(line) for line in f]
+    assert [r['status'] for r in records] == ['clicked', 'completed']
+    assert list(records[0]) == REPORT_FIELDS
+
+    with open(report.csv_path, newline='') as f:
+        rows = list(csv.DictReader(f))
+    assert rows[1]['bytes'] == '1024'
+    assert rows[1]['strategy'] == ''
+
+def test_nothing_written_without_records(tmp_path):
+    report = RunReportWriter(str(tmp_path), run_id="empty")
+    report.close()
+    assert not list(tmp_path.iterdir())
@@ -0,0 +1,115 @@
+"""
+Tests for the unified SelectorsManager engine using a fake driver
+"""
+import json
+
+from selenium.common.exceptions import InvalidSelectorException, StaleElementReferenceException
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.common.by import By
+
+from beatport_auto.utils.selector_manager import SelectorsManager, selector_strategy
+from beatport_auto.utils.selector_stats import SelectorStatsStore
+
+class FakeDriver:
+    """Answers find_elements from a {(by, selector): elements} table"""
+    def __init__(self, results):
+        self.results = results
+        self.calls = []
+
+    def find_elements(self, by, selector):
+        self.calls.append((by, selector))
+        if selector.startswith("a[contains("):
+            raise InvalidSelectorException("invalid")
+        return self.results.get((by, selector), [])
+
+    def execute_script(self, script, elements):
+        return [e for e in elements if e != "hidden"]
+
+def make_manager(tmp_path, selectors):
+    path = tmp_path / "selectors.json"
+    path.write_text(json.dumps(selectors))
+    return SelectorsManager(str(path), stats_store=SelectorStatsStore(None))
+
+def test_selector_strategy():
+    assert selector_strategy("//button") == By.XPATH
+    assert selector_strategy(".//button[.//svg]") == By.XPATH
+    assert selector_strategy("svg path[stroke='#39C0DE']") == By.CSS_SELECTOR
+
+def test_css_and_xpath_without_fallback_calls(tmp_path):
+    manager = make_manager(tmp_path, {"next_button": ["a.missing", "//a[@rel='next']"]})
+    driver = FakeDriver({(By.XPATH, "//a[@rel='next']"): ["next"]})
+
+    assert manager.find_element_with_learning(driver, "next_button", multiple=False) == "next"
+    # Each selector is tried exactly once, with the strategy picked from its syntax
+    assert driver.calls == [(By.CSS_SELECTOR, "a.missing"), (By.XPATH, "//a[@rel='next']")]
+    # The winner is ranked first for the next lookup
+    assert manager.selectors["next_button"][0] == "//a[@rel='next']"
+
+def test_invalid_selectors_are_skipped_after_first_failure(tmp_path):
+    manager = make_manager(tmp_path, {"next_button": ["a[contains(@class, 'Next')]", "a.next"]})
+    driver = FakeDriver({(By.CSS_SELECTOR, "a.next"): ["next"]})
+
+    manager.find_element_with_learning(driver, "next_button")
+    manager.find_element_with_learning(driver, "next_button")
+    assert driver.calls.count((By.CSS_SELECTOR, "a[contains(@class, 'Next')]")) == 1
+
+def test_visibility_filter(tmp_path):
+    manager = make_manager(tmp_path, {"track_containers": ["div.row"]})
+    driver = FakeDriver({(By.CSS_SELECTOR, "div.row"): ["hidden", "row"]})
+
+    assert manager.find_element_with_learning(driver, "track_containers") == ["row"]
+    assert manager.find_element_with_learning(driver, "track_containers", visible_only=False) == ["hidden", "row"]
+
+def test_stale_matches_are_a_miss_for_that_poll(tmp_path):
+    manager = make_manager(tmp_path, {"track_containers": ["div.row"]})
+    driver = FakeDriver({(By.CSS_SELECTOR, "div.row"): ["row"]})
+    filtered = driver.execute_script
+    polls = []
+
+    def re_rendered(script, elements):
+        polls.append(elements)
+        if len(polls) == 1:
+            raise StaleElementReferenceException("stale")
+        return filtered(script, elements)
+    driver.execute_script = re_rendered
+
+    wait = WebDriverWait(driver, 1, poll_frequency=0.01)
+    assert manager.find_element_with_learning(driver, "track_containers", wait=wait) == ["row"]
+    assert len(polls) == 2
+
+def test_single_context_lookups_skip_visibility_filter(tmp_path):
+    manager = make_manager(tmp_path, {"download_button": ["button.download"]})
+    row = FakeDriver({(By.CSS_SELECTOR, "button.download"): ["hidden"]})
+    # Multiple-element lookups inside a row are still filtered
+    assert manager.find_element_with_learning(row, "download_button", context_element=row) == []
+
+    def fail(*args):
+        raise AssertionError("visibility script should not run for a single element")
+    row.execute_script = fail
+
+    assert manager.find_element_with_learning(row, "download_button", context_element=row, multiple=False) == "hidden"
+
+def test_health_check_keeps_default_selectors(tmp_path):
+    manager = make_manager(tmp_path, {"track_containers": [
+        "[data-testid='library-tracks-table-row']", "[data-testid='tracks-list-item']", "div.learned"
+    ]})
+    manager.stats_store.prune_after = 2
+    driver = FakeDriver({})
+    for _ in range(2):
+        manager.find_element_with_learning(driver, "track_containers")
+    manager.rank_selectors(prune=True)
+    assert sorted(manager.selectors["track_containers"]) == [
+        "[data-testid='library-tracks-table-row']", "[data-testid='tracks-list-item']"
+    ]
+
+def test_health_check_times_every_selector(tmp_path):
+    types = ["track_containers", "track_name", "artist_name", "download_button"]
+    manager = make_manager(tmp_path, {selector_type: [f"{selector_type}.first", f"{selector_type}.second"]
+                                      for selector_type in types})
+    driver = FakeDriver({(By.CSS_SELECTOR, f"{selector_type}.{which}"): ["found"]
+                         for selector_type in types for which in ("first", "second")})
+
+    assert manager.verify_selectors_health(driver, None)
+    # Selectors behind the winner are timed too, so each one has a real cost to rank by
+    for selector_type in types:
+        assert [row["hits"] for row in manager.stats_store.summary(selector_type)] == [1, 1]
@@ -0,0 +1,93 @@
+"""
+Tests for persisted selector statistics and ranking
+"""
+import os
+import threading
+
+from beatport_auto.utils.selector_stats import PopupPresenceStore, SelectorStatsStore
+
+def test_stats_persist_across_runs(tmp_path):
+    path = str(tmp_path / "selector_stats.json")
+    store = SelectorStatsStore(path)
+    store.record("track_name", "a", True, 4.0)
+    store.record("track_name", "a", False, 2.0)
+    store.save()
+
+    reloaded = SelectorStatsStore(path)
+    assert reloaded.summary("track_name") == [
+        {"selector": "a", "hits": 1, "misses": 1, "success_rate": 0.5, "cost_ms": 3.0, "expected_cost_ms": 6.0}
+    ]
+
+def test_rank_by_expected_cost(tmp_path):
+    store = SelectorStatsStore(str(tmp_path / "stats.json"))
+    for n in range(10):
+        store.record("download_button", "slow", True, 40.0)
+        # Misses 2 of 10 lookups but costs an eighth as much
+        store.record("download_button", "cheap", n >= 2, 5.0)
+    for _ in range(100):
+        store.record("download_button", "broken", False, 1.0)
+
+    assert store.success_rate("download_button", "slow") > store.success_rate("download_button", "cheap")
+    ranked = store.rank("download_button", ["broken", "slow", "cheap", "untried"])
+    assert ranked == ["cheap", "untried", "slow", "broken"]
+
+def test_popup_presence_persists_apart_from_selectors(tmp_path):
+    path = str(tmp_path / "popup_stats.json")
+    store = PopupPresenceStore(path)
+    for seen in (True, False, False):
+        store.record("large", seen)
+    store.save()
+
+    reloaded = PopupPresenceStore(path)
+    assert reloaded.absent_since_seen("large") == 2
+    assert reloaded.absent_since_seen("small") == 0
+    reloaded.record("large", True)
+    assert reloaded.absent_since_seen("large") == 0
+
+def test_prune_stale_selectors(tmp_path):
+    store = SelectorStatsStore(str(tmp_path / "stats.json"), prune_after=3)
+    for _ in range(3):
+        store.record("next_button", "gone", False, 1.0)
+    store.record("next_button", "works", True, 1.0)
+
+    assert store.rank("next_button", ["gone", "works"], prune=True) == ["works"]
+    # The last selector of a type is never pruned
+    for _ in range(3):
+        store.record("pagination", "only", False, 1.0)
+    assert store.rank("pagination", ["only"], prune=True) == ["only"]
+
+def test_row_misses_and_defaults_are_never_pruned(tmp_path):
+    store = SelectorStatsStore(str(tmp_path / "stats.json"), prune_after=3)
+    for _ in range(5):
+        # Already downloaded rows have no download button for any selector
+        store.record("download_button", "fallback", False, 1.0, page_level=False)
+        store.record("download_button", "default", False, 1.0)
+        store.record("download_button", "learned", False, 1.0)
+    store.record("download_button", "works", True, 1.0)
+
+    ranked = store.rank("download_button", ["works", "fallback", "default", "learned"], prune=True,
+                        protected=["default"])
+    assert "learned" not in ranked
+    assert set(ranked) == {"works", "fallback", "default"}
+
+def test_concurrent_saves_never_leave_a_torn_file(tmp_path):
+    path = str(tmp_path / "stats.json")
+    stores = [SelectorStatsStore(path) for _ in range(4)]
+    for n, store in enumerate(stores):
+        for i in range(200):
+            store.record("track_name", f"selector-{n}-{i}", True, 1.0)
+    errors = []
+
+    def save_and_reload(store):
+        for _ in range(20):
+            store.save()
+            if SelectorStatsStore(path).stats == {}:
+                errors.append("torn read")
+
+    threads = [threading.Thread(target=save_and_reload, args=(store,)) for store in stores]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert os.listdir(tmp_path) == ["stats.json"]
@@ -0,0 +1,59 @@
+"""
+Tests for the incremental sync high-water mark
+"""
+from beatport_auto.main import API_PAGE_SIZE, BeatportTrackFinder
+from beatport_auto.utils.sync_state import SyncState
+
+def test_first_sync_has_no_anchor(tmp_path):
+    state = SyncState(str(tmp_path / "sync_state.json"))
+    assert not state.has_anchor
+    assert not state.is_synced("1")
+
+def test_anchor_moves_to_newest_rows(tmp_path):
+    path = str(tmp_path / "sync_state.json")
+    state = SyncState(path, anchor_count=2)
+    for track_id in ["30", "29", "28"]:
+        state.observe(track_id)
+    state.save()
+
+    state = SyncState(path, anchor_count=2)
+    assert state.is_synced("30") and state.is_synced("29")
+    assert not state.is_synced("28")
+
+def test_save_without_rows_keeps_anchor(tmp_path):
+    path = str(tmp_path / "sync_state.json")
+    state = SyncState(path)
+    state.observe("5")
+    state.save()
+    SyncState(path).save()
+    assert SyncState(path).is_synced("5")
+
+class FakeApiClient:
+    def __init__(self, pages):
+        self.pages = pages
+        self.requested = []
+
+    def fetch_page(self, source, page, per_page=100):
+        self.requested.append(page)
+        return self.pages.get(page, [])
+
+def make_records(ids):
+    return [{"track_id": str(i), "name": f"T{i}", "artist": "A", "status": "Available for Download"} for i in ids]
+
+def test_api_sync_stops_at_anchor(tmp_path):
+    state = SyncState(str(tmp_path / "sync_state.json"))
+    state.observe("150")
+    state.save()
+
+    finder = BeatportTrackFinder(1, None, False, str(tmp_path), True, sync_mode=True)
+    finder.api_client = FakeApiClient({
+        1: make_records(range(300, 300 - API_PAGE_SIZE, -1)),
+        2: make_records(range(200, 200 - API_PAGE_SIZE, -1)),
+        3: make_records(range(100, 100 - API_PAGE_SIZE, -1)),
+    })
+    pages = finder.list_unsynced_api_pages()
+    assert finder.api_client.requested == [1, 2]
+    assert [r["track_id"] for r in pages[2]][-1] == "151"
+    assert finder.sync_reached
+    finder.finish_sync()
+    assert SyncState(str(tmp_path / "sync_state.json")).is_synced("300")
@@ -0,0 +1,120 @@
+"""
+Tests for the tab-pool scheduler
+"""
+from beatport_auto import tab_pool
+from beatport_auto.tab_pool import (
+    CLICK_ROW_SCRIPT, NAVIGATE_SCRIPT, POPUP_CLICK_SCRIPT, ROW_SNAPSHOT_SCRIPT, TabPoolTrackFinder
+)
+from beatport_auto.utils.rate_limiter import PolitenessBudget
+
+def row(index, track_id, status="Available for Download"):
+    return {"index": index, "track_id": track_id, "name": f"Track {track_id}", "artist": "Artist", "status": status}
+
+class FakeSwitchTo:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def new_window(self, kind):
+        handle = f"tab{len(self.driver.tabs)}"
+        self.driver.tabs[handle] = {"page": None, "polls": 0, "popup_polls": 0}
+        self.driver.current_window_handle = handle
+
+    def window(self, handle):
+        self.driver.current_window_handle = handle
+
+class FakeDriver:
+    """Pages take a few polls to render; each click's popup shows up one poll later"""
+
+    def __init__(self, pages, render_polls):
+        self.pages = pages
+        self.render_polls = render_polls
+        self.tabs = {"tab0": {"page": None, "polls": 0, "popup_polls": 0}}
+        self.current_window_handle = "tab0"
+        self.switch_to = FakeSwitchTo(self)
+        self.log = []
+
+    def close(self):
+        del self.tabs[self.current_window_handle]
+
+    def execute_script(self, script, *args):
+        tab = self.tabs[self.current_window_handle]
+        if script == NAVIGATE_SCRIPT:
+            tab["page"] = int(args[0].split("page=")[1].split("&")[0])
+            tab["polls"] = 0
+        elif script == ROW_SNAPSHOT_SCRIPT:
+            tab["polls"] += 1
+            if tab["polls"] < self.render_polls[tab["page"]]:
+                return None
+            return self.pages[tab["page"]]
+        elif script == CLICK_ROW_SCRIPT:
+            self.log.append(("click", tab["page"], args[1]))
+            tab["popup_polls"] = 0
+            return True
+        elif script == POPUP_CLICK_SCRIPT:
+            tab["popup_polls"] += 1
+            return tab["popup_polls"] > 1
+
+class RecordingFinder(TabPoolTrackFinder):
+    def __init__(self, driver, tabs):
+        self.driver = driver
+        self.tabs = tabs
+        self.track_filter = None
+        self.dedup_index = None
+        self.visited_pages = set()
+        self.screened_rows = {}
+        self.last_library_page = None
+        self.download_events = None
+        self.politeness = PolitenessBudget({"page_load": 1000, "click": 1000, "download_start": 1000})
+        self.successes = []
+        self.failures = []
+
+    def container_selectors(self):
+        return ["row"]
+
+    def is_in_local_library(self, track_name, artist_name, track_id=None):
+        return False
+
+    def record_success(self, track, track_name, strategy, artist_name=None, track_id=None):
+        self.successes.append((self.current_page, track_id))
+
+    def record_failure(self, track_name, artist_name, reason, reason_code, track_id=None, page_url=None):
+        self.failures.append((self.current_page, track_id, reason_code))
+
+def test_pages_are_interleaved_across_tabs(monkeypatch):
+    monkeypatch.setattr(tab_pool, "IDLE_PASS_SLEEP", 0)
+    pages = {
+        1: [row(0, "11"), row(1, "12", status="Already Downloaded")],
+        2: [row(0, "21"), row(1, "22")],
+        3: [row(0, "31")],
+    }
+    driver = FakeDriver(pages, render_polls={1: 5, 2: 1, 3: 1})
+    finder = RecordingFinder(driver, tabs=2)
+    finder.process_pages_in_tabs([1, 2, 3])
+
+    assert sorted(finder.successes) == [(1, "11"), (2, "21"), (2, "22"), (3, "31")]
+    assert finder.failures == [(1, "12", "already_downloaded")]
+    # Page 2 is clicked while page 1 is still rendering in the other tab
+    assert driver.log[0] == ("click", 2, 0)
+    # Extra tabs are closed again
+    assert list(driver.tabs) == ["tab0"]
+    assert driver.current_window_handle == "tab0"
+
+class CrashingPopupDriver(FakeDriver):
+    def execute_script(self, script, *args):
+        if script == POPUP_CLICK_SCRIPT and self.tabs[self.current_window_handle]["page"] == 1:
+            raise RuntimeError("tab crashed")
+        return super().execute_script(script, *args)
+
+def test_failed_tab_records_its_unfinished_rows(monkeypatch):
+    monkeypatch.setattr(tab_pool, "IDLE_PASS_SLEEP", 0)
+    pages = {1: [row(0, "11"), row(1, "12"), row(2, "13")], 2: [row(0, "21")]}
+    finder = RecordingFinder(CrashingPopupDriver(pages, render_polls={1: 1, 2: 1}), tabs=2)
+    finder.process_pages_in_tabs([1, 2])
+
+    assert finder.successes == [(2, "21")]
+    # The row waiting on its popup and the rows after it are left for a replay
+    assert finder.failures == [(1, "11", "click_error"), (1, "12", "click_error"), (1, "13", "click_error")]
+
+def test_tab_count_is_a_constructor_argument(tmp_path):
+    assert TabPoolTrackFinder(1, 2, False, str(tmp_path), True).tabs == 3
+    assert TabPoolTrackFinder(1, 2, False, str(tmp_path), True, tabs=0).tabs == 1
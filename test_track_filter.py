@@ -0,0 +1,76 @@
+"""
+Tests for the track filter expression language
+"""
+import pytest
+
+from beatport_auto.utils.track_filter import TrackFilter
+
+ROW = {
+    "name": "Switch Funk Dub",
+    "artist": "Jansons, Dope Earth Alien",
+    "label": "Circus Recordings",
+    "genre": "House",
+    "bpm": "126 BPM",
+    "key": "C Major",
+    "date": "2019-03-22",
+}
+
+def test_empty_filter_matches_everything():
+    track_filter = TrackFilter.parse("")
+    assert track_filter.matches(ROW)
+    assert not track_filter.needs_details
+
+@pytest.mark.parametrize("expression, expected", [
+    ("artist:^jansons", True),
+    ("artist:^Dope", False),
+    ("title:'funk dub$'", True),
+    ("genre:techno,house", True),
+    ("label:'Circus Recordings'", True),
+    ("label:Circus", False),
+    ("bpm:120-128", True),
+    ("bpm:>=127", False),
+    ("key:'A Minor,C Major'", True),
+    ("date:2019-01-01..2019-12-31", True),
+    ("date:2020-01-01..", False),
+    ("genre:house bpm:127..130", False),
+])
+def test_clauses(expression, expected):
+    assert TrackFilter.parse(expression).matches(ROW) is expected
+
+def test_missing_detail_does_not_match():
+    track_filter = TrackFilter.parse("bpm:120-130")
+    assert track_filter.needs_details
+    assert not track_filter.matches({"name": "x", "artist": "y"})
+
+def test_limit():
+    track_filter = TrackFilter.parse("genre:house limit:2")
+    assert track_filter.accept(ROW)
+    assert not track_filter.accept(dict(ROW, genre="Techno"))
+    assert track_filter.accept(ROW)
+    assert track_filter.limit_reached()
+    assert not track_filter.accept(ROW)
+
+@pytest.mark.parametrize("expression", ["year:2020", "bpm:fast", "date:yesterday", "artist:(", "limit:ten", "genre"])
+def test_invalid_expressions(expression):
+    with pytest.raises(ValueError):
+        TrackFilter.parse(expression)
+
+class DownloadsApi:
+    def fetch_page(self, page_type, page, per_page=100):
+        return [
+            {"track_id": "1", "name": "Switch Funk Dub", "artist": "Jansons", "genre": "House", "status": "Available for Download"},
+            {"track_id": "2", "name": "Other", "artist": "Someone", "genre": "Techno", "status": "Available for Download"},
+            {"track_id": "3", "name": "Third", "artist": "Someone", "genre": "House", "status": "Available for Download"},
+        ]
+
+def test_downloads_page_applies_filter_once_per_track(tmp_path):
+    from beatport_auto.main import BeatportTrackFinder
+    finder = BeatportTrackFinder(1, 1, True, str(tmp_path), True, track_filter=TrackFilter.parse("genre:house limit:2"))
+    finder.api_client = DownloadsApi()
+    # Track 1 was clicked on a library page earlier in the run
+    assert finder.screen_row("Switch Funk Dub", "Jansons", "1", {"genre": "House"})
+
+    assert finder.find_pending_track_keys() == {"1", "3"}
+    assert finder.find_pending_track_keys() == {"1", "3"}
+    assert finder.track_filter.accepted == 2
+    assert finder.filtered_count == 1